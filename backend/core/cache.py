@@ -0,0 +1,163 @@
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Bounded in-memory cache with least-recently-used eviction and optional per-entry TTL"""
+
+    def __init__(self, maxsize: int = 256, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: Any = _MISSING):
+        ttl = self.ttl if ttl is _MISSING else ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: str):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SQLiteStore:
+    """JSON values in one SQLite table, so cached entries survive restarts"""
+
+    def __init__(self, path: str, table: str, max_rows: Optional[int] = None):
+        if not re.fullmatch(r"[A-Za-z_][A-Za-z0-9_]*", table):
+            raise ValueError(f"Invalid cache table name: {table}")
+        self.table = table
+        self.max_rows = max_rows
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)"
+            )
+
+    def get(self, key: str):
+        """Return (value, remaining_ttl) or None; remaining_ttl is None for entries that never expire"""
+        with self._lock:
+            row = self._conn.execute(f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at is not None and expires_at <= time.time():
+                with self._conn:
+                    self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                return None
+        remaining = expires_at - time.time() if expires_at is not None else None
+        return json.loads(value), remaining
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), expires_at),
+            )
+            if self.max_rows:
+                # Oldest writes go first (REPLACE assigns a fresh rowid)
+                self._conn.execute(
+                    f"DELETE FROM {self.table} WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),)
+                )
+                self._conn.execute(
+                    f"DELETE FROM {self.table} WHERE rowid NOT IN "
+                    f"(SELECT rowid FROM {self.table} ORDER BY rowid DESC LIMIT ?)",
+                    (self.max_rows,),
+                )
+
+    def delete(self, key: str):
+        with self._lock, self._conn:
+            self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute(f"DELETE FROM {self.table}")
+
+
+class TieredCache:
+    """LRU memory tier in front of an optional SQLite tier, with hit/miss counters"""
+
+    def __init__(self, name: str, maxsize: int = 256, ttl: Optional[float] = None, db_path: str = "",
+                 disk_max_rows: Optional[int] = None):
+        self.name = name
+        self.ttl = ttl
+        self.memory = LRUCache(maxsize=maxsize, ttl=ttl)
+        self.disk = SQLiteStore(db_path, name, max_rows=disk_max_rows) if db_path else None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = self.memory.get(key, _MISSING)
+        if value is not _MISSING:
+            self.hits += 1
+            return value
+        if self.disk is not None:
+            found = self.disk.get(key)
+            if found is not None:
+                value, remaining = found
+                self.memory.set(key, value, ttl=remaining)
+                self.hits += 1
+                self.disk_hits += 1
+                return value
+        self.misses += 1
+        return default
+
+    def set(self, key: str, value: Any, ttl: Any = _MISSING):
+        ttl = self.ttl if ttl is _MISSING else ttl
+        self.memory.set(key, value, ttl=ttl)
+        if self.disk is not None:
+            self.disk.set(key, value, ttl=ttl)
+
+    def delete(self, key: str):
+        self.memory.pop(key)
+        if self.disk is not None:
+            self.disk.delete(key)
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.memory),
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
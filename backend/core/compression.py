@@ -0,0 +1,57 @@
+import zlib
+import logging
+
+logger = logging.getLogger(__name__)
+
+try:
+    import zstandard
+except ImportError:  # zstd bodies are optional; gzip always works
+    zstandard = None
+
+
+def _decompressor(encoding: str):
+    if encoding == "gzip":
+        return zlib.decompressobj(16 + zlib.MAX_WBITS)
+    if encoding == "deflate":
+        return zlib.decompressobj()
+    if encoding == "zstd" and zstandard is not None:
+        return zstandard.ZstdDecompressor().decompressobj()
+    return None
+
+
+class RequestDecompressionMiddleware:
+    """Decode gzip/zstd request bodies chunk by chunk, so proxies can forward them compressed"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        headers = dict(scope["headers"])
+        encoding = headers.get(b"content-encoding", b"").decode("latin-1").strip().lower()
+        if not encoding or encoding == "identity":
+            return await self.app(scope, receive, send)
+
+        decoder = _decompressor(encoding)
+        if decoder is None:
+            await send({"type": "http.response.start", "status": 415,
+                        "headers": [(b"content-type", b"text/plain; charset=utf-8")]})
+            await send({"type": "http.response.body", "body": f"Unsupported Content-Encoding: {encoding}".encode()})
+            return
+
+        # Length and encoding no longer describe the body the app will see
+        scope = dict(scope)
+        scope["headers"] = [(k, v) for k, v in scope["headers"] if k not in (b"content-encoding", b"content-length")]
+
+        async def decoded_receive():
+            message = await receive()
+            if message["type"] == "http.request":
+                body = decoder.decompress(message.get("body", b""))
+                if not message.get("more_body", False) and hasattr(decoder, "flush"):
+                    body += decoder.flush()
+                message = {**message, "body": body}
+            return message
+
+        await self.app(scope, decoded_receive, send)
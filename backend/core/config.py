@@ -1,17 +1,65 @@
-from pydantic_settings import BaseSettings
-from typing import List
+from shared.config import SharedSettings
+
+class Settings(SharedSettings):
+    """Backend settings; PROJECT_NAME, CORS and the gateway's backend pool come from SharedSettings"""
 
-class Settings(BaseSettings):
-    PROJECT_NAME: str = "Report Analysis API"
-    ALLOWED_ORIGINS: List[str] = ["*"]  # Relaxed CORS for local development
-    
     # LLM Settings (can be loaded from .env)
     LLM_API_KEY: str = ""
+    LLM_PROVIDER: str = "gemini"  # "gemini", or "stub" for offline load tests (no API calls)
     LLM_MODEL: str = "gemini-1.5-flash"
+    LLM_TIMEOUT: float = 30.0  # seconds per model call
+    SEARCH_TIMEOUT: float = 10.0  # seconds per web search
+    AI_MAX_WORKERS: int = 4  # threads for blocking clients (web search)
+    AI_WARMUP: bool = True  # build the LLM client in the background at startup instead of on the first AI call
+    LLM_CONTEXT_TOKENS: int = 800  # budget for the data block of the insight prompt (trimmed to fit)
+    # Shared queue in front of the model API (all requests and batch items go through it)
+    LLM_MAX_CONCURRENCY: int = 4  # model calls in flight at once
+    LLM_RATE_PER_MINUTE: float = 0  # call starts per minute, spaced evenly; 0 = no limit
+    # Stub provider: deterministic answers per prompt, simulated latency/failures (seeded)
+    LLM_STUB_LATENCY: float = 0.5  # seconds per call
+    LLM_STUB_JITTER: float = 0.0  # +/- seconds, uniform
+    LLM_STUB_ERROR_RATE: float = 0.0  # 0..1, share of calls that raise
+    LLM_STUB_SEED: int = 0
+
+    # Caches (CACHE_DB_PATH enables the SQLite tier, e.g. "cache.db"; empty keeps memory only)
+    CACHE_DB_PATH: str = ""
+    MAPPING_CACHE_SIZE: int = 256
+    BRAND_CACHE_SIZE: int = 1024
+    BRAND_COLOR_TTL: float = 7 * 24 * 3600  # seconds
+    BRAND_COLOR_NEGATIVE_TTL: float = 600  # failed lookups retry after this many seconds
+    RESULT_CACHE_SIZE: int = 128  # analysis results kept in memory
+    RESULT_CACHE_DISK_ROWS: int = 2000  # and on disk, when CACHE_DB_PATH is set
+    RESULT_CACHE_TTL: float = 6 * 3600
+    LLM_CACHE_SIZE: int = 512  # model responses, keyed by prompt hash (0 = no memory tier, e.g. for load tests)
+    LLM_CACHE_TTL: float = 24 * 3600
+
+    # Incremental campaigns (/analyze with campaign_id): per-day aggregates persist here
+    CAMPAIGN_DB_PATH: str = "campaigns.db"
+
+    # Events (STREAM_HEARTBEAT / STREAM_SEND_TIMEOUT are in SharedSettings)
+    STREAM_QUEUE_SIZE: int = 100  # per SSE subscriber; a client this far behind is disconnected
+    STREAM_COALESCE_WINDOW: float = 0.05  # seconds a status_update waits for newer ones before it is sent
+    STREAM_REPLAY_SIZE: int = 64  # recent events kept per channel for Last-Event-ID resume
+    STREAM_REPLAY_CHANNELS: int = 256  # channels with a replay buffer (least recently active dropped first)
+    STREAM_REPLAY_TTL: float = 600  # seconds a channel's buffer outlives its last event
+    # "" keeps events in this process; with several workers/replicas point every one at the same broker
+    # (python -m backend.events.broker <url>): "unix:///tmp/dmp-events.sock" or "tcp://host:port"
+    EVENT_BUS_URL: str = ""
+
+    # CPU-bound analysis stage: "process" (all cores), "thread" or "inline"
+    ANALYSIS_EXECUTOR: str = "process"
+    ANALYSIS_WORKERS: int = 0  # 0 = one per CPU
+
+    # Background jobs (/jobs)
+    JOB_WORKERS: int = 2  # analyses running at once
+    JOB_QUEUE_SIZE: int = 20  # waiting jobs before /jobs answers 429
+    JOB_RESULT_TTL: float = 3600  # seconds finished jobs stay queryable
+
+    # Workbook uploads (/analyze/upload): the raw sheet is read, cleaned and aggregated this many rows at a time
+    INGEST_CHUNK_ROWS: int = 20_000
 
-    model_config = {
-        "env_file": ".env",
-        "extra": "ignore"
-    }
+    # Batch analysis (/analyze/batch)
+    BATCH_CONCURRENCY: int = 4  # items analyzed at once per batch
+    BATCH_MAX_ITEMS: int = 100  # larger batches are rejected with 413
 
 settings = Settings()
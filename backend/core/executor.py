@@ -0,0 +1,67 @@
+import asyncio
+import logging
+import multiprocessing
+import pickle
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+from backend.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_executor: Optional[Executor] = None
+_thread_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _threads() -> ThreadPoolExecutor:
+    global _thread_executor
+    if _thread_executor is None:
+        _thread_executor = ThreadPoolExecutor(max_workers=settings.ANALYSIS_WORKERS or None, thread_name_prefix="analysis")
+    return _thread_executor
+
+
+def get_executor() -> Executor:
+    """ANALYSIS_EXECUTOR=process uses all cores; falls back to a thread pool where processes are unavailable"""
+    global _executor
+    if _executor is None:
+        if settings.ANALYSIS_EXECUTOR == "process":
+            try:
+                # spawn: children don't inherit the event loop, sockets or client threads
+                _executor = ProcessPoolExecutor(
+                    max_workers=settings.ANALYSIS_WORKERS or None,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            except (OSError, NotImplementedError, ValueError) as e:
+                logger.warning(f"Process pool unavailable ({str(e)}); running analysis work in threads")
+        if _executor is None:
+            _executor = _threads()
+    return _executor
+
+
+async def run_cpu_bound(fn: Callable, *args) -> Any:
+    """Run a pure, picklable function off the event loop"""
+    if settings.ANALYSIS_EXECUTOR == "inline":
+        return fn(*args)
+    global _executor
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(get_executor(), fn, *args)
+    except BrokenProcessPool:
+        logger.warning("Analysis process pool broke; switching to threads")
+        broken, _executor = _executor, _threads()
+        if broken is not None and broken is not _executor:
+            broken.shutdown(wait=False, cancel_futures=True)
+    except (pickle.PicklingError, TypeError, AttributeError) as e:
+        # Unpicklable arguments mostly raise TypeError ("cannot pickle '_thread.lock' object") or
+        # AttributeError ("Can't pickle local object"); the same types raised by fn itself are not retried
+        if not isinstance(e, pickle.PicklingError) and "pickle" not in str(e).lower():
+            raise
+        logger.warning(f"Arguments not picklable ({str(e)}); running this call in a thread")
+    return await loop.run_in_executor(_threads(), fn, *args)
+
+
+def shutdown_executor():
+    global _executor, _thread_executor
+    for executor in {id(e): e for e in (_executor, _thread_executor) if e is not None}.values():
+        executor.shutdown(wait=False, cancel_futures=True)
+    _executor = _thread_executor = None
@@ -0,0 +1,5 @@
+# Lives in shared/ so the gateway can use the same registry without importing the backend
+from shared.metrics import (  # noqa: F401
+    BYTE_BUCKETS, CONTENT_TYPE, ROW_BUCKETS, TIME_BUCKETS, Histogram, MetricsRegistry, StageTimer,
+    observe_stage, registry, timed,
+)
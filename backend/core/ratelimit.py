@@ -0,0 +1,52 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Optional
+
+
+class RateLimiter:
+    """Process-wide queue in front of a rate-limited API: at most `concurrency` calls in flight and,
+    when per_minute is set, call starts spaced evenly so bursts (a batch of reports) don't trip vendor quotas"""
+
+    def __init__(self, concurrency: int, per_minute: float = 0):
+        self.concurrency = max(1, concurrency)
+        self.interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._spacing: Optional[asyncio.Lock] = None
+        self._next_start = 0.0
+        self.waiting = 0
+        self.in_flight = 0
+
+    @asynccontextmanager
+    async def slot(self):
+        # Created on first use, inside the running loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+            self._spacing = asyncio.Lock()
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        try:
+            if self.interval:
+                async with self._spacing:
+                    delay = self._next_start - time.monotonic()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                    self._next_start = max(time.monotonic(), self._next_start) + self.interval
+            self.in_flight += 1
+            try:
+                yield
+            finally:
+                self.in_flight -= 1
+        finally:
+            self._semaphore.release()
+
+    def stats(self) -> dict:
+        return {
+            "concurrency": self.concurrency,
+            "per_minute": round(60.0 / self.interval, 3) if self.interval else 0,
+            "waiting": self.waiting,
+            "in_flight": self.in_flight,
+        }
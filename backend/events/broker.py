@@ -0,0 +1,216 @@
+"""Cross-process event fan-out for running the backend as several workers or replicas.
+
+    python -m backend.events.broker unix:///tmp/dmp-events.sock
+    EVENT_BUS_URL=unix:///tmp/dmp-events.sock uvicorn backend.main:app --port 8001 --workers 4
+
+Every backend process connects to the broker (EVENT_BUS_URL), publishes the events it emits and receives
+every event any process emitted, its own included, so an SSE client on one worker follows an analysis
+running on another. The broker numbers the events: ids are global, and Last-Event-ID resumes on any worker.
+Use tcp://host:port for replicas on different hosts.
+
+Wire format, one line per event: a small JSON header ({"type", "channel"}, plus "id" from the broker),
+a tab, then the event data as JSON. The broker reads only the header and relays the data bytes untouched.
+On connecting, a process first sends {"hello": <last id it has used>}; the broker numbers every later event
+above it, so events a worker delivered on its own while the broker was unreachable never outrank them.
+"""
+import asyncio
+import json
+import logging
+import sys
+import time
+from typing import Callable, Optional, Set, Tuple
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+# Largest event line (analysis_completed carries the whole result)
+MAX_MESSAGE = 16 * 1024 * 1024
+# A worker that lets this much go unread is dropped; it reconnects and carries on from new events
+MAX_PENDING = 64 * 1024 * 1024
+RECONNECT_DELAY = 0.5
+MAX_RECONNECT_DELAY = 10.0
+
+
+def parse_url(url: str) -> Tuple[str, str, int]:
+    """("unix", path, 0) or ("tcp", host, port)"""
+    parsed = urlparse(url)
+    if parsed.scheme == "unix" and parsed.path:
+        return "unix", parsed.path, 0
+    if parsed.scheme == "tcp" and parsed.hostname and parsed.port:
+        return "tcp", parsed.hostname, parsed.port
+    raise ValueError(f"EVENT_BUS_URL must be unix:///path or tcp://host:port, got {url!r}")
+
+
+async def _open_connection(url: str):
+    kind, host, port = parse_url(url)
+    if kind == "unix":
+        return await asyncio.open_unix_connection(host, limit=MAX_MESSAGE)
+    return await asyncio.open_connection(host, port, limit=MAX_MESSAGE)
+
+
+class EventBroker:
+    """Relays every published event to every connected process, in one order and with one id sequence"""
+
+    def __init__(self, url: str):
+        self.url = url
+        self._writers: Set[asyncio.StreamWriter] = set()
+        self._server: Optional[asyncio.AbstractServer] = None
+        # Same clock seeding as EventBus: ids keep increasing across broker restarts
+        self._last_id = int(time.time() * 1000)
+
+    async def start(self):
+        kind, host, port = parse_url(self.url)
+        if kind == "unix":
+            self._server = await asyncio.start_unix_server(self._handle, host, limit=MAX_MESSAGE)
+        else:
+            self._server = await asyncio.start_server(self._handle, host, port, limit=MAX_MESSAGE)
+        logger.info(f"Event broker listening on {self.url}")
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for writer in list(self._writers):
+            writer.close()
+        self._writers.clear()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._writers.add(writer)
+        logger.info(f"Event bus client connected ({len(self._writers)} connected)")
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                header, _, data = line.partition(b"\t")
+                try:
+                    meta = json.loads(header)
+                except ValueError:
+                    logger.warning("Dropping malformed event line")
+                    continue
+                if "hello" in meta:
+                    self._last_id = max(self._last_id, int(meta["hello"]))
+                    continue
+                self._last_id += 1
+                meta["id"] = self._last_id
+                self._broadcast(json.dumps(meta).encode("utf-8") + b"\t" + data)
+        except (ConnectionError, ValueError) as e:
+            # ValueError: a line over MAX_MESSAGE
+            logger.warning(f"Event bus client dropped: {str(e)}")
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    def _broadcast(self, line: bytes):
+        for writer in list(self._writers):
+            if writer.transport.get_write_buffer_size() > MAX_PENDING:
+                logger.warning(f"Event bus client is {MAX_PENDING} bytes behind; disconnecting it")
+                self._writers.discard(writer)
+                writer.close()
+                continue
+            writer.write(line)
+
+
+class BrokerClient:
+    """One process's connection to the broker. Events relayed by the broker are passed to
+    on_event(id, type, channel, data_json); the connection is re-established with backoff when it drops.
+    last_id() is the highest event id this process has used, reported to the broker on every connect."""
+
+    def __init__(self, url: str, on_event: Callable[[int, str, Optional[str], str], None],
+                 last_id: Callable[[], int] = lambda: 0):
+        parse_url(url)
+        self.url = url
+        self.on_event = on_event
+        self.last_id = last_id
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._task: Optional[asyncio.Task] = None
+        self._connected = asyncio.Event()
+        self.published = 0
+        self.received = 0
+
+    @property
+    def connected(self) -> bool:
+        return self._writer is not None
+
+    async def start(self, timeout: float = 5.0):
+        """Connect in the background; waits up to timeout for the first connection"""
+        self._task = asyncio.create_task(self._run())
+        try:
+            await asyncio.wait_for(self._connected.wait(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Event broker {self.url} not reachable yet; events stay in this process until it is")
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def publish(self, event_type: str, channel: Optional[str], data_json: str) -> bool:
+        """False when there is no broker connection (the caller delivers locally instead)"""
+        writer = self._writer
+        if writer is None:
+            return False
+        header = json.dumps({"type": event_type, "channel": channel})
+        writer.write(f"{header}\t{data_json}\n".encode("utf-8"))
+        try:
+            await writer.drain()
+        except ConnectionError:
+            return False
+        self.published += 1
+        return True
+
+    async def _run(self):
+        delay = RECONNECT_DELAY
+        while True:
+            try:
+                reader, writer = await _open_connection(self.url)
+            except OSError as e:
+                logger.warning(f"Event broker {self.url} unreachable ({str(e)}); retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, MAX_RECONNECT_DELAY)
+                continue
+            delay = RECONNECT_DELAY
+            # Sent before any event: ids handed out locally during the outage stay below the broker's
+            writer.write(json.dumps({"hello": self.last_id()}).encode("utf-8") + b"\n")
+            self._writer = writer
+            self._connected.set()
+            logger.info(f"Connected to event broker {self.url}")
+            try:
+                await self._read(reader)
+            except (ConnectionError, ValueError) as e:
+                logger.warning(f"Event broker connection lost: {str(e)}")
+            finally:
+                self._writer = None
+                self._connected.clear()
+                writer.close()
+
+    async def _read(self, reader: asyncio.StreamReader):
+        while True:
+            line = await reader.readline()
+            if not line:
+                raise ConnectionError("closed by broker")
+            header, _, data = line.partition(b"\t")
+            meta = json.loads(header)
+            self.received += 1
+            self.on_event(meta["id"], meta["type"], meta.get("channel"), data.rstrip(b"\n").decode("utf-8"))
+
+    def stats(self) -> dict:
+        return {"url": self.url, "connected": self.connected, "published": self.published, "received": self.received}
+
+
+async def serve(url: str):
+    broker = EventBroker(url)
+    await broker.start()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await broker.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    try:
+        asyncio.run(serve(sys.argv[1] if len(sys.argv) > 1 else "unix:///tmp/dmp-events.sock"))
+    except KeyboardInterrupt:
+        pass
@@ -1,24 +1,261 @@
 import asyncio
-from typing import Callable, Dict, List, Any
+import json
+import time
+import uuid
+from collections import OrderedDict, deque
+from typing import TYPE_CHECKING, Callable, Deque, Dict, Iterable, List, Any, Optional, Set, Tuple
 import logging
+from backend.core.config import settings
+
+if TYPE_CHECKING:
+    from backend.events.broker import BrokerClient
 
 logger = logging.getLogger(__name__)
 
+# (event_type, channel); channel None = every analysis
+ListenerKey = Tuple[str, Optional[str]]
+
+# Progress messages superseded by the next one; a burst of them reaches stream clients as the latest
+COALESCED_EVENTS = frozenset({"status_update"})
+
+
+def new_channel_id() -> str:
+    return uuid.uuid4().hex
+
+
+class Event:
+    """One emitted event; its id increases monotonically and doubles as the SSE id.
+    Events relayed by the broker arrive as JSON (payload) and are only decoded if data is read."""
+
+    __slots__ = ("id", "type", "channel", "_data", "_payload", "_frame")
+
+    def __init__(self, event_id: int, event_type: str, channel: Optional[str], data: Any = None,
+                 payload: Optional[str] = None):
+        self.id = event_id
+        self.type = event_type
+        self.channel = channel
+        self._data = data
+        self._payload = payload
+        self._frame: Optional[str] = None
+
+    @property
+    def data(self) -> Any:
+        if self._data is None and self._payload is not None:
+            self._data = json.loads(self._payload)
+        return self._data
+
+    def payload(self) -> str:
+        if self._payload is None:
+            self._payload = json.dumps(self._data)
+        return self._payload
+
+    def frame(self) -> str:
+        """SSE frame, encoded once however many subscribers receive it"""
+        if self._frame is None:
+            self._frame = f"id: {self.id}\ndata: {self.payload()}\n\n"
+        return self._frame
+
+
+def coalesce(events: List[Event]) -> List[Event]:
+    """Keep only the last of each run of consecutive COALESCED_EVENTS of one channel; order is otherwise
+    unchanged. A global subscriber's batch mixes analyses, and each keeps its own latest status."""
+    out: List[Event] = []
+    for event in events:
+        if (out and event.type in COALESCED_EVENTS and out[-1].type == event.type
+                and out[-1].channel == event.channel):
+            out[-1] = event
+        else:
+            out.append(event)
+    return out
+
+
+class Subscription:
+    """Bounded queue fed by the bus. A consumer that falls maxsize events behind is marked overflowed
+    and gets nothing more: its stream ends and the client reconnects, resuming from the replay buffer,
+    instead of the bus holding an ever-staler backlog for it."""
+
+    def __init__(self, bus: "EventBus", event_types: Iterable[str], channel: Optional[str] = None, maxsize: int = 100,
+                 after_id: int = 0):
+        self.bus = bus
+        self.event_types = frozenset(event_types)
+        self.channel = channel
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.after_id = after_id  # events up to this id were already delivered (or replayed)
+        self.overflowed = False
+
+    def push(self, event: Event):
+        if self.overflowed or event.type not in self.event_types or event.id <= self.after_id:
+            return
+        if self.queue.full():
+            self.overflowed = True
+            return
+        self.queue.put_nowait(event)
+
+    async def next_batch(self, timeout: float, coalesce_window: float = 0.0) -> List[Event]:
+        """Everything queued (waiting up to timeout for the first event), status bursts coalesced; [] on timeout.
+        When the first event is a coalescable one, waits coalesce_window for the rest of its burst."""
+        if self.queue.empty() and not self.overflowed:
+            try:
+                first = await asyncio.wait_for(self.queue.get(), timeout)
+            except asyncio.TimeoutError:
+                return []
+            if first.type in COALESCED_EVENTS and coalesce_window > 0:
+                await asyncio.sleep(coalesce_window)
+            events = [first]
+        else:
+            events = []
+        while not self.queue.empty():
+            events.append(self.queue.get_nowait())
+        events = [e for e in events if e.id > self.after_id]
+        if events:
+            self.after_id = events[-1].id
+        return coalesce(events)
+
+    def __enter__(self) -> "Subscription":
+        self.bus.attach(self)
+        return self
+
+    def __exit__(self, *exc):
+        self.bus.detach(self)
+        if self.overflowed:
+            logger.warning(f"Subscriber on channel {self.channel} fell {self.queue.maxsize} events behind; disconnected")
+
+
 class EventBus:
-    def __init__(self):
-        self._listeners: Dict[str, List[Callable]] = {}
-
-    def subscribe(self, event_type: str, listener: Callable):
-        if event_type not in self._listeners:
-            self._listeners[event_type] = []
-        self._listeners[event_type].append(listener)
-        logger.info(f"Subscribed to event: {event_type}")
-
-    async def emit(self, event_type: str, data: Any = None):
-        logger.info(f"Emitting event: {event_type}")
-        if event_type in self._listeners:
-            tasks = [asyncio.create_task(listener(data)) for listener in self._listeners[event_type]]
-            if tasks:
-                await asyncio.gather(*tasks)
-
-event_bus = EventBus()
+    """In-process by default. After connect(url) events go through the broker (backend.events.broker):
+    stream subscribers and the replay buffer then see what every worker emits, numbered by the broker.
+    subscribe() listeners stay in-process hooks and see only this process's own events."""
+
+    def __init__(self, replay_size: int = 64, replay_channels: int = 256, replay_ttl: float = 600):
+        self._listeners: Dict[ListenerKey, List[Callable]] = {}
+        self._subscriptions: Dict[Optional[str], Set[Subscription]] = {}
+        # channel -> (last emit, recent events), least recently active first
+        self._replay: "OrderedDict[str, Tuple[float, Deque[Event]]]" = OrderedDict()
+        self.replay_size = replay_size
+        self.replay_channels = replay_channels
+        self.replay_ttl = replay_ttl
+        # Seeded from the clock so ids keep increasing across restarts: a Last-Event-ID from before a
+        # restart then just finds nothing to replay, instead of hiding every newer event
+        self._last_id = int(time.time() * 1000)
+        self._broker: Optional["BrokerClient"] = None
+
+    async def connect(self, url: str):
+        """Fan events out across processes through the broker at url"""
+        from backend.events.broker import BrokerClient
+        self._broker = BrokerClient(url, self._receive, last_id=lambda: self._last_id)
+        await self._broker.start()
+
+    async def close(self):
+        if self._broker is not None:
+            await self._broker.close()
+            self._broker = None
+
+    def subscribe(self, event_type: str, listener: Callable, channel: Optional[str] = None) -> Callable:
+        """Register a listener; returns a callable that removes it again"""
+        key = (event_type, channel)
+        if key not in self._listeners:
+            self._listeners[key] = []
+        self._listeners[key].append(listener)
+        logger.debug(f"Subscribed to event: {event_type} (channel={channel})")
+        return lambda: self.unsubscribe(event_type, listener, channel=channel)
+
+    def unsubscribe(self, event_type: str, listener: Callable, channel: Optional[str] = None):
+        key = (event_type, channel)
+        listeners = self._listeners.get(key)
+        if not listeners:
+            return
+        try:
+            listeners.remove(listener)
+        except ValueError:
+            return
+        if not listeners:
+            del self._listeners[key]
+
+    def subscription(self, event_types: Iterable[str], channel: Optional[str] = None, maxsize: int = 100,
+                     after_id: int = 0) -> Subscription:
+        """Context manager: a bounded per-subscriber queue that detaches itself on exit"""
+        return Subscription(self, event_types, channel=channel, maxsize=maxsize, after_id=after_id)
+
+    def attach(self, subscription: Subscription):
+        # Queue subscribers are fed synchronously on emit: no task per subscriber per event
+        self._subscriptions.setdefault(subscription.channel, set()).add(subscription)
+
+    def detach(self, subscription: Subscription):
+        subscribers = self._subscriptions.get(subscription.channel)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscriptions[subscription.channel]
+
+    def replay(self, channel: str, after_id: int, event_types: Iterable[str]) -> List[Event]:
+        """Buffered events of a channel newer than after_id (Last-Event-ID resume)"""
+        entry = self._replay.get(channel)
+        if entry is None:
+            return []
+        event_types = frozenset(event_types)
+        return [e for e in entry[1] if e.id > after_id and e.type in event_types]
+
+    def _record(self, event: Event):
+        now = time.monotonic()
+        entry = self._replay.get(event.channel)
+        if entry is None:
+            entry = (now, deque(maxlen=self.replay_size))
+        self._replay[event.channel] = (now, entry[1])
+        self._replay.move_to_end(event.channel)
+        entry[1].append(event)
+        # Oldest-active channels first: drop expired ones and keep the channel count bounded
+        while self._replay:
+            channel, (last_emit, _) = next(iter(self._replay.items()))
+            if len(self._replay) <= self.replay_channels and now - last_emit <= self.replay_ttl:
+                break
+            del self._replay[channel]
+
+    def listener_count(self) -> int:
+        return (sum(len(listeners) for listeners in self._listeners.values())
+                + sum(len(subscribers) for subscribers in self._subscriptions.values()))
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": sum(len(subscribers) for subscribers in self._subscriptions.values()),
+            "listeners": sum(len(listeners) for listeners in self._listeners.values()),
+            "replay_channels": len(self._replay),
+            "last_event_id": self._last_id,
+            "broker": self._broker.stats() if self._broker is not None else None,
+        }
+
+    def _deliver(self, event: Event):
+        self._last_id = max(self._last_id, event.id)
+        if event.channel is not None:
+            self._record(event)
+        # Global subscribers see every analysis; channel subscribers only their own
+        for subscriber in list(self._subscriptions.get(None, ())):
+            subscriber.push(event)
+        if event.channel is not None:
+            for subscriber in list(self._subscriptions.get(event.channel, ())):
+                subscriber.push(event)
+
+    def _receive(self, event_id: int, event_type: str, channel: Optional[str], payload: str):
+        self._deliver(Event(event_id, event_type, channel, payload=payload))
+
+    async def emit(self, event_type: str, data: Any = None, channel: Optional[str] = None):
+        logger.info(f"Emitting event: {event_type} (channel={channel})")
+        if self._broker is not None:
+            payload = json.dumps(data)
+            # Delivered here too once the broker relays it back, with the broker's id
+            if not await self._broker.publish(event_type, channel, payload):
+                # No broker right now: at least this worker's own stream clients get it. The id continues
+                # this process's sequence; on reconnecting the broker numbers above it (see broker hello)
+                self._deliver(Event(self._last_id + 1, event_type, channel, data, payload))
+        else:
+            self._deliver(Event(self._last_id + 1, event_type, channel, data))
+        listeners = list(self._listeners.get((event_type, None), ()))
+        if channel is not None:
+            listeners += self._listeners.get((event_type, channel), ())
+        if listeners:
+            await asyncio.gather(*(listener(data) for listener in listeners))
+
+event_bus = EventBus(
+    replay_size=settings.STREAM_REPLAY_SIZE,
+    replay_channels=settings.STREAM_REPLAY_CHANNELS,
+    replay_ttl=settings.STREAM_REPLAY_TTL,
+)
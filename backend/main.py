@@ -1,19 +1,53 @@
 import sys
 import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import Response, StreamingResponse
 import json
 import asyncio
+import pandas as pd
+from pydantic import TypeAdapter, ValidationError
+from typing import List, Optional
 
 # Ensure parent directory is in sys.path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from backend.models.analysis import AnalysisRequest
+from backend.models.analysis import AnalysisRequest, BatchAnalysisRequest, ComparisonWindow
+from backend.core.compression import RequestDecompressionMiddleware
+from backend.core.executor import shutdown_executor
+from backend.core.metrics import CONTENT_TYPE, registry
+from shared.sse import HEARTBEAT, EventStreamResponse
 from backend.services.analysis_service import analysis_service
-from backend.events.bus import event_bus
+from backend.services.batch_service import batch_service
+from backend.services.column_mapper import column_mapper
+from backend.services.job_service import JobQueueFullError, job_service
+from backend.services.ingest import (
+    ARROW_FILE_TYPE, ARROW_STREAM_TYPE, UnsupportedFormatError, detect_format, read_arrow_request, read_table,
+)
+from backend.services.workbook import detect_workbook_format, open_workbook, read_mix_file, save_upload
+from backend.core.config import settings
+from backend.events.bus import coalesce, event_bus, new_channel_id
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    from backend.services.ai_service import ai_service
+    # Serve right away; the LLM client is built off the event loop meanwhile (AI calls wait for it)
+    warm_up = asyncio.create_task(ai_service.warm_up()) if settings.AI_WARMUP else None
+    # Several workers/replicas: stream clients on any of them see every analysis
+    if settings.EVENT_BUS_URL:
+        await event_bus.connect(settings.EVENT_BUS_URL)
+    yield
+    if warm_up:
+        warm_up.cancel()
+    # Job workers and the analysis pool start lazily; stop them cleanly on shutdown
+    await job_service.stop()
+    await event_bus.close()
+    shutdown_executor()
+    ai_service.close()
 
-app = FastAPI(title="DMP-Core-Backend")
+app = FastAPI(title="DMP-Core-Backend", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -21,33 +55,202 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Compressed bodies pass through the gateway untouched; decode requests and encode responses here
+app.add_middleware(RequestDecompressionMiddleware)
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
+STREAM_EVENTS = ("analysis_started", "data_processed", "status_update", "analysis_completed", "analysis_error")
+# Columnar uploads carry comparisons as JSON (form field or Arrow metadata); validated like AnalysisRequest's
+COMPARISON_LIST = TypeAdapter(List[ComparisonWindow])
 
 @app.post("/analyze")
 async def analyze(req: AnalysisRequest):
+    channel_id = req.channel_id or new_channel_id()
     try:
-        return await analysis_service.analyze_data(req)
+        result = await analysis_service.analyze_data(req, channel_id=channel_id)
+        return {**result, "channelId": channel_id}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/stream")
-async def stream_events(request: Request):
-    async def event_generator():
-        queue = asyncio.Queue()
-        async def listener(data): await queue.put(data)
-        
-        event_bus.subscribe("analysis_started", listener)
-        event_bus.subscribe("data_processed", listener)
-        event_bus.subscribe("analysis_completed", listener)
-        event_bus.subscribe("analysis_error", listener)
+def validate_comparisons(comparisons) -> Optional[List[dict]]:
+    try:
+        return [c.model_dump() for c in COMPARISON_LIST.validate_python(comparisons)] if comparisons else None
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False, include_context=False))
 
+@app.post("/analyze/columnar")
+async def analyze_columnar(request: Request, channel_id: Optional[str] = None, refresh: bool = False,
+                           campaign_id: Optional[str] = None, append: bool = False):
+    """Columnar /analyze: an Arrow IPC body, or multipart with raw/mix files (arrow, parquet or csv),
+    a mappings field and an optional comparisons field"""
+    content_type = request.headers.get("content-type", "")
+    try:
+        if content_type.startswith("multipart/form-data"):
+            form = await request.form()
+            raw = form.get("raw")
+            if raw is None or isinstance(raw, str):
+                raise HTTPException(status_code=400, detail="raw 파일이 필요합니다.")
+            raw_df = read_table(await raw.read(), detect_format(raw.filename, raw.content_type))
+            mix = form.get("mix")
+            if mix is not None and not isinstance(mix, str):
+                mix_df = read_table(await mix.read(), detect_format(mix.filename, mix.content_type))
+            else:
+                mix_df = pd.DataFrame()
+            mappings = json.loads(form.get("mappings") or "{}")
+            comparisons = json.loads(form.get("comparisons") or "null")
+        elif content_type.split(";")[0].strip() in (ARROW_STREAM_TYPE, ARROW_FILE_TYPE):
+            raw_df, mix_df, mappings, comparisons = read_arrow_request(await request.body())
+        else:
+            raise UnsupportedFormatError(f"지원하지 않는 Content-Type입니다: {content_type}")
+    except UnsupportedFormatError as e:
+        raise HTTPException(status_code=415, detail=str(e))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"업로드 파싱 오류: {str(e)}")
+    comparisons = validate_comparisons(comparisons)
+
+    channel_id = channel_id or new_channel_id()
+    try:
+        result = await analysis_service.analyze_frames(
+            raw_df, mix_df, mappings, channel_id=channel_id, refresh=refresh,
+            campaign_id=campaign_id, append=append, comparisons=comparisons,
+        )
+        return {**result, "channelId": channel_id}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/analyze/upload")
+async def analyze_upload(request: Request, channel_id: Optional[str] = None, refresh: bool = False,
+                         campaign_id: Optional[str] = None, append: bool = False):
+    """The workbook itself instead of parsed rows: multipart with a `file` (.xlsx or .csv), optional
+    mappings/comparisons fields and an optional separate `mix` file. Sheets and header rows are found
+    the way the browser finds them; the raw sheet goes to disk and is cleaned and aggregated
+    INGEST_CHUNK_ROWS rows at a time, so memory does not grow with the row count."""
+    if not request.headers.get("content-type", "").startswith("multipart/form-data"):
+        raise HTTPException(status_code=415, detail="multipart/form-data 업로드가 필요합니다.")
+    paths = []
+    try:
         try:
-            while True:
-                if await request.is_disconnected(): break
-                data = await queue.get()
-                yield f"data: {json.dumps(data)}\n\n"
-        except asyncio.CancelledError: pass
+            form = await request.form()
+            file = form.get("file")
+            if file is None or isinstance(file, str):
+                raise HTTPException(status_code=400, detail="file 파일이 필요합니다.")
+            fmt = detect_workbook_format(file.filename, file.content_type)
+            # Multipart parts are already spooled to disk; copy to a named file a worker process can open
+            path, digest, size = await asyncio.to_thread(save_upload, file.file, fmt)
+            paths.append(path)
+            upload, mix_df = await asyncio.to_thread(open_workbook, path, fmt, digest, size, settings.INGEST_CHUNK_ROWS)
+            mix = form.get("mix")
+            if mix is not None and not isinstance(mix, str):
+                mix_fmt = detect_workbook_format(mix.filename, mix.content_type)
+                mix_path, _, _ = await asyncio.to_thread(save_upload, mix.file, mix_fmt)
+                paths.append(mix_path)
+                mix_df = await asyncio.to_thread(read_mix_file, mix_path, mix_fmt, settings.INGEST_CHUNK_ROWS)
+            mappings = json.loads(form.get("mappings") or "{}")
+            comparisons = json.loads(form.get("comparisons") or "null")
+        except UnsupportedFormatError as e:
+            raise HTTPException(status_code=415, detail=str(e))
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"업로드 파싱 오류: {str(e)}")
+        comparisons = validate_comparisons(comparisons)
+
+        channel_id = channel_id or new_channel_id()
+        try:
+            result = await analysis_service.analyze_upload(
+                upload, mix_df, mappings, channel_id=channel_id, refresh=refresh,
+                campaign_id=campaign_id, append=append, comparisons=comparisons,
+            )
+            return {**result, "channelId": channel_id}
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        for path in paths:
+            os.remove(path)
+
+@app.post("/analyze/batch")
+async def analyze_batch(req: BatchAnalysisRequest):
+    """Analyze many reports in one call: NDJSON, one line per item as it finishes (with its "index"),
+    failed items carry "error" without stopping the rest, and a final {"batch": {...}} summary line"""
+    if not req.items:
+        raise HTTPException(status_code=422, detail="분석할 항목이 없습니다.")
+    if len(req.items) > settings.BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"한 번에 최대 {settings.BATCH_MAX_ITEMS}건까지 분석할 수 있습니다.")
+
+    async def lines():
+        async for result in batch_service.run(req.items):
+            yield json.dumps(result, ensure_ascii=False, default=str) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+@app.post("/jobs", status_code=202)
+async def submit_job(req: AnalysisRequest):
+    """Queue an analysis and return at once; follow it via GET /jobs/{id} or /stream?channel={id}"""
+    try:
+        job = job_service.submit(req)
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "5"})
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"jobId": job.id, "channelId": job.id, "status": job.status}
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = job_service.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
+    return job
+
+@app.get("/cache/stats")
+async def cache_stats():
+    from backend.services.ai_service import ai_service
+    return {
+        "column_mappings": column_mapper.stats(),
+        "brand_colors": ai_service.brand_cache.stats(),
+        "analysis_results": analysis_service.result_cache.stats(),
+        "llm_responses": ai_service.llm_cache.stats(),
+        "llm_queue": ai_service.llm_queue.stats(),
+    }
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus histograms: analysis_stage_* (per analysis step) and ai_stage_* (per model/search call)"""
+    return Response(registry.render(), media_type=CONTENT_TYPE)
+
+@app.get("/stream/stats")
+async def stream_stats():
+    return event_bus.stats()
+
+@app.get("/stream")
+async def stream_events(request: Request, channel: Optional[str] = None, last_event_id: Optional[int] = None):
+    """SSE feed; pass ?channel=<channelId> to follow a single analysis.
+    Frames carry ids: a reconnect with Last-Event-ID (or ?last_event_id=) first replays what the channel
+    emitted since then. Idle streams get heartbeat comments, status_update bursts are sent as the latest
+    one, and clients that fall STREAM_QUEUE_SIZE events behind or stop reading are disconnected."""
+    header_id = request.headers.get("last-event-id", "")
+    if header_id.isdigit():
+        last_event_id = int(header_id)
+
+    async def event_generator():
+        # Attach before reading the replay buffer, so nothing emitted in between is missed;
+        # the subscription skips ids the replay already covered
+        with event_bus.subscription(STREAM_EVENTS, channel=channel, maxsize=settings.STREAM_QUEUE_SIZE,
+                                    after_id=last_event_id or 0) as sub:
+            if channel and last_event_id is not None:
+                backlog = coalesce(event_bus.replay(channel, last_event_id, STREAM_EVENTS))
+                if backlog:
+                    sub.after_id = max(sub.after_id, backlog[-1].id)
+                    yield "".join(event.frame() for event in backlog)
+            while not (sub.overflowed and sub.queue.empty()):
+                batch = await sub.next_batch(settings.STREAM_HEARTBEAT, settings.STREAM_COALESCE_WINDOW)
+                if batch:
+                    yield "".join(event.frame() for event in batch)
+                elif not sub.overflowed:
+                    yield HEARTBEAT
 
-    return StreamingResponse(event_generator(), media_type="text/event-stream")
+    return EventStreamResponse(event_generator(), send_timeout=settings.STREAM_SEND_TIMEOUT)
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,395 @@
+import logging
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from backend.core.metrics import StageTimer
+from backend.services.cleaning import parse_date_column, clean_numeric_column
+from backend.services.campaign_store import CampaignStore, CUBE_DIMENSIONS, CUBE_METRICS
+from backend.services.windows import compare_windows
+from backend.services.workbook import SheetUpload
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ADVERTISER = "Nasmedia"
+# Headers find_advertiser falls back to when the mapped advertiser column is missing
+ADVERTISER_FALLBACK_COLUMNS = ['advertiser', 'client', '광고주', '광고주명']
+
+# Column mapping for summarize_rows when it runs on a stored campaign cube
+CUBE_COLUMNS = {
+    "date_col": "date", "media_col": "media", "creative_col": "creative", "imp_col": "impressions",
+    "cost_col": "spend", "click_col": "clicks", "view_col": "views", "advertiser_col": None,
+}
+
+
+def kept_columns(available: Iterable, columns: Dict[str, Optional[str]]) -> List:
+    """The mapped columns (and advertiser fallbacks) among available, in their original order"""
+    wanted = {col for col in columns.values() if col}
+    return [c for c in available if c in wanted or str(c).lower() in ADVERTISER_FALLBACK_COLUMNS]
+
+
+def prune_columns(raw_df: pd.DataFrame, columns: Dict[str, Optional[str]]) -> pd.DataFrame:
+    """Only the mapped columns (and advertiser fallbacks) go on to cleaning; wide exports carry many more"""
+    return raw_df[kept_columns(raw_df.columns, columns)]
+
+
+def clean_rows(raw_df: pd.DataFrame, columns: Dict[str, Optional[str]]) -> pd.DataFrame:
+    """Parse dates and metrics, then keep only rows with a date and some performance"""
+    d_col = columns['date_col']
+    imp_col, cost_col, clk_col, v_col = columns['imp_col'], columns['cost_col'], columns['click_col'], columns['view_col']
+
+    # Dimensions repeat a handful of names over many rows: store codes, not one string object per row
+    for col in {columns['media_col'], columns['creative_col'], columns['advertiser_col']}:
+        if col and col in raw_df.columns and not isinstance(raw_df[col].dtype, pd.CategoricalDtype):
+            raw_df[col] = raw_df[col].astype('category')
+
+    # 2. Cleaning & Strict Filtering
+    # [Fix] Parse date strictly to prevent timezone shifting
+    # Column-wise: each distinct date string is parsed once (see cleaning.parse_date_column)
+    raw_df[d_col] = parse_date_column(raw_df[d_col])
+    raw_df = raw_df.dropna(subset=[d_col])
+
+    numeric_cols = [imp_col, cost_col, clk_col, v_col]
+    for col in numeric_cols:
+        if col and col in raw_df.columns:
+            # Smallest integer dtype that holds the column; sums still accumulate in int64
+            raw_df[col] = pd.to_numeric(clean_numeric_column(raw_df[col]), downcast='integer')
+
+    # [New] Filter out rows where all performance metrics are 0
+    # If a row has date but no impressions, clicks, spend, or views, it's invalid
+    valid_perf_mask = pd.Series(False, index=raw_df.index)
+    for col in numeric_cols:
+        if col and col in raw_df.columns:
+            valid_perf_mask |= (raw_df[col] > 0)
+
+    return raw_df[valid_perf_mask]
+
+
+def compute_aggregates(raw_df: pd.DataFrame, mix_df: pd.DataFrame, columns: Dict[str, Optional[str]],
+                       comparisons: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """CPU-bound stage of the analysis: cleaning, date selection, dimension and budget aggregation.
+    Pure function of its inputs so it can run in a worker process; returns only the small aggregate dict.
+    comparisons (ComparisonWindow dicts) are answered from a (date, media, creative) cube built once."""
+    # Timed here, in the worker; the caller feeds agg["stages"] into its own metrics
+    timer = StageTimer(observe=False)
+    with timer.stage("clean_rows", rows=len(raw_df)):
+        valid_df = clean_rows(raw_df, columns)
+    with timer.stage("summarize_rows", rows=len(valid_df)):
+        agg = summarize_rows(valid_df, columns)
+    if "error" not in agg:
+        with timer.stage("find_advertiser", rows=len(valid_df)):
+            agg["adv_name"] = find_advertiser(valid_df, columns['advertiser_col'])
+        with timer.stage("compute_budget", rows=len(mix_df)):
+            agg["budget_total"], agg["media_budget"] = compute_budget(mix_df)
+        if comparisons:
+            with timer.stage("comparisons", rows=len(valid_df)):
+                agg["comparisons"] = compare_windows(build_cube(valid_df, columns), comparisons, agg["t_date"])
+    agg["stages"] = timer.records
+    return agg
+
+
+def build_cube(valid_df: pd.DataFrame, columns: Dict[str, Optional[str]]) -> pd.DataFrame:
+    """Collapse cleaned rows to one row per (date, media, creative); unmapped dimensions become ''"""
+    cube = pd.DataFrame({"date": valid_df[columns['date_col']]}, index=valid_df.index)
+    for dim, key in (("media", "media_col"), ("creative", "creative_col")):
+        col = columns[key]
+        if col and col in valid_df.columns:
+            values = valid_df[col]
+            cube[dim] = values.astype(str).where(values.notna(), '')
+        else:
+            cube[dim] = ''
+    for metric, key in zip(CUBE_METRICS, ("imp_col", "click_col", "cost_col", "view_col")):
+        col = columns[key]
+        cube[metric] = valid_df[col] if col and col in valid_df.columns else 0.0
+    return cube.groupby(CUBE_DIMENSIONS, sort=False, observed=True)[CUBE_METRICS].sum().reset_index()
+
+
+def compute_campaign_aggregates(raw_df: pd.DataFrame, mix_df: pd.DataFrame, columns: Dict[str, Optional[str]],
+                                campaign_id: str, append: bool, db_path: str,
+                                comparisons: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """compute_aggregates for a stored campaign: the upload's dates are merged into the campaign cube
+    (append) or replace it (full upload), and today/prev/total come from the whole cube."""
+    timer = StageTimer(observe=False)
+    with timer.stage("clean_rows", rows=len(raw_df)):
+        valid_df = clean_rows(raw_df, columns)
+    with timer.stage("find_advertiser", rows=len(valid_df)):
+        adv_name = find_advertiser(valid_df, columns['advertiser_col'])
+    return merge_campaign(build_cube(valid_df, columns), adv_name, mix_df, campaign_id, append, db_path,
+                          comparisons, timer)
+
+
+def merge_campaign(upload_cube: pd.DataFrame, adv_name: str, mix_df: pd.DataFrame, campaign_id: str, append: bool,
+                   db_path: str, comparisons: Optional[List[Dict[str, Any]]], timer: StageTimer) -> Dict[str, Any]:
+    """Campaign half of compute_campaign_aggregates, from the upload's cube onwards"""
+    store = CampaignStore(db_path)
+    with timer.stage("campaign_merge", rows=len(upload_cube)) as record:
+        cube = store.merge(campaign_id, upload_cube, replace=not append)
+        record["rows"] = len(cube)
+    with timer.stage("summarize_rows", rows=len(cube)):
+        agg = summarize_rows(cube, CUBE_COLUMNS)
+    agg["stages"] = timer.records
+    if "error" in agg:
+        return agg
+
+    # Appended days often come without the advertiser column or the media-mix sheet; keep the stored ones
+    meta = store.get_meta(campaign_id)
+    if adv_name == DEFAULT_ADVERTISER and meta.get("advertiser"):
+        adv_name = meta["advertiser"]
+    if not mix_df.empty:
+        with timer.stage("compute_budget", rows=len(mix_df)):
+            budget_total, media_budget = compute_budget(mix_df)
+    else:
+        budget_total, media_budget = meta.get("budget_total") or 0, meta.get("media_budget") or {}
+    store.set_meta(campaign_id, adv_name, budget_total, media_budget)
+
+    agg["adv_name"] = adv_name
+    agg["budget_total"] = budget_total
+    agg["media_budget"] = media_budget
+    if comparisons:
+        with timer.stage("comparisons", rows=len(cube)):
+            agg["comparisons"] = compare_windows(cube, comparisons, agg["t_date"])
+    return agg
+
+
+def fold_chunks(chunks: Iterable[pd.DataFrame], columns: Dict[str, Optional[str]]) -> Tuple[pd.DataFrame, pd.Series, int]:
+    """Clean each chunk (already limited to the mapped columns) and fold it into one (date, media, creative) cube as it arrives, so memory follows
+    the number of distinct days x media x creatives, not the row count. Returns (cube, advertiser counts, rows read).
+    Every cleaning rule is per cell or per row, and every aggregate is a sum, so the cube matches the one
+    built from the whole sheet at once."""
+    cube, counts, rows = None, pd.Series(dtype='int64'), 0
+    for chunk in chunks:
+        rows += len(chunk)
+        valid_df = clean_rows(chunk, columns)
+        counts = counts.add(advertiser_counts(valid_df, columns['advertiser_col']), fill_value=0)
+        part = build_cube(valid_df, columns)
+        if cube is not None:
+            # sort=False keeps first-appearance order, which the media/creative lists follow
+            part = pd.concat([cube, part], ignore_index=True).groupby(
+                CUBE_DIMENSIONS, sort=False, observed=True)[CUBE_METRICS].sum().reset_index()
+        cube = part
+    if cube is None:
+        cube = pd.DataFrame(columns=CUBE_DIMENSIONS + CUBE_METRICS)
+    return cube, counts, rows
+
+
+def compute_upload_aggregates(upload: SheetUpload, mix_df: pd.DataFrame, columns: Dict[str, Optional[str]],
+                              chunk_rows: int, campaign_id: Optional[str] = None, append: bool = False,
+                              db_path: Optional[str] = None,
+                              comparisons: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """compute_aggregates / compute_campaign_aggregates for a sheet read from disk chunk by chunk"""
+    timer = StageTimer(observe=False)
+    with timer.stage("clean_chunks", bytes=upload.size) as record:
+        # Only the mapped columns are kept from each row, as it is read
+        chunks = upload.chunks(chunk_rows, kept_columns(upload.columns, columns))
+        cube, counts, record["rows"] = fold_chunks(chunks, columns)
+    adv_name = top_advertiser(counts)
+    if campaign_id:
+        return merge_campaign(cube, adv_name, mix_df, campaign_id, append, db_path, comparisons, timer)
+
+    with timer.stage("summarize_rows", rows=len(cube)):
+        agg = summarize_rows(cube, CUBE_COLUMNS)
+    if "error" not in agg:
+        agg["adv_name"] = adv_name
+        with timer.stage("compute_budget", rows=len(mix_df)):
+            agg["budget_total"], agg["media_budget"] = compute_budget(mix_df)
+        if comparisons:
+            with timer.stage("comparisons", rows=len(cube)):
+                agg["comparisons"] = compare_windows(cube, comparisons, agg["t_date"])
+    agg["stages"] = timer.records
+    return agg
+
+
+def summarize_rows(valid_df: pd.DataFrame, columns: Dict[str, Optional[str]]) -> Dict[str, Any]:
+    """today/prev/total for the whole frame and per media/creative; works on cleaned rows or a stored cube"""
+    d_col, m_col, c_col = columns['date_col'], columns['media_col'], columns['creative_col']
+    imp_col, cost_col, clk_col, v_col = columns['imp_col'], columns['cost_col'], columns['click_col'], columns['view_col']
+
+    # 3. Filtering & Dates
+    dates = sorted(valid_df[d_col].unique(), reverse=True)
+    if len(dates) < 1:
+        return {"error": "유효한 성과 데이터(노출/비용 등)가 있는 날짜가 없습니다."}
+
+    t_date = dates[0]
+    p_date = dates[1] if len(dates) > 1 else None
+
+    logger.info(f"Target Date: {t_date}, Prev Date: {p_date}")
+
+    def get_stats(df, target_date):
+        day_df = df[df[d_col] == target_date]
+        return {
+            "impressions": int(day_df[imp_col].sum()) if imp_col else 0,
+            "clicks": int(day_df[clk_col].sum()) if clk_col else 0,
+            "spend": int(day_df[cost_col].sum()) if cost_col else 0,
+            "views": int(day_df[v_col].sum()) if v_col else 0
+        }
+
+    def get_total_stats(df):
+        return {
+            "impressions": int(df[imp_col].sum()) if imp_col else 0,
+            "clicks": int(df[clk_col].sum()) if clk_col else 0,
+            "spend": int(df[cost_col].sum()) if cost_col else 0,
+            "views": int(df[v_col].sum()) if v_col else 0
+        }
+
+    overall_today = get_stats(valid_df, t_date)
+    overall_prev = get_stats(valid_df, p_date) if p_date else overall_today
+    overall_total = get_total_stats(valid_df)
+
+    # 4. Multi-level Analysis (Media & Creative)
+    metric_cols = {"impressions": imp_col, "clicks": clk_col, "spend": cost_col, "views": v_col}
+
+    def analyze_dimension(df, dim_col):
+        if not dim_col or dim_col not in df.columns: return []
+        keys = df[dim_col]
+        valid = keys.notna() & (keys.astype(str).str.strip() != '')
+        if not valid.any(): return []
+
+        # One grouped pass over (dimension, date) instead of filtering the frame per value
+        used = [k for k, col in metric_cols.items() if col]
+        frame = pd.DataFrame({k: df[metric_cols[k]] for k in used}, index=df.index)
+        frame["_dim"] = keys
+        frame["_date"] = df[d_col]
+        # observed=True: the dimension is categorical, and only combinations that occur are wanted
+        # (the pandas < 3 default would add a zero row for every unused category)
+        by_day = frame[valid].groupby(["_dim", "_date"], sort=False, observed=True)[used].sum()
+
+        totals = by_day.groupby(level="_dim", sort=False, observed=True).sum()
+        day_level = by_day.index.get_level_values("_date")
+
+        def day_slice(target_date):
+            return by_day[day_level == target_date].droplevel("_date").reindex(totals.index, fill_value=0)
+
+        t_day = day_slice(t_date)
+        p_day = day_slice(p_date) if p_date else t_day
+
+        def as_stats(frame):
+            records = frame.to_dict("index")
+            return {val: {k: int(rec.get(k, 0)) for k in metric_cols} for val, rec in records.items()}
+
+        t_stats, p_stats, tot_stats = as_stats(t_day), as_stats(p_day), as_stats(totals)
+
+        comparison = []
+        for val in totals.index:
+            t_s, p_s, tot_s = t_stats[val], p_stats[val], tot_stats[val]
+
+            p_imp = p_s['impressions']
+            delta = round(((t_s['impressions'] - p_imp) / p_imp * 100), 1) if p_imp > 0 else 0
+
+            comparison.append({
+                "name": str(val),
+                "metrics": {
+                    "impressions": {"today": t_s['impressions'], "prev": p_imp, "delta": delta, "total": tot_s['impressions']},
+                    "clicks": {"today": t_s['clicks'], "prev": p_s['clicks'], "total": tot_s['clicks']},
+                    "spend": {"today": t_s['spend'], "prev": p_s['spend'], "total": tot_s['spend']},
+                    "views": {"today": t_s['views'], "prev": p_s['views'], "total": tot_s['views']}
+                }
+            })
+        return comparison
+
+    media_results = analyze_dimension(valid_df, m_col)
+    creative_results = analyze_dimension(valid_df, c_col)
+
+    raw_total_spend = valid_df[cost_col].sum() if cost_col else 0
+
+    return {
+        "t_date": t_date,
+        "p_date": p_date,
+        "overall_today": overall_today,
+        "overall_prev": overall_prev,
+        "overall_total": overall_total,
+        "media_results": media_results,
+        "creative_results": creative_results,
+        "raw_total_spend": raw_total_spend,
+    }
+
+
+def advertiser_counts(valid_df: pd.DataFrame, adv_col: Optional[str]) -> pd.Series:
+    """Row count per advertiser name in the mapped (or a conventionally named) column"""
+    # [Improved] Advertiser Name Extraction
+    # 1. Try mapped column
+    if adv_col and adv_col in valid_df.columns:
+        found_col = adv_col
+    else:
+        # 2. Try heuristic search for "Advertiser" or "Client" or "광고주"
+        potential_adv_cols = [c for c in valid_df.columns if str(c).lower() in ADVERTISER_FALLBACK_COLUMNS]
+        if not potential_adv_cols:
+            return pd.Series(dtype='int64')
+        found_col = potential_adv_cols[0]
+    potential_names = valid_df[found_col].dropna().astype(str)
+    potential_names = potential_names[potential_names.str.strip() != '']
+    return potential_names.value_counts()
+
+
+def top_advertiser(counts: pd.Series) -> str:
+    """Most frequent name, ties going to the first in sort order (as Series.mode does)"""
+    if counts.empty:
+        return DEFAULT_ADVERTISER
+    return counts[counts == counts.max()].index.min()
+
+
+def find_advertiser(valid_df: pd.DataFrame, adv_col: Optional[str]) -> str:
+    """Most frequent advertiser name in the mapped (or a conventionally named) column"""
+    return top_advertiser(advertiser_counts(valid_df, adv_col))
+
+
+def _row_contains_any(df: pd.DataFrame, keywords) -> np.ndarray:
+    """Per row: does any cell, as lowercase text, contain one of the keywords.
+    Each distinct cell value is checked once per column instead of joining every row into a string."""
+    found = np.zeros(len(df), dtype=bool)
+    for col in df.columns:
+        codes, uniques = pd.factorize(df[col], use_na_sentinel=False)
+        hits = np.fromiter((any(k in str(v).lower() for k in keywords) for v in uniques), dtype=bool, count=len(uniques))
+        found |= hits[codes]
+    return found
+
+
+def _find_column(columns, keywords, exclude=()) -> Optional[str]:
+    for col in columns:
+        c_lower = str(col).lower()
+        if any(k in c_lower for k in keywords) and not any(ek in c_lower for ek in exclude):
+            return col
+    return None
+
+
+def compute_budget(mix_df: pd.DataFrame) -> Tuple[float, Dict[str, float]]:
+    """Budget over the media-mix execution rows (total rows excluded), overall and per media"""
+    # 5. Media Mix & Budget Analysis
+    budget_total = 0
+    media_budget: Dict[str, float] = {}
+    if not mix_df.empty:
+        # Priority mapping and exclusion logic for budget columns
+        budget_keywords = ['예산', 'budget', 'plan', '집행금액', '배정', 'gross', 'net', '광고비']
+        exclude_keywords = ['달성', 'attainment', 'rate', '비율', 'share', '비중', '차이']
+        media_keywords = ['매체', '채널', 'media', 'channel', 'publisher']
+
+        mix_budget_col = _find_column(mix_df.columns, budget_keywords, exclude_keywords)
+
+        if mix_budget_col:
+            logger.info(f"Targeting budget column: {mix_budget_col}")
+
+            # [Fix] Budget Calculation Logic Update
+            # User Request: "Find budget in mediamix sheet... incorrect values in summary"
+            # New Logic: EXCLUDE any row that looks like a Total/Sum row, and SUM everything else.
+
+            total_row_keywords = ['total', 'sum', '합계', '종합', '계']
+
+            # Filter mix_df to execute rows only
+            is_valid_row = ~_row_contains_any(mix_df, total_row_keywords)
+            budgets = clean_numeric_column(mix_df[mix_budget_col][is_valid_row])
+
+            # Calculate sum from valid executing rows
+            budget_total = budgets.sum()
+
+            logger.info(f"Calculated budget from individual execution rows: {budget_total}")
+
+            # Per-media split of the same rows, for mediaBudgetMap
+            mix_media_col = _find_column([c for c in mix_df.columns if c != mix_budget_col], media_keywords, exclude_keywords)
+            if mix_media_col:
+                names = mix_df[mix_media_col][is_valid_row]
+                named = names.notna() & (names.astype(str).str.strip() != '')
+                by_media = budgets[named].groupby(names[named].astype(str).str.strip(), sort=False).sum()
+                media_budget = {name: float(value) for name, value in by_media.items()}
+
+        else:
+            logger.warning("No suitable budget column found in Media Mix sheet.")
+
+    return budget_total, media_budget
@@ -1,85 +1,151 @@
-import warnings
-warnings.filterwarnings("ignore", category=FutureWarning, module="google.generativeai")
-import google.generativeai as genai
 from backend.core.config import settings
 import logging
+import hashlib
 import json
-from duckduckgo_search import DDGS
+import asyncio
+import threading
+import time
+from typing import Optional, Tuple
+from backend.core.cache import TieredCache
+from backend.core.metrics import observe_stage, timed
+from backend.core.ratelimit import RateLimiter
+from backend.services.llm_providers import LLMProvider, create_provider
+from backend.services.prompts import insight_prompt, report_prompt, summary_prompt
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_BRAND_COLOR = "#4f46e5"
+INSIGHT_ERROR_MESSAGE = "인사이트 생성 중 오류가 발생했습니다."
+SUMMARY_ERROR_MESSAGE = "분석 결과 요약을 생성할 수 없습니다."
+
+
+def normalize_brand_name(name: str) -> str:
+    return " ".join(str(name).split()).lower()
+
+
+def _prompt_key(prompt: str, json_output: bool = False) -> str:
+    return hashlib.sha256(f"{settings.LLM_MODEL}\0{int(json_output)}\0{prompt}".encode("utf-8")).hexdigest()
+
+
+def _parse_json(text: str):
+    # JSON parsing with cleanup (models sometimes wrap it in a code fence)
+    return json.loads(text.replace("```json", "").replace("```", "").strip())
+
 class AIService:
-    def __init__(self):
-        if settings.LLM_API_KEY:
-            genai.configure(api_key=settings.LLM_API_KEY)
-        self.model = genai.GenerativeModel(settings.LLM_MODEL)
+    def __init__(self, provider: Optional[LLMProvider] = None):
+        # LLM_PROVIDER picks the vendor ("gemini"), or "stub" for offline load tests.
+        # Built on first use or by warm_up(): the vendor SDK import dominates backend startup.
+        self._provider = provider
+        self._provider_lock = threading.Lock()
+        self.brand_cache = TieredCache(
+            "brand_colors",
+            maxsize=settings.BRAND_CACHE_SIZE,
+            ttl=settings.BRAND_COLOR_TTL,
+            db_path=settings.CACHE_DB_PATH,
+        )
+        self._brand_inflight: dict = {}
+        self.llm_cache = TieredCache(
+            "llm_responses",
+            maxsize=settings.LLM_CACHE_SIZE,
+            ttl=settings.LLM_CACHE_TTL,
+            db_path=settings.CACHE_DB_PATH,
+        )
+        self.llm_queue = RateLimiter(settings.LLM_MAX_CONCURRENCY, settings.LLM_RATE_PER_MINUTE)
+
+    @property
+    def provider(self) -> LLMProvider:
+        if self._provider is None:
+            with self._provider_lock:
+                if self._provider is None:
+                    self._provider = create_provider()
+        return self._provider
+
+    async def warm_up(self):
+        """Build the provider in a worker thread, so neither startup nor the first request blocks the
+        event loop on the SDK import; safe to call concurrently and after the provider exists.
+        Failures are only logged: the next provider access raises them to the caller."""
+        if self._provider is None:
+            try:
+                with timed("ai", "warm_up"):
+                    await asyncio.to_thread(lambda: self.provider)
+            except Exception as e:
+                logger.error(f"LLM provider warm-up failed: {str(e)}")
+
+    def close(self):
+        if self._provider is not None:
+            self._provider.close()
+
+    async def _generate(self, prompt: str, call: str = "generate", json_output: bool = False) -> str:
+        """Run one model call on the async client, bounded by LLM_TIMEOUT; timed as ai_stage_*{stage=call}.
+        Responses are cached by prompt hash, so an unchanged prompt never reaches the model twice.
+        Calls queue in llm_queue (LLM_MAX_CONCURRENCY / LLM_RATE_PER_MINUTE); the wait is timed as llm_queue."""
+        key = _prompt_key(prompt, json_output)
+        cached = self.llm_cache.get(key)
+        if cached is not None:
+            return cached
+        await self.warm_up()
+        queued_at = time.perf_counter()
+        async with self.llm_queue.slot():
+            observe_stage("ai", {"stage": "llm_queue", "ms": round((time.perf_counter() - queued_at) * 1000, 3)})
+            with timed("ai", call, bytes=len(prompt.encode("utf-8"))) as record:
+                try:
+                    text = await asyncio.wait_for(
+                        self.provider.generate(prompt, call=call, json_output=json_output), timeout=settings.LLM_TIMEOUT
+                    )
+                except asyncio.TimeoutError:
+                    raise TimeoutError(f"LLM call exceeded {settings.LLM_TIMEOUT}s") from None
+                record["bytes"] += len(text.encode("utf-8"))
+        if text and text.strip():
+            self.llm_cache.set(key, text)
+        return text
+
+    async def _search(self, query: str, max_results: int = 3) -> list:
+        """Run a web search through the provider, bounded by SEARCH_TIMEOUT"""
+        await self.warm_up()
+        with timed("ai", "web_search") as record:
+            try:
+                results = await asyncio.wait_for(self.provider.search(query, max_results), timeout=settings.SEARCH_TIMEOUT)
+            except asyncio.TimeoutError:
+                raise TimeoutError(f"Web search exceeded {settings.SEARCH_TIMEOUT}s") from None
+            record["rows"] = len(results or [])
+            return results
 
     async def generate_insight(self, data: dict) -> str:
-        prompt = f"""
-        당신은 광고 대행사 보고서 전문가입니다. 다음 광고 집행 결과를 분석하여 간결한 캠페인 코멘트를 작성하세요.
-        
-        [데이터]
-        {json.dumps(data, ensure_ascii=False, indent=2, default=lambda o: int(o) if hasattr(o, 'item') else str(o))}
-        
-        작성 규칙:
-        1. **매체별 현황** 섹션을 먼저 작성
-           - 각 상위 3개 매체를 개별 소제목으로 구분 (예: "1. 네이버 GFA", "2. 크로스타겟")
-           - 각 매체마다 ㄴ 기호로 2-3개 핵심 지표만 간결하게 정리
-           - CPC, CTR, CPV 등 핵심 효율 지표 위주로 언급
-           - "제안 대비 XX원 낮은/높은 평균 XX원" 형식 사용
-           - DMP 또는 특정 타겟에서의 효율 언급
-        
-        2. **캠페인 코멘트** 섹션을 마지막에 작성
-           - "전체현황" 하위에 2-3줄 요약
-           - 특이사항이나 주목할 매체가 있다면 "매체별 현황" 하위에 간략히 추가
-        
-        3. 형식 요구사항:
-           - 전체 길이는 10줄 이내로 최대한 간결하게
-           - 불필요한 서론이나 결론 없이 핵심만
-           - 정량적 수치 위주로 작성
-           - 매우 전문적이고 간결한 톤 유지
-        
-        예시 참고:
-        ```
-        1. 네이버 GFA
-        ㄴ CPC의 경우 제안 대비 543원 낮은 평균 346원에 진행 중 입니다.
-        ㄴ 평균 CTR은 제안 대비 0.46% 상승된 0.66%로 진행 중 입니다.
-        
-        캠페인 코멘트
-        
-        전체현황
-        캠페인 별도 이슈없이 진행 중 입니다.
-        매우 우수한 CPC단가로 운영 중 입니다.
-        ```
-        """
+        prompt = insight_prompt(data, settings.LLM_CONTEXT_TOKENS)
         try:
-            response = self.model.generate_content(prompt)
-            return response.text
+            return await self._generate(prompt, "generate_insight")
         except Exception as e:
             logger.error(f"Error generating insight: {str(e)}")
-            return "인사이트 생성 중 오류가 발생했습니다."
+            return INSIGHT_ERROR_MESSAGE
 
     async def generate_summary(self, insight: str) -> str:
-        prompt = f"""
-        다음 캠페인 코멘트를 2-3줄로 핵심만 요약하세요:
-        ---
-        {insight}
-        ---
-        
-        요구사항:
-        - 최대 3줄, 각 줄은 한 문장으로 간결하게
-        - 캠페인 운영 상태, 주요 효율 지표, 특이사항만 언급
-        - "~ 진행 중입니다", "~ 운영 중입니다" 형식 사용
-        - 숫자와 핵심 결과 위주로 작성
-        
-        예시: "크로스타겟 캠페인은 VTR 70% 이상으로 CPV 단가가 절감되었습니다. 크로스타겟 상품의 CTR은 최근 2일간 2% 이상으로 대폭 상승했습니다."
-        """
         try:
-            response = self.model.generate_content(prompt)
-            return response.text.strip()
+            text = await self._generate(summary_prompt(insight), "generate_summary")
+            return text.strip()
         except Exception as e:
             logger.error(f"Error generating summary: {str(e)}")
-            return "분석 결과 요약을 생성할 수 없습니다."
+            return SUMMARY_ERROR_MESSAGE
+
+    async def generate_report(self, data: dict) -> Tuple[str, str]:
+        """Insight and 3-line summary from one structured-output call instead of two serial ones"""
+        prompt = report_prompt(data, settings.LLM_CONTEXT_TOKENS)
+        try:
+            text = await self._generate(prompt, "generate_report", json_output=True)
+        except Exception as e:
+            logger.error(f"Error generating report: {str(e)}")
+            return INSIGHT_ERROR_MESSAGE, SUMMARY_ERROR_MESSAGE
+        try:
+            parsed = _parse_json(text)
+            insight, summary = str(parsed["insight"]).strip(), str(parsed["summary"]).strip()
+        except (ValueError, KeyError, TypeError):
+            # Unusable structure: don't keep it cached, fall back to the two-step path
+            logger.warning("Structured report response was not valid JSON; generating separately")
+            self.llm_cache.delete(_prompt_key(prompt, json_output=True))
+            insight = await self.generate_insight(data)
+            return insight, await self.generate_summary(insight)
+        if not insight:
+            return INSIGHT_ERROR_MESSAGE, SUMMARY_ERROR_MESSAGE
+        return insight, summary or SUMMARY_ERROR_MESSAGE
 
     async def detect_columns(self, columns: list) -> dict:
         prompt = f"""
@@ -99,19 +165,32 @@ class AIService:
         {{ "date_col": "...", "media_col": "...", "creative_col": "...", "imp_col": "...", "view_col": "...", "cost_col": "...", "click_col": "...", "advertiser_col": "..." }}
         """
         try:
-            response = self.model.generate_content(prompt)
-            # JSON parsing with cleanup
-            text = response.text.replace("```json", "").replace("```", "").strip()
-            return json.loads(text)
+            text = await self._generate(prompt, "detect_columns")
+            return _parse_json(text)
         except Exception as e:
             logger.error(f"Error detecting columns: {str(e)}")
             return {}
 
     async def recommend_brand_color(self, name: str) -> str:
+        key = normalize_brand_name(name)
+        cached = self.brand_cache.get(key)
+        if cached is not None:
+            return cached
+
+        # Coalesce concurrent lookups for the same advertiser into one search + LLM call.
+        # shield() keeps one cancelled caller from aborting the lookup the others are waiting on.
+        task = self._brand_inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._lookup_brand_color(key, name))
+            self._brand_inflight[key] = task
+            task.add_done_callback(lambda _: self._brand_inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _lookup_brand_color(self, key: str, name: str) -> str:
         # 1. Web Search for Brand Color
         search_context = ""
         try:
-            results = DDGS().text(f"{name} brand color hex code", max_results=3)
+            results = await self._search(f"{name} brand color hex code", max_results=3)
             search_context = "\n".join([f"- {r['title']}: {r['body']}" for r in results])
             logger.info(f"Brand color search results for {name}: {search_context}")
         except Exception as e:
@@ -129,18 +208,27 @@ class AIService:
         2. 검색 결과가 없다면 당신의 지식이나 브랜드 이미지를 추론하여 선정하세요.
         3. 답은 반드시 #으로 시작하는 HEX 코드만 작성하세요. (예: #004dae)
         
-        만약 도저히 알 수 없다면, 신뢰감을 주는 비즈니스 블루(#4f46e5)를 반환하세요.
+        만약 도저히 알 수 없다면, 신뢰감을 주는 비즈니스 블루({DEFAULT_BRAND_COLOR})를 반환하세요.
         """
         try:
-            response = self.model.generate_content(prompt)
-            color = response.text.strip()
+            text = await self._generate(prompt, "brand_color")
+            color = text.strip()
             
             # Simple cleanup to ensure only hex code
             import re
-            match = re.search(r'#(?:[0-9a-fA-F]{3,4}){1,2}', color)
-            return match.group(0) if match else "#4f46e5"
+            # Longest form first: a 6-digit code must not match as its 4-digit prefix
+            match = re.search(r'#(?:[0-9a-fA-F]{8}|[0-9a-fA-F]{6}|[0-9a-fA-F]{3,4})(?![0-9a-fA-F])', color)
         except Exception as e:
             logger.error(f"Error recommending color: {str(e)}")
-            return "#4f46e5"
+            match = None
+
+        if match:
+            self.brand_cache.set(key, match.group(0))
+            return match.group(0)
+        # Negative entry: retry sooner than a real answer, but not on every request. The unusable reply
+        # must not stay in llm_cache either, or the retry would just get it back for a day
+        self.llm_cache.delete(_prompt_key(prompt))
+        self.brand_cache.set(key, DEFAULT_BRAND_COLOR, ttl=settings.BRAND_COLOR_NEGATIVE_TTL)
+        return DEFAULT_BRAND_COLOR
 
 ai_service = AIService()
@@ -1,46 +1,133 @@
 import pandas as pd
-import re
+import asyncio
+import hashlib
+import json
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Union
 from backend.models.analysis import AnalysisRequest, AnalysisResponse
 from backend.events.bus import event_bus
+from backend.core.cache import TieredCache
+from backend.core.config import settings
+from backend.core.executor import run_cpu_bound
+from backend.core.metrics import StageTimer, timed
+from backend.services.aggregation import (
+    compute_aggregates, compute_campaign_aggregates, compute_upload_aggregates, prune_columns,
+)
+from backend.services.cleaning import robust_to_numeric
+from backend.services.column_mapper import column_mapper
+from backend.services.workbook import SheetUpload
 
 logger = logging.getLogger(__name__)
 
+
+def result_cache_key(raw_df: Union[pd.DataFrame, SheetUpload], mix_df: pd.DataFrame, mappings: Dict[str, Any],
+                     comparisons: Optional[List[Dict[str, Any]]] = None) -> Optional[str]:
+    """Stable content hash of an analysis input (same sheet + mappings -> same key, on either upload path).
+    A streamed workbook is keyed by its file digest and sheet instead of its cells."""
+    digest = hashlib.sha256()
+    try:
+        for df in (raw_df, mix_df):
+            if isinstance(df, SheetUpload):
+                digest.update(json.dumps(["sheet", df.fmt, df.sheet, df.digest], ensure_ascii=False).encode("utf-8"))
+                continue
+            digest.update(json.dumps([str(c) for c in df.columns], ensure_ascii=False).encode("utf-8"))
+            if len(df):
+                digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+        digest.update(json.dumps(mappings, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8"))
+        if comparisons:
+            # Only hashed when present, so plain analyses keep their existing keys
+            digest.update(json.dumps(comparisons, sort_keys=True, default=str).encode("utf-8"))
+    except TypeError:
+        # Unhashable cells (nested objects): analyze without caching
+        return None
+    return digest.hexdigest()
+
+
 class AnalysisService:
+    def __init__(self):
+        self.result_cache = TieredCache(
+            "analysis_results",
+            maxsize=settings.RESULT_CACHE_SIZE,
+            ttl=settings.RESULT_CACHE_TTL,
+            db_path=settings.CACHE_DB_PATH,
+            disk_max_rows=settings.RESULT_CACHE_DISK_ROWS,
+        )
+
     def robust_to_numeric(self, val):
         """Convert value to numeric, handling currency symbols and commas"""
-        if pd.isna(val) or val == '' or str(val).strip() == '-': 
-            return 0
-        if isinstance(val, (int, float)): 
-            # Always return as integer for cost/metrics
-            return int(round(val))
-        try:
-            # Remove currency symbols, commas, and other non-numeric characters
-            cleaned = re.sub(r'[^\d.-]', '', str(val))
-            if not cleaned or cleaned == '-':
-                return 0
-            # Convert to float first, then round to integer for accuracy
-            num_val = float(cleaned)
-            return int(round(num_val))
-        except: 
-            return 0
-
-    async def analyze_data(self, req: AnalysisRequest) -> Dict[str, Any]:
-        await event_bus.emit("analysis_started", {"data": "Analysis process initiated"})
+        return robust_to_numeric(val)
+
+    async def _timed_brand_color(self, timer: StageTimer, adv_name: str) -> str:
+        from backend.services.ai_service import ai_service
+        with timer.stage("brand_color"):
+            return await ai_service.recommend_brand_color(adv_name)
+
+    async def analyze_data(self, req: AnalysisRequest, channel_id: Optional[str] = None) -> Dict[str, Any]:
+        with timed("analysis", "build_frames", rows=len(req.raw_rows)):
+            raw_df, mix_df = pd.DataFrame(req.raw_rows), pd.DataFrame(req.mix_rows)
+        return await self.analyze_frames(
+            raw_df, mix_df, req.mappings,
+            channel_id=channel_id or req.channel_id, refresh=req.refresh,
+            campaign_id=req.campaign_id, append=req.append,
+            comparisons=[c.model_dump() for c in req.comparisons] if req.comparisons else None,
+        )
+
+    async def analyze_frames(self, raw_df: pd.DataFrame, mix_df: pd.DataFrame, mappings: Dict[str, Any],
+                             channel_id: Optional[str] = None, refresh: bool = False,
+                             campaign_id: Optional[str] = None, append: bool = False,
+                             comparisons: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """Run the analysis on already-loaded frames (JSON rows or a columnar upload).
+        Progress events go to channel_id, so /stream?channel=<id> only sees this analysis.
+        Identical inputs are answered from the result cache unless refresh is set.
+        With campaign_id the daily aggregates are stored; append=True sends only new or changed days.
+        comparisons adds week-over-week / month-to-date / custom windows next to today vs prev."""
+        timer = StageTimer()
+        with timer.stage("total", rows=len(raw_df)):
+            return await self._run_analysis(raw_df, mix_df, mappings, channel_id, refresh, campaign_id, append,
+                                            comparisons, timer)
+
+    async def analyze_upload(self, upload: SheetUpload, mix_df: pd.DataFrame, mappings: Dict[str, Any],
+                             channel_id: Optional[str] = None, refresh: bool = False,
+                             campaign_id: Optional[str] = None, append: bool = False,
+                             comparisons: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """analyze_frames for an inspected workbook sheet on disk: it is never loaded whole, the worker
+        reads, cleans and aggregates it INGEST_CHUNK_ROWS rows at a time"""
+        timer = StageTimer()
+        with timer.stage("total", bytes=upload.size):
+            return await self._run_analysis(upload, mix_df, mappings, channel_id, refresh, campaign_id, append,
+                                            comparisons, timer)
+
+    async def _run_analysis(self, raw_df: Union[pd.DataFrame, SheetUpload], mix_df: pd.DataFrame, mappings: Dict[str, Any],
+                            channel_id: Optional[str], refresh: bool, campaign_id: Optional[str], append: bool,
+                            comparisons: Optional[List[Dict[str, Any]]], timer: StageTimer) -> Dict[str, Any]:
+        await event_bus.emit("analysis_started", {"data": "Analysis process initiated"}, channel=channel_id)
+        brand_task = None
         
         try:
-            raw_df = pd.DataFrame(req.raw_rows)
             if raw_df.empty:
                 return {"error": "데이터가 비어있습니다."}
-
-            # 1. Column Detection (AI fallback)
-            from backend.services.ai_service import ai_service
+            if append and not campaign_id:
+                return {"error": "append 모드에는 campaign_id가 필요합니다."}
+
+            # Campaign results depend on the stored days as well, so they are never served from the cache
+            cache_key = result_cache_key(raw_df, mix_df, mappings, comparisons) if not campaign_id else None
+            with timer.stage("result_cache"):
+                cached = self.result_cache.get(cache_key) if cache_key and not refresh else None
+            if cached is not None:
+                logger.info(f"Result cache hit: {cache_key[:12]}")
+                await event_bus.emit("status_update", {"message": "캐시된 분석 결과를 반환합니다.", "stages": timer.breakdown()}, channel=channel_id)
+                await event_bus.emit("data_processed", {"date": cached["date"]}, channel=channel_id)
+                await event_bus.emit("analysis_completed", cached, channel=channel_id)
+                return dict(cached)
+
+            # 1. Column Detection (cached by header signature, keyword match, AI fallback)
+            from backend.services.ai_service import ai_service, INSIGHT_ERROR_MESSAGE, SUMMARY_ERROR_MESSAGE
             cols = list(raw_df.columns)
-            ai_map = await ai_service.detect_columns(cols)
+            with timer.stage("column_detection", rows=len(cols)):
+                ai_map = await column_mapper.detect(cols)
             
             # Merge provided mapping with AI detection
-            r_map = req.mappings.get('raw_mapping', {})
+            r_map = mappings.get('raw_mapping', {})
             d_col = ai_map.get('date_col') or r_map.get('date_col')
             m_col = ai_map.get('media_col') or r_map.get('media_col')
             c_col = ai_map.get('creative_col') or r_map.get('creative_col')
@@ -58,181 +145,48 @@ class AnalysisService:
             
             if missing:
                 err_msg = f"필수 컬럼을 찾을 수 없습니다: {', '.join(missing)}"
-                await event_bus.emit("analysis_error", {"error": err_msg})
+                await event_bus.emit("analysis_error", {"error": err_msg}, channel=channel_id)
                 return {"error": err_msg}
 
-            # 2. Cleaning & Strict Filtering
-            # [Fix] Parse date strictly to prevent timezone shifting
-            def parse_date_safe(val):
-                if pd.isna(val) or val == '' or str(val).strip() == '':
-                    return None
-                    
-                # If already a date/datetime object
-                if hasattr(val, 'date'):
-                    return val.date() if callable(val.date) else val
-                
-                # If string, try to parse
-                s_val = str(val).strip()
-                try:
-                    # Basic string parse - avoid pd.to_datetime's timezone defaults if possible for pure dates
-                    # But pd.to_datetime is robust for formats. We use it but Strip TZ immediately.
-                    dt = pd.to_datetime(s_val, errors='coerce')
-                    if pd.isna(dt):
-                        return None
-                    return dt.date()
-                except:
-                    return None
-
-            raw_df[d_col] = raw_df[d_col].apply(parse_date_safe)
-            raw_df = raw_df.dropna(subset=[d_col])
-            
-            numeric_cols = [imp_col, cost_col, clk_col, v_col]
-            for col in numeric_cols:
-                if col and col in raw_df.columns:
-                    raw_df[col] = raw_df[col].apply(self.robust_to_numeric)
-
-            # [New] Filter out rows where all performance metrics are 0
-            # If a row has date but no impressions, clicks, spend, or views, it's invalid
-            valid_perf_mask = pd.Series(False, index=raw_df.index)
-            for col in numeric_cols:
-                if col and col in raw_df.columns:
-                    valid_perf_mask |= (raw_df[col] > 0)
-            
-            raw_df = raw_df[valid_perf_mask]
-
-            # 3. Filtering & Dates
-            valid_df = raw_df.copy()
-            dates = sorted(valid_df[d_col].unique(), reverse=True)
-            if len(dates) < 1:
-                return {"error": "유효한 성과 데이터(노출/비용 등)가 있는 날짜가 없습니다."}
-            
-            t_date = dates[0]
-            p_date = dates[1] if len(dates) > 1 else None
-            
-            logger.info(f"Target Date: {t_date}, Prev Date: {p_date}")
-            await event_bus.emit("data_processed", {"date": str(t_date)})
-
-            def get_stats(df, target_date):
-                day_df = df[df[d_col] == target_date]
-                return {
-                    "impressions": int(day_df[imp_col].sum()) if imp_col else 0,
-                    "clicks": int(day_df[clk_col].sum()) if clk_col else 0,
-                    "spend": int(day_df[cost_col].sum()) if cost_col else 0,
-                    "views": int(day_df[v_col].sum()) if v_col else 0
-                }
-
-            def get_total_stats(df):
-                return {
-                    "impressions": int(df[imp_col].sum()) if imp_col else 0,
-                    "clicks": int(df[clk_col].sum()) if clk_col else 0,
-                    "spend": int(df[cost_col].sum()) if cost_col else 0,
-                    "views": int(df[v_col].sum()) if v_col else 0
-                }
-
-            overall_today = get_stats(valid_df, t_date)
-            overall_prev = get_stats(valid_df, p_date) if p_date else overall_today
-            overall_total = get_total_stats(valid_df)
-
-            # 4. Multi-level Analysis (Media & Creative)
-            def analyze_dimension(df, dim_col):
-                if not dim_col or dim_col not in df.columns: return []
-                comparison = []
-                for val in df[dim_col].unique():
-                    if pd.isna(val) or str(val).strip() == '': continue
-                    sub_df = df[df[dim_col] == val]
-                    t_s = get_stats(sub_df, t_date)
-                    p_s = get_stats(sub_df, p_date) if p_date else t_s
-                    tot_s = get_total_stats(sub_df)
-                    
-                    p_imp = p_s['impressions']
-                    delta = round(((t_s['impressions'] - p_imp) / p_imp * 100), 1) if p_imp > 0 else 0
-                    
-                    comparison.append({
-                        "name": str(val),
-                        "metrics": {
-                            "impressions": {"today": t_s['impressions'], "prev": p_imp, "delta": delta, "total": tot_s['impressions']},
-                            "clicks": {"today": t_s['clicks'], "prev": p_s['clicks'], "total": tot_s['clicks']},
-                            "spend": {"today": t_s['spend'], "prev": p_s['spend'], "total": tot_s['spend']},
-                            "views": {"today": t_s['views'], "prev": p_s['views'], "total": tot_s['views']}
-                        }
-                    })
-                return comparison
-
-            media_results = analyze_dimension(valid_df, m_col)
-            creative_results = analyze_dimension(valid_df, c_col)
-
-            # [Improved] Advertiser Name Extraction
-            adv_name = "Nasmedia"
-            
-            # 1. Try mapped column
-            if adv_col and adv_col in valid_df.columns:
-                potential_names = valid_df[adv_col].dropna().astype(str)
-                potential_names = potential_names[potential_names.str.strip() != '']
-                if not potential_names.empty:
-                    adv_name = potential_names.mode().iloc[0]
+            # 2-5. Cleaning, aggregation and budget parsing run off the event loop
+            columns = {
+                "date_col": d_col, "media_col": m_col, "creative_col": c_col, "imp_col": imp_col,
+                "cost_col": cost_col, "click_col": clk_col, "view_col": v_col, "advertiser_col": adv_col,
+            }
+            if isinstance(raw_df, SheetUpload):
+                # The worker prunes each chunk as it reads it
+                with timer.stage("aggregation", bytes=raw_df.size):
+                    agg = await run_cpu_bound(
+                        compute_upload_aggregates, raw_df, mix_df, columns, settings.INGEST_CHUNK_ROWS,
+                        campaign_id, append, settings.CAMPAIGN_DB_PATH, comparisons,
+                    )
             else:
-                # 2. Try heuristic search for "Advertiser" or "Client" or "광고주"
-                potential_adv_cols = [c for c in valid_df.columns if str(c).lower() in ['advertiser', 'client', '광고주', '광고주명']]
-                if potential_adv_cols:
-                    found_col = potential_adv_cols[0]
-                    potential_names = valid_df[found_col].dropna().astype(str)
-                    potential_names = potential_names[potential_names.str.strip() != '']
-                    if not potential_names.empty:
-                        adv_name = potential_names.mode().iloc[0]
-            
-            await event_bus.emit("status_update", {"message": f"브랜드({adv_name}) 분석 및 컬러 검색 중..."})
-            brand_color = await ai_service.recommend_brand_color(adv_name)
-
-            # 5. Media Mix & Budget Analysis
-            mix_df = pd.DataFrame(req.mix_rows)
-            budget_total = 0
-            if not mix_df.empty:
-                # Priority mapping and exclusion logic for budget columns
-                budget_keywords = ['예산', 'budget', 'plan', '집행금액', '배정', 'gross', 'net', '광고비']
-                exclude_keywords = ['달성', 'attainment', 'rate', '비율', 'share', '비중', '차이']
-                
-                mix_budget_col = None
-                for col in mix_df.columns:
-                    c_lower = str(col).lower()
-                    if any(k in c_lower for k in budget_keywords) and not any(ek in c_lower for ek in exclude_keywords):
-                        mix_budget_col = col
-                        break
-                
-                if mix_budget_col:
-                    logger.info(f"Targeting budget column: {mix_budget_col}")
-                    
-                    # [Fix] Budget Calculation Logic Update
-                    # User Request: "Find budget in mediamix sheet... incorrect values in summary"
-                    # New Logic: EXCLUDE any row that looks like a Total/Sum row, and SUM everything else.
-                    
-                    total_row_keywords = ['total', 'sum', '합계', '종합', '계']
-                    
-                    # created a boolean mask for rows that are NOT total rows
-                    is_valid_row = []
-                    for _, row in mix_df.iterrows():
-                        # Create a string representation of the row to check for keywords
-                        row_str = " ".join(str(v).lower() for v in row.values)
-                        
-                        # If row contains total keywords, mark as False (exclude)
-                        if any(tk in row_str for tk in total_row_keywords):
-                            is_valid_row.append(False)
-                        else:
-                            is_valid_row.append(True)
-                            
-                    # Filter mix_df to execute rows only
-                    execution_df = mix_df[is_valid_row].copy()
-                    
-                    # Calculate sum from valid executing rows
-                    execution_df[mix_budget_col] = execution_df[mix_budget_col].apply(self.robust_to_numeric)
-                    budget_total = execution_df[mix_budget_col].sum()
-                    
-                    logger.info(f"Calculated budget from individual execution rows: {budget_total}")
-                        
-                else:
-                    logger.warning("No suitable budget column found in Media Mix sheet.")
-
+                # Unmapped columns are dropped here, before anything is cleaned, copied or sent to a worker
+                raw_df = prune_columns(raw_df, columns)
+                # Wall time including the hand-off to the executor; the worker's own stages come back in agg
+                with timer.stage("aggregation", rows=len(raw_df)):
+                    if campaign_id:
+                        agg = await run_cpu_bound(
+                            compute_campaign_aggregates, raw_df, mix_df, columns,
+                            campaign_id, append, settings.CAMPAIGN_DB_PATH, comparisons,
+                        )
+                    else:
+                        agg = await run_cpu_bound(compute_aggregates, raw_df, mix_df, columns, comparisons)
+            timer.add(agg.pop("stages", []))
+            if "error" in agg:
+                return {"error": agg["error"]}
+
+            t_date, p_date = agg["t_date"], agg["p_date"]
+            overall_today, overall_prev, overall_total = agg["overall_today"], agg["overall_prev"], agg["overall_total"]
+            media_results, creative_results = agg["media_results"], agg["creative_results"]
+            adv_name, budget_total, raw_total_spend = agg["adv_name"], agg["budget_total"], agg["raw_total_spend"]
+            media_budget = agg["media_budget"]
+            await event_bus.emit("data_processed", {"date": str(t_date)}, channel=channel_id)
+
+            await event_bus.emit("status_update", {"message": f"브랜드({adv_name}) 분석 및 컬러 검색 중...", "stages": timer.breakdown()}, channel=channel_id)
+            # Brand color is independent of the insight; let the lookup overlap with the LLM calls below
+            brand_task = asyncio.create_task(self._timed_brand_color(timer, adv_name))
 
-            raw_total_spend = valid_df[cost_col].sum() if cost_col else 0
             budget_achievement = (raw_total_spend / budget_total * 100) if budget_total > 0 else 0
 
             # 6. AI Optimization
@@ -260,26 +214,38 @@ class AnalysisService:
                     "views": {"today": overall_today['views'], "prev": overall_prev['views'], "total": overall_total['views']}
                 },
                 "budgetTotal": int(budget_total),
+                "mediaBudgetMap": media_budget,
                 "totalSpend": int(raw_total_spend),
                 "budgetAchievement": round(budget_achievement, 1),
                 "advertiser": adv_name,
-                "brandColor": brand_color
+                "brandColor": None
             }
+            if campaign_id:
+                result["campaignId"] = campaign_id
+            if comparisons:
+                result["comparisons"] = agg["comparisons"]
             
-            await event_bus.emit("status_update", {"message": "AI 인사이트 생성 중..."})
-            insight = await ai_service.generate_insight(summary_for_ai)
+            await event_bus.emit("status_update", {"message": "AI 인사이트 생성 중...", "stages": timer.breakdown()}, channel=channel_id)
+            # Insight and its 3-line summary come back from a single model call
+            with timer.stage("insight"):
+                insight, insight_summary = await ai_service.generate_report(summary_for_ai)
             result["insight"] = insight
-            
-            # Generate 3-line summary
-            insight_summary = await ai_service.generate_summary(insight)
             result["insight_summary"] = insight_summary
 
-            await event_bus.emit("analysis_completed", result)
+            result["brandColor"] = await brand_task
+            await event_bus.emit("status_update", {"message": "리포트 생성 완료", "stages": timer.breakdown()}, channel=channel_id)
+
+            # Don't pin LLM failures for the whole TTL; those inputs are retried next time
+            if cache_key and insight != INSIGHT_ERROR_MESSAGE and insight_summary != SUMMARY_ERROR_MESSAGE:
+                self.result_cache.set(cache_key, result)
+
+            await event_bus.emit("analysis_completed", result, channel=channel_id)
             return result
 
         except Exception as e:
             logger.error(f"Analysis error: {str(e)}", exc_info=True)
-            await event_bus.emit("analysis_error", {"error": str(e)})
+            if brand_task: brand_task.cancel()
+            await event_bus.emit("analysis_error", {"error": str(e)}, channel=channel_id)
             return {"error": f"분석 오류: {str(e)}"}
 
 
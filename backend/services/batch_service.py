@@ -0,0 +1,69 @@
+import asyncio
+import logging
+import time
+from typing import Any, AsyncIterator, Dict, List
+from pydantic import ValidationError
+from backend.core.config import settings
+from backend.events.bus import new_channel_id
+from backend.models.analysis import AnalysisRequest
+
+logger = logging.getLogger(__name__)
+
+
+def _describe(error: ValidationError, limit: int = 3) -> str:
+    """The first few field errors as "loc: message"; raw_rows can hold thousands of them"""
+    details = error.errors(include_url=False)
+    parts = [f"{'.'.join(str(p) for p in d['loc']) or 'item'}: {d['msg']}" for d in details[:limit]]
+    if len(details) > limit:
+        parts.append(f"외 {len(details) - limit}건")
+    return "; ".join(parts)
+
+
+class BatchService:
+    """Runs many analyses with bounded parallelism and yields each result as soon as it is done.
+    Items share the process-wide column mapping, brand color, LLM and result caches and the LLM queue,
+    so a morning run of one report template pays for detection and brand lookups once per distinct input."""
+
+    async def run(self, items: List[Dict[str, Any]]) -> AsyncIterator[Dict[str, Any]]:
+        """Yields one dict per item in completion order ({"index", "channelId", ...result},
+        {"index", "channelId", "error"}, or {"index", "error"} for an item that is not a valid
+        AnalysisRequest), then a {"batch": {...}} summary line"""
+        from backend.services.analysis_service import analysis_service
+
+        semaphore = asyncio.Semaphore(max(1, settings.BATCH_CONCURRENCY))
+        start = time.perf_counter()
+
+        async def run_one(index: int, item: Dict[str, Any]) -> Dict[str, Any]:
+            try:
+                req = AnalysisRequest.model_validate(item)
+            except ValidationError as e:
+                logger.warning(f"Batch item {index} rejected: {e.error_count()} validation errors")
+                return {"index": index, "error": f"요청 형식 오류: {_describe(e)}"}
+            channel_id = req.channel_id or new_channel_id()
+            async with semaphore:
+                try:
+                    result = await analysis_service.analyze_data(req, channel_id=channel_id)
+                except Exception as e:
+                    # One bad item must not end the stream for the others
+                    logger.error(f"Batch item {index} failed: {str(e)}", exc_info=True)
+                    result = {"error": f"분석 오류: {str(e)}"}
+            return {"index": index, **result, "channelId": channel_id}
+
+        tasks = [asyncio.create_task(run_one(i, item)) for i, item in enumerate(items)]
+        failed = 0
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                result = await next_done
+                failed += "error" in result
+                yield result
+        finally:
+            # Client went away mid-batch: stop the items that haven't finished
+            for task in tasks:
+                task.cancel()
+        yield {"batch": {
+            "items": len(items), "completed": len(items) - failed, "failed": failed,
+            "ms": round((time.perf_counter() - start) * 1000, 3),
+        }}
+
+
+batch_service = BatchService()
@@ -0,0 +1,93 @@
+import datetime
+import json
+import logging
+from contextlib import contextmanager
+import sqlite3
+import time
+from typing import Any, Dict, Optional
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+CUBE_DIMENSIONS = ["date", "media", "creative"]
+CUBE_METRICS = ["impressions", "clicks", "spend", "views"]
+
+
+class CampaignStore:
+    """Per-campaign daily aggregates (one row per date/media/creative) in SQLite.
+    Opened per call, so it is safe to use from the analysis worker processes."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS campaign_cube ("
+                "campaign_id TEXT NOT NULL, date TEXT NOT NULL, media TEXT NOT NULL, creative TEXT NOT NULL, "
+                "impressions REAL NOT NULL, clicks REAL NOT NULL, spend REAL NOT NULL, views REAL NOT NULL, "
+                "PRIMARY KEY (campaign_id, date, media, creative))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS campaign_meta ("
+                "campaign_id TEXT PRIMARY KEY, advertiser TEXT, budget_total REAL, media_budget TEXT, updated_at REAL)"
+            )
+            # Stores created before per-media budgets were kept lack the column (it is appended at the end)
+            meta_columns = {row[1] for row in conn.execute("PRAGMA table_info(campaign_meta)")}
+            if "media_budget" not in meta_columns:
+                conn.execute("ALTER TABLE campaign_meta ADD COLUMN media_budget TEXT")
+
+    @contextmanager
+    def _connect(self):
+        """One transaction on a short-lived connection"""
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def merge(self, campaign_id: str, cube: pd.DataFrame, replace: bool = False) -> pd.DataFrame:
+        """Store the uploaded dates (each one replaces that whole day) and return the full campaign cube.
+        replace=True drops every stored day first, as for a full re-upload."""
+        rows = [
+            (campaign_id, d.isoformat(), m, c, float(i), float(k), float(s), float(v))
+            for d, m, c, i, k, s, v in cube[CUBE_DIMENSIONS + CUBE_METRICS].itertuples(index=False)
+        ]
+        with self._connect() as conn:
+            if replace:
+                conn.execute("DELETE FROM campaign_cube WHERE campaign_id = ?", (campaign_id,))
+            else:
+                dates = sorted({row[1] for row in rows})
+                conn.executemany(
+                    "DELETE FROM campaign_cube WHERE campaign_id = ? AND date = ?",
+                    [(campaign_id, d) for d in dates],
+                )
+            conn.executemany("INSERT OR REPLACE INTO campaign_cube VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            # Insertion order (rowid grows past every kept row, since replaced days are deleted first): media and
+            # creatives then list in first-appearance order, as if every upload had been analyzed as one sheet
+            stored = pd.read_sql_query(
+                "SELECT date, media, creative, impressions, clicks, spend, views "
+                "FROM campaign_cube WHERE campaign_id = ? ORDER BY rowid",
+                conn, params=(campaign_id,),
+            )
+        logger.info(f"Campaign {campaign_id}: {len(rows)} cube rows merged, {len(stored)} stored")
+        stored["date"] = stored["date"].map(datetime.date.fromisoformat)
+        return stored
+
+    def get_meta(self, campaign_id: str) -> Dict[str, Any]:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT advertiser, budget_total, media_budget FROM campaign_meta WHERE campaign_id = ?", (campaign_id,)
+            ).fetchone()
+        if not row:
+            return {}
+        return {"advertiser": row[0], "budget_total": row[1], "media_budget": json.loads(row[2] or "{}")}
+
+    def set_meta(self, campaign_id: str, advertiser: str, budget_total: float,
+                 media_budget: Optional[Dict[str, float]] = None):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO campaign_meta (campaign_id, advertiser, budget_total, media_budget, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (campaign_id, advertiser, float(budget_total),
+                 json.dumps(media_budget or {}, ensure_ascii=False), time.time()),
+            )
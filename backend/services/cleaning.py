@@ -0,0 +1,190 @@
+import re
+import logging
+import warnings
+import numpy as np
+import pandas as pd
+from collections import defaultdict
+from pandas.tseries.api import guess_datetime_format
+
+logger = logging.getLogger(__name__)
+
+NON_NUMERIC_PATTERN = r'[^\d.-]'
+_BLANK_NUMERIC = ('', '-')
+_INT64_LIMIT = 2.0 ** 63
+
+
+def robust_to_numeric(val):
+    """Convert value to numeric, handling currency symbols and commas"""
+    if pd.isna(val) or val == '' or str(val).strip() == '-':
+        return 0
+    if isinstance(val, (int, float)):
+        # Always return as integer for cost/metrics
+        return int(round(val))
+    try:
+        # Remove currency symbols, commas, and other non-numeric characters
+        cleaned = re.sub(NON_NUMERIC_PATTERN, '', str(val))
+        if not cleaned or cleaned == '-':
+            return 0
+        # Convert to float first, then round to integer for accuracy
+        num_val = float(cleaned)
+        return int(round(num_val))
+    except:
+        return 0
+
+
+def parse_date_safe(val):
+    """Parse a single cell into a date, returning None when it is blank or unparseable"""
+    if pd.isna(val) or val == '' or str(val).strip() == '':
+        return None
+
+    # If already a date/datetime object
+    if hasattr(val, 'date'):
+        return val.date() if callable(val.date) else val
+
+    # If string, try to parse
+    s_val = str(val).strip()
+    try:
+        # Basic string parse - avoid pd.to_datetime's timezone defaults if possible for pure dates
+        # But pd.to_datetime is robust for formats. We use it but Strip TZ immediately.
+        dt = pd.to_datetime(s_val, errors='coerce')
+        if pd.isna(dt):
+            return None
+        return dt.date()
+    except:
+        return None
+
+
+def _string_mask(values: pd.Series) -> np.ndarray:
+    """Boolean mask of cells holding Python strings (object-dtype input)"""
+    inferred = pd.api.types.infer_dtype(values, skipna=True)
+    if inferred in ('string', 'empty'):
+        return values.notna().to_numpy()
+    return np.fromiter((isinstance(v, str) for v in values), dtype=bool, count=len(values))
+
+
+def _round_to_int(floats: np.ndarray) -> np.ndarray:
+    # np.round rounds half to even, exactly like the builtin round() used per cell
+    floats = np.round(np.where(np.isfinite(floats), floats, 0))
+    if len(floats) and np.abs(floats).max() >= _INT64_LIMIT:
+        # astype would wrap around silently
+        raise OverflowError("value outside the int64 range")
+    return floats.astype('int64')
+
+
+def clean_numeric_column(series: pd.Series) -> pd.Series:
+    """Column-wise equivalent of applying robust_to_numeric to every cell"""
+    try:
+        return _clean_numeric(series)
+    except OverflowError:
+        # Values beyond int64: the per-cell rule keeps them as exact Python ints
+        return series.apply(robust_to_numeric)
+
+
+def _clean_numeric(series: pd.Series) -> pd.Series:
+    if pd.api.types.is_bool_dtype(series):
+        return series.fillna(False).astype('int64')
+    if pd.api.types.is_integer_dtype(series):
+        # Already whole numbers: a float64 round trip would lose exactness above 2**53
+        values = series.fillna(0)
+        if pd.api.types.is_unsigned_integer_dtype(values) and len(values) and values.max() >= _INT64_LIMIT:
+            raise OverflowError("value outside the int64 range")
+        return values.astype('int64')
+    if pd.api.types.is_numeric_dtype(series):
+        return pd.Series(_round_to_int(series.fillna(0).to_numpy(dtype='float64')), index=series.index)
+
+    values = series.astype(object)
+    out = np.zeros(len(values), dtype='int64')
+    is_str = _string_mask(values)
+
+    # 1. Strings: strip currency symbols/commas with one vectorized regex pass.
+    # Stay on object dtype so the regex runs on Python `re` (same \d semantics as per-cell).
+    str_pos = np.flatnonzero(is_str)
+    if len(str_pos):
+        cleaned = values.iloc[str_pos].str.replace(NON_NUMERIC_PATTERN, '', regex=True).to_numpy(dtype=object)
+        filled = ~np.isin(cleaned, _BLANK_NUMERIC)
+        pos, cleaned = str_pos[filled], cleaned[filled]
+        try:
+            # object -> float64 uses float() per element in C, so parsing is identical
+            out[pos] = _round_to_int(cleaned.astype('float64'))
+        except (ValueError, TypeError):
+            # Malformed leftovers such as "1.2.3" or "5-": parse the rest in bulk, those per cell
+            probe = pd.to_numeric(pd.Series(cleaned, dtype=object), errors='coerce').isna().to_numpy()
+            out[pos[~probe]] = _round_to_int(cleaned[~probe].astype('float64'))
+            out[pos[probe]] = [robust_to_numeric(v) for v in values.iloc[pos[probe]]]
+
+    # 2. Non-string cells (ints/floats from JSON); blanks stay 0
+    other_pos = np.flatnonzero(~is_str & values.notna().to_numpy())
+    if len(other_pos):
+        others = values.iloc[other_pos].to_numpy(dtype=object)
+        try:
+            if pd.api.types.infer_dtype(others) == 'integer':
+                # Python ints convert exactly (or raise OverflowError beyond int64)
+                out[other_pos] = others.astype('int64')
+            else:
+                out[other_pos] = _round_to_int(others.astype('float64'))
+        except (ValueError, TypeError):
+            out[other_pos] = [robust_to_numeric(v) for v in others]
+
+    return pd.Series(out, index=series.index)
+
+
+def _parse_unique_dates(uniques: np.ndarray) -> np.ndarray:
+    """Parse distinct date strings in batches grouped by their inferred format"""
+    parsed = np.full(len(uniques), None, dtype=object)
+
+    # pd.to_datetime on a scalar infers the format from that one value, so grouping
+    # the distinct values by inferred format reproduces per-cell results exactly.
+    groups = defaultdict(list)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        for i, val in enumerate(uniques):
+            groups[guess_datetime_format(val)].append(i)
+
+        for fmt, idx in groups.items():
+            if fmt is None:
+                parsed[idx] = [parse_date_safe(uniques[i]) for i in idx]
+                continue
+            try:
+                dts = pd.to_datetime(pd.Index(uniques[idx], dtype=object), format=fmt, errors='coerce')
+                parsed[idx] = [None if pd.isna(dt) else dt.date() for dt in dts]
+            except (ValueError, TypeError):
+                # e.g. mixed UTC offsets within one format
+                parsed[idx] = [parse_date_safe(uniques[i]) for i in idx]
+    return parsed
+
+
+def parse_date_column(series: pd.Series) -> pd.Series:
+    """Column-wise equivalent of applying parse_date_safe to every cell"""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        # Typed columns from Arrow/Parquet uploads: same as Timestamp.date() per cell
+        return pd.Series(np.where(series.isna(), None, series.dt.date), index=series.index, dtype=object)
+
+    values = series.astype(object)
+    out = np.full(len(values), None, dtype=object)
+    is_str = _string_mask(values)
+
+    # Strings: each distinct value is parsed once, then broadcast back by code
+    str_pos = np.flatnonzero(is_str)
+    if len(str_pos):
+        stripped = values.iloc[str_pos].str.strip()
+        codes, uniques = pd.factorize(stripped)
+        uniques = np.asarray(uniques, dtype=object)
+        parsed = np.full(len(uniques), None, dtype=object)
+        filled = uniques != ''
+        parsed[filled] = _parse_unique_dates(uniques[filled])
+        out[str_pos] = parsed[codes]
+
+    # Datetime objects or numbers: keep the per-cell rules
+    other_pos = np.flatnonzero(~is_str & values.notna().to_numpy())
+    if len(other_pos):
+        others = values.iloc[other_pos]
+        if pd.api.types.infer_dtype(others, skipna=True) in ('datetime', 'date'):
+            # Date cells of an .xlsx upload: a few dozen distinct days over many rows, each parsed once
+            codes, uniques = pd.factorize(others.to_numpy(dtype=object))
+            parsed = np.empty(len(uniques), dtype=object)
+            parsed[:] = [parse_date_safe(v) for v in uniques]
+            out[other_pos] = parsed[codes]
+        else:
+            out[other_pos] = [parse_date_safe(v) for v in others]
+
+    return pd.Series(out, index=series.index, dtype=object)
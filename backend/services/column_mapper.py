@@ -0,0 +1,128 @@
+import asyncio
+import hashlib
+import logging
+import re
+from typing import Dict, List, Optional
+from backend.core.config import settings
+from backend.core.cache import TieredCache
+
+logger = logging.getLogger(__name__)
+
+# Same roles and vocabulary as the AIService.detect_columns prompt.
+# Metric roles come first so "영상조회수" resolves to views before "영상" can claim it as creative.
+ROLE_KEYWORDS = {
+    "date_col": ["날짜", "일자", "일별", "date"],
+    "imp_col": ["노출수", "노출", "impressions", "impression", "imps", "imp"],
+    "click_col": ["클릭수", "클릭", "clicks", "click"],
+    "view_col": ["조회수", "조회", "재생수", "재생", "views", "view"],
+    "cost_col": ["광고비", "지출", "비용", "금액", "spend", "cost"],
+    "media_col": ["매체사", "매체", "채널", "media", "channel", "publisher"],
+    "creative_col": ["광고소재", "소재", "이미지", "영상", "creative", "adname"],
+    "advertiser_col": ["광고주명", "광고주", "브랜드", "advertiser", "brand", "client"],
+}
+
+# Ratio/unit-price headers ("클릭률", "CPC", "조회율") must never be taken for raw metrics
+EXCLUDE_KEYWORDS = ["률", "율", "rate", "ratio", "ctr", "cpc", "cpm", "cpv", "vtr", "단가", "%", "평균", "avg"]
+
+REQUIRED_PERF_ROLES = ("imp_col", "cost_col", "view_col")
+
+
+def normalize_header(col) -> str:
+    return re.sub(r"[\s_\-()\[\]]+", "", str(col)).lower()
+
+
+def header_signature(columns: List) -> str:
+    """Order-insensitive hash of the normalized header set"""
+    normalized = sorted(normalize_header(c) for c in columns)
+    return hashlib.sha1("\x1f".join(normalized).encode("utf-8")).hexdigest()
+
+
+def match_columns(columns: List) -> Dict[str, Optional[str]]:
+    """Deterministic keyword matcher for common Korean/English report headers"""
+    candidates = {col: normalize_header(col) for col in columns}
+    candidates = {col: norm for col, norm in candidates.items() if not any(ek in norm for ek in EXCLUDE_KEYWORDS)}
+    mapping: Dict[str, Optional[str]] = {}
+    used = set()
+    for role, keywords in ROLE_KEYWORDS.items():
+        best, best_rank = None, None
+        for col, norm in candidates.items():
+            if col in used:
+                continue
+            for k_idx, kw in enumerate(keywords):
+                # exact match beats prefix beats substring; earlier keywords break ties
+                if norm == kw:
+                    rank = (0, k_idx)
+                elif norm.startswith(kw):
+                    rank = (1, k_idx)
+                elif kw in norm:
+                    rank = (2, k_idx)
+                else:
+                    continue
+                if best_rank is None or rank < best_rank:
+                    best, best_rank = col, rank
+                break
+        mapping[role] = best
+        if best is not None:
+            used.add(best)
+    return mapping
+
+
+def is_sufficient(mapping: Dict[str, Optional[str]]) -> bool:
+    """True when the mapping has what analyze_data validates: a date and a performance metric"""
+    return bool(mapping.get("date_col")) and any(mapping.get(r) for r in REQUIRED_PERF_ROLES)
+
+
+class ColumnMapper:
+    def __init__(self):
+        self.cache = TieredCache(
+            "column_mappings",
+            maxsize=settings.MAPPING_CACHE_SIZE,
+            db_path=settings.CACHE_DB_PATH,
+        )
+        self.keyword_hits = 0
+        self.llm_calls = 0
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    def _resolve(self, mapping: dict, columns: List) -> dict:
+        """Map cached names back onto this sheet's exact headers (spacing/case may differ)"""
+        actual = {normalize_header(c): c for c in columns}
+        return {role: actual.get(normalize_header(col)) if col else None for role, col in mapping.items()}
+
+    async def detect(self, columns: List) -> dict:
+        key = header_signature(columns)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return self._resolve(cached, columns)
+
+        mapping = match_columns(columns)
+        if is_sufficient(mapping):
+            self.keyword_hits += 1
+            self.cache.set(key, mapping)
+            return mapping
+
+        # Sheets with the same headers arriving together (a batch of one report template) share one LLM call
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._detect_with_llm(key, columns, mapping))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return self._resolve(await asyncio.shield(task), columns)
+
+    async def _detect_with_llm(self, key: str, columns: List, mapping: dict) -> dict:
+        from backend.services.ai_service import ai_service
+        self.llm_calls += 1
+        ai_map = await ai_service.detect_columns(columns)
+        if not ai_map:
+            # LLM failure: don't cache, the next request should retry
+            return mapping
+        # Only trust names that actually exist in the sheet
+        ai_map = {role: col for role, col in self._resolve(ai_map, columns).items() if col}
+        mapping = {**mapping, **ai_map}
+        self.cache.set(key, mapping)
+        return mapping
+
+    def stats(self) -> dict:
+        return {**self.cache.stats(), "keyword_hits": self.keyword_hits, "llm_calls": self.llm_calls}
+
+
+column_mapper = ColumnMapper()
@@ -0,0 +1,82 @@
+import io
+import json
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+ARROW_STREAM_TYPE = "application/vnd.apache.arrow.stream"
+ARROW_FILE_TYPE = "application/vnd.apache.arrow.file"
+
+_EXTENSION_FORMATS = {
+    ".arrow": "arrow", ".arrows": "arrow", ".ipc": "arrow", ".feather": "arrow",
+    ".parquet": "parquet", ".pq": "parquet",
+    ".csv": "csv", ".txt": "csv",
+}
+_CONTENT_TYPE_FORMATS = {
+    ARROW_STREAM_TYPE: "arrow", ARROW_FILE_TYPE: "arrow",
+    "application/vnd.apache.parquet": "parquet", "application/x-parquet": "parquet",
+    "text/csv": "csv",
+}
+
+
+class UnsupportedFormatError(ValueError):
+    pass
+
+
+def detect_format(filename: Optional[str] = None, content_type: Optional[str] = None) -> str:
+    """Pick arrow/parquet/csv from the content type, falling back to the file extension"""
+    ctype = (content_type or "").split(";")[0].strip().lower()
+    if ctype in _CONTENT_TYPE_FORMATS:
+        return _CONTENT_TYPE_FORMATS[ctype]
+    name = (filename or "").lower()
+    for ext, fmt in _EXTENSION_FORMATS.items():
+        if name.endswith(ext):
+            return fmt
+    raise UnsupportedFormatError(f"지원하지 않는 파일 형식입니다: {filename or ctype or 'unknown'}")
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+    except ImportError as e:
+        raise UnsupportedFormatError("Arrow/Parquet 업로드에는 pyarrow가 필요합니다.") from e
+    return pyarrow
+
+
+def _read_arrow_table(data: bytes):
+    pa = _import_pyarrow()
+    source = pa.BufferReader(data)
+    try:
+        return pa.ipc.open_stream(source).read_all()
+    except pa.ArrowInvalid:
+        # Not a stream; try the random-access file (Feather v2) layout
+        return pa.ipc.open_file(pa.BufferReader(data)).read_all()
+
+
+def read_table(data: bytes, fmt: str) -> pd.DataFrame:
+    """Load one uploaded table straight into a DataFrame, without per-row dicts"""
+    if not data:
+        return pd.DataFrame()
+    if fmt == "arrow":
+        return _read_arrow_table(data).to_pandas()
+    if fmt == "parquet":
+        _import_pyarrow()
+        return pd.read_parquet(io.BytesIO(data))
+    if fmt == "csv":
+        # Keep every cell as text (blank stays ''), exactly like the JSON rows from the sheet parser,
+        # so the cleaning rules see the same values on both paths.
+        return pd.read_csv(io.BytesIO(data), dtype=str, keep_default_na=False, encoding="utf-8-sig")
+    raise UnsupportedFormatError(f"지원하지 않는 파일 형식입니다: {fmt}")
+
+
+def read_arrow_request(data: bytes) -> Tuple[pd.DataFrame, pd.DataFrame, Dict[str, Any], Optional[List[Any]]]:
+    """Arrow IPC body: the raw sheet is the table, mappings/mix_rows/comparisons ride in the schema metadata as JSON"""
+    table = _read_arrow_table(data)
+    metadata = table.schema.metadata or {}
+    mappings = json.loads(metadata.get(b"mappings", b"{}"))
+    mix_rows = json.loads(metadata.get(b"mix_rows", b"[]"))
+    comparisons = json.loads(metadata.get(b"comparisons", b"null"))
+    return table.to_pandas(), pd.DataFrame(mix_rows), mappings, comparisons
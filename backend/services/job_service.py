@@ -0,0 +1,97 @@
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional
+from backend.core.config import settings
+from backend.events.bus import event_bus, new_channel_id
+from backend.models.analysis import AnalysisRequest, JobStatus
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_EVENTS = ("analysis_started", "data_processed", "status_update")
+
+
+class JobQueueFullError(Exception):
+    pass
+
+
+class JobService:
+    """Bounded worker pool running analyses in the background; job ids double as event channels"""
+
+    def __init__(self):
+        self.jobs: Dict[str, JobStatus] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+
+    def start(self):
+        if self._workers:
+            return
+        self._queue = asyncio.Queue(maxsize=settings.JOB_QUEUE_SIZE)
+        self._workers = [asyncio.create_task(self._worker(i)) for i in range(settings.JOB_WORKERS)]
+        logger.info(f"Started {settings.JOB_WORKERS} analysis workers (queue size {settings.JOB_QUEUE_SIZE})")
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+
+    def submit(self, req: AnalysisRequest) -> JobStatus:
+        self.start()
+        self._prune()
+        job = JobStatus(id=req.channel_id or new_channel_id(), created_at=time.time())
+        if job.id in self.jobs:
+            raise ValueError(f"이미 사용 중인 채널 ID입니다: {job.id}")
+        try:
+            self._queue.put_nowait((job, req))
+        except asyncio.QueueFull:
+            raise JobQueueFullError("분석 대기열이 가득 찼습니다. 잠시 후 다시 시도해 주세요.")
+        self.jobs[job.id] = job
+        return job
+
+    def get(self, job_id: str) -> Optional[JobStatus]:
+        self._prune()
+        return self.jobs.get(job_id)
+
+    def _prune(self):
+        cutoff = time.time() - settings.JOB_RESULT_TTL
+        expired = [jid for jid, job in self.jobs.items() if job.finished_at and job.finished_at < cutoff]
+        for jid in expired:
+            del self.jobs[jid]
+
+    async def _worker(self, index: int):
+        while True:
+            job, req = await self._queue.get()
+            try:
+                await self._run(job, req)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: JobStatus, req: AnalysisRequest):
+        from backend.services.analysis_service import analysis_service
+
+        async def on_progress(data):
+            if isinstance(data, dict):
+                job.progress = data.get("message") or data.get("data") or job.progress
+                job.stages = data.get("stages", job.stages)
+
+        unsubscribers = [event_bus.subscribe(e, on_progress, channel=job.id) for e in PROGRESS_EVENTS]
+        job.status = "running"
+        job.started_at = time.time()
+        try:
+            result = await analysis_service.analyze_data(req, channel_id=job.id)
+            job.result = {**result, "channelId": job.id}
+            job.error = result.get("error")
+            job.status = "failed" if job.error else "completed"
+        except Exception as e:
+            logger.error(f"Job {job.id} failed: {str(e)}", exc_info=True)
+            job.status = "failed"
+            job.error = str(e)
+        finally:
+            job.finished_at = time.time()
+            for unsubscribe in unsubscribers:
+                unsubscribe()
+
+
+job_service = JobService()
@@ -0,0 +1,128 @@
+import asyncio
+import hashlib
+import json
+import logging
+import random
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from backend.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class LLMProvider(ABC):
+    """What AIService needs from a model vendor: one text generation and one web search.
+    Timeouts, caching and metrics stay in AIService, so every provider gets them."""
+
+    name = "base"
+
+    @abstractmethod
+    async def generate(self, prompt: str, call: str = "generate", json_output: bool = False) -> str:
+        ...
+
+    @abstractmethod
+    async def search(self, query: str, max_results: int = 3) -> list:
+        ...
+
+    def close(self):
+        pass
+
+
+class GeminiProvider(LLMProvider):
+    """Google Gemini for generation, DuckDuckGo for search"""
+
+    name = "gemini"
+
+    def __init__(self):
+        import warnings
+        warnings.filterwarnings("ignore", category=FutureWarning, module="google.generativeai")
+        import google.generativeai as genai
+        from duckduckgo_search import DDGS
+
+        if settings.LLM_API_KEY:
+            genai.configure(api_key=settings.LLM_API_KEY)
+        self._genai = genai
+        self._ddgs = DDGS
+        self.model = genai.GenerativeModel(settings.LLM_MODEL)
+        # DDGS has no async client; keep its blocking calls off the event loop
+        self._executor = ThreadPoolExecutor(max_workers=settings.AI_MAX_WORKERS, thread_name_prefix="ai-search")
+
+    async def generate(self, prompt: str, call: str = "generate", json_output: bool = False) -> str:
+        config = self._genai.GenerationConfig(response_mime_type="application/json") if json_output else None
+        response = await self.model.generate_content_async(prompt, generation_config=config)
+        return response.text
+
+    async def search(self, query: str, max_results: int = 3) -> list:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, lambda: self._ddgs().text(query, max_results=max_results))
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+
+# Distinct prompts whose attempt count StubProvider remembers
+STUB_ATTEMPT_KEYS = 4096
+
+
+class StubProvider(LLMProvider):
+    """Offline provider for load tests: answers are a pure function of the prompt, latency and
+    failures are simulated (LLM_STUB_LATENCY, LLM_STUB_JITTER, LLM_STUB_ERROR_RATE, LLM_STUB_SEED)"""
+
+    name = "stub"
+
+    def __init__(self, latency: float = None, jitter: float = None, error_rate: float = None, seed: int = None):
+        self.latency = settings.LLM_STUB_LATENCY if latency is None else latency
+        self.jitter = settings.LLM_STUB_JITTER if jitter is None else jitter
+        self.error_rate = settings.LLM_STUB_ERROR_RATE if error_rate is None else error_rate
+        self.seed = settings.LLM_STUB_SEED if seed is None else seed
+        self.calls = 0
+        # prompt digest -> attempts so far, most recently used last; bounded for long load-test runs
+        self._attempts: "OrderedDict[str, int]" = OrderedDict()
+
+    async def _simulate(self, what: str, payload: str):
+        # Delay and failure derive from (seed, call, payload, attempt number), not from a shared
+        # random stream, so a run is reproducible however the concurrent calls interleave
+        self.calls += 1
+        attempt_key = hashlib.sha256(f"{what}\0{payload}".encode("utf-8")).hexdigest()
+        attempt = self._attempts.pop(attempt_key, 0) + 1
+        self._attempts[attempt_key] = attempt
+        if len(self._attempts) > STUB_ATTEMPT_KEYS:
+            # Retries follow their first attempt within seconds; long-finished prompts can go
+            self._attempts.popitem(last=False)
+        rng = random.Random(f"{self.seed}\0{attempt_key}\0{attempt}")
+        delay = max(0.0, self.latency + rng.uniform(-self.jitter, self.jitter))
+        fail = rng.random() < self.error_rate
+        await asyncio.sleep(delay)
+        if fail:
+            raise RuntimeError(f"stub provider: simulated {what} failure")
+
+    async def generate(self, prompt: str, call: str = "generate", json_output: bool = False) -> str:
+        await self._simulate(call, prompt)
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        if call == "generate_report" or json_output:
+            return json.dumps({
+                "insight": f"[stub {digest[:8]}] 캠페인 별도 이슈없이 진행 중 입니다.",
+                "summary": f"[stub {digest[:8]}] 캠페인은 계획대로 운영 중입니다.",
+            }, ensure_ascii=False)
+        if call == "detect_columns":
+            # Leave column detection to the keyword matcher
+            return "{}"
+        if call == "brand_color":
+            return f"#{digest[:6]}"
+        return f"[stub {digest[:8]}] 캠페인 별도 이슈없이 진행 중 입니다."
+
+    async def search(self, query: str, max_results: int = 3) -> list:
+        await self._simulate("search", query)
+        return []
+
+
+PROVIDERS = {"gemini": GeminiProvider, "stub": StubProvider}
+
+
+def create_provider(name: str = None) -> LLMProvider:
+    name = (name or settings.LLM_PROVIDER).lower()
+    if name not in PROVIDERS:
+        raise ValueError(f"Unknown LLM_PROVIDER '{name}' (expected one of: {', '.join(PROVIDERS)})")
+    logger.info(f"LLM provider: {name}")
+    return PROVIDERS[name]()
@@ -0,0 +1,156 @@
+import json
+import logging
+import math
+from typing import Any, Callable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+INSIGHT_RULES = """
+작성 규칙:
+1. **매체별 현황** 섹션을 먼저 작성
+   - 각 상위 3개 매체를 개별 소제목으로 구분 (예: "1. 네이버 GFA", "2. 크로스타겟")
+   - 각 매체마다 ㄴ 기호로 2-3개 핵심 지표만 간결하게 정리
+   - CPC, CTR, CPV 등 핵심 효율 지표 위주로 언급
+   - "제안 대비 XX원 낮은/높은 평균 XX원" 형식 사용
+   - DMP 또는 특정 타겟에서의 효율 언급
+
+2. **캠페인 코멘트** 섹션을 마지막에 작성
+   - "전체현황" 하위에 2-3줄 요약
+   - 특이사항이나 주목할 매체가 있다면 "매체별 현황" 하위에 간략히 추가
+
+3. 형식 요구사항:
+   - 전체 길이는 10줄 이내로 최대한 간결하게
+   - 불필요한 서론이나 결론 없이 핵심만
+   - 정량적 수치 위주로 작성
+   - 매우 전문적이고 간결한 톤 유지
+
+예시 참고:
+```
+1. 네이버 GFA
+ㄴ CPC의 경우 제안 대비 543원 낮은 평균 346원에 진행 중 입니다.
+ㄴ 평균 CTR은 제안 대비 0.46% 상승된 0.66%로 진행 중 입니다.
+
+캠페인 코멘트
+
+전체현황
+캠페인 별도 이슈없이 진행 중 입니다.
+매우 우수한 CPC단가로 운영 중 입니다.
+```
+"""
+
+SUMMARY_RULES = """
+요구사항:
+- 최대 3줄, 각 줄은 한 문장으로 간결하게
+- 캠페인 운영 상태, 주요 효율 지표, 특이사항만 언급
+- "~ 진행 중입니다", "~ 운영 중입니다" 형식 사용
+- 숫자와 핵심 결과 위주로 작성
+
+예시: "크로스타겟 캠페인은 VTR 70% 이상으로 CPV 단가가 절감되었습니다. 크로스타겟 상품의 CTR은 최근 2일간 2% 이상으로 대폭 상승했습니다."
+"""
+
+DATA_LEGEND = "imp=노출, clk=클릭, spend=비용(원), views=조회, ctr=클릭률(%), cpc=클릭당 비용(원), cpv=조회당 비용(원)"
+
+_METRIC_KEYS = (("impressions", "imp"), ("clicks", "clk"), ("spend", "spend"), ("views", "views"))
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough upper estimate: ~4 ASCII characters per token, one token per Hangul/other character"""
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return math.ceil(ascii_chars / 4) + (len(text) - ascii_chars)
+
+
+def _compact_metrics(stats: Dict[str, Any]) -> Dict[str, Any]:
+    """Short keys, zero metrics dropped, plus the efficiency figures the rules ask for"""
+    out = {short: int(stats.get(key, 0)) for key, short in _METRIC_KEYS if stats.get(key)}
+    imp, clk, spend, views = (int(stats.get(key, 0) or 0) for key, _ in _METRIC_KEYS)
+    if imp and clk:
+        out["ctr"] = round(clk / imp * 100, 2)
+    if clk and spend:
+        out["cpc"] = round(spend / clk)
+    if views and spend:
+        out["cpv"] = round(spend / views)
+    return out
+
+
+def _dimension_stats(item: Dict[str, Any], period: str) -> Dict[str, Any]:
+    return _compact_metrics({key: item["metrics"].get(key, {}).get(period, 0) for key, _ in _METRIC_KEYS})
+
+
+def build_insight_context(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Keep only what the insight template uses from summary_for_ai"""
+    return {
+        "date": data.get("date"),
+        "overall": {
+            "today": _compact_metrics(data.get("overall", {})),
+            "prev": _compact_metrics(data.get("overall_prev", {})),
+            "total": _compact_metrics(data.get("overall_total", {})),
+        },
+        "budget": {
+            "total": int(data.get("budget_total") or 0),
+            "spend": int(data.get("total_spend") or 0),
+            "achievement": round(float(data.get("achievement") or 0), 1),
+        },
+        "media": [
+            {"name": m["name"], "today": _dimension_stats(m, "today"), "prev": _dimension_stats(m, "prev")}
+            for m in data.get("top_media", [])
+        ],
+        "creatives": [
+            {"name": c["name"], "today": _dimension_stats(c, "today")}
+            for c in data.get("top_creatives", [])
+        ],
+    }
+
+
+# Applied in order until the context fits: least useful detail goes first
+_REDUCERS: List[Callable[[Dict[str, Any]], None]] = [
+    lambda ctx: ctx.pop("creatives", None),
+    lambda ctx: ctx["overall"].pop("total", None),
+    lambda ctx: [m.pop("prev", None) for m in ctx.get("media", [])],
+    lambda ctx: ctx.__setitem__("media", ctx.get("media", [])[:2]),
+    lambda ctx: ctx["overall"].pop("prev", None),
+    lambda ctx: ctx.__setitem__("media", ctx.get("media", [])[:1]),
+]
+
+
+def render_context(data: Dict[str, Any], token_budget: int) -> str:
+    """Compact JSON of the insight context, trimmed to fit token_budget"""
+    context = build_insight_context(data)
+    text = json.dumps(context, ensure_ascii=False, separators=(",", ":"))
+    for reduce in _REDUCERS:
+        if estimate_tokens(text) <= token_budget:
+            break
+        reduce(context)
+        text = json.dumps(context, ensure_ascii=False, separators=(",", ":"))
+    if estimate_tokens(text) > token_budget:
+        logger.warning(f"Insight context still ~{estimate_tokens(text)} tokens (budget {token_budget})")
+    return text
+
+
+def insight_prompt(data: Dict[str, Any], token_budget: int) -> str:
+    return f"""당신은 광고 대행사 보고서 전문가입니다. 다음 광고 집행 결과를 분석하여 간결한 캠페인 코멘트를 작성하세요.
+
+[데이터] ({DATA_LEGEND})
+{render_context(data, token_budget)}
+{INSIGHT_RULES}"""
+
+
+def summary_prompt(insight: str) -> str:
+    return f"""다음 캠페인 코멘트를 2-3줄로 핵심만 요약하세요:
+---
+{insight}
+---
+{SUMMARY_RULES}"""
+
+
+def report_prompt(data: Dict[str, Any], token_budget: int) -> str:
+    """Insight and its summary in one call, answered as a JSON object"""
+    return f"""당신은 광고 대행사 보고서 전문가입니다. 다음 광고 집행 결과로 캠페인 코멘트(insight)와 그 요약(summary)을 작성하세요.
+
+[데이터] ({DATA_LEGEND})
+{render_context(data, token_budget)}
+
+[insight: 캠페인 코멘트]
+{INSIGHT_RULES}
+[summary: insight를 2-3줄로 핵심만 요약]
+{SUMMARY_RULES}
+반드시 {{"insight": "...", "summary": "..."}} 형식의 JSON 객체 하나로만 답변하세요."""
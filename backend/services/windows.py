@@ -0,0 +1,102 @@
+import datetime
+from typing import Any, Dict, List, Tuple
+import numpy as np
+import pandas as pd
+from backend.services.campaign_store import CUBE_METRICS as METRICS
+
+Window = Tuple[datetime.date, datetime.date]
+
+
+def _month_start(day: datetime.date) -> datetime.date:
+    return day.replace(day=1)
+
+
+def resolve_window(spec: Dict[str, Any], latest: datetime.date) -> Dict[str, Any]:
+    """Concrete current/previous date ranges for one requested comparison.
+    wow: last 7 days vs the 7 before; mtd: month to date vs the same days of the previous month;
+    custom: start..end vs compare_start..compare_end (default: the equally long span just before)."""
+    kind = spec.get("type", "custom")
+    if kind == "wow":
+        current = (latest - datetime.timedelta(days=6), latest)
+        previous = (latest - datetime.timedelta(days=13), latest - datetime.timedelta(days=7))
+    elif kind == "mtd":
+        current = (_month_start(latest), latest)
+        prev_end_of_month = _month_start(latest) - datetime.timedelta(days=1)
+        prev_start = _month_start(prev_end_of_month)
+        previous = (prev_start, min(prev_start + (latest - current[0]), prev_end_of_month))
+    else:
+        current = (spec["start"], spec["end"])
+        if spec.get("compare_start") and spec.get("compare_end"):
+            previous = (spec["compare_start"], spec["compare_end"])
+        else:
+            span = current[1] - current[0]
+            prev_end = current[0] - datetime.timedelta(days=1)
+            previous = (prev_end - span, prev_end)
+    return {"name": spec.get("name") or kind, "type": kind, "current": current, "previous": previous}
+
+
+class DailyCube:
+    """Per-day metric sums at three levels (overall, media, creative) with cumulative sums over the
+    day axis, so any [start, end] window costs two lookups per level instead of a frame filter."""
+
+    def __init__(self, cube: pd.DataFrame):
+        days, day_codes = np.unique(pd.to_datetime(cube["date"]).to_numpy(dtype="datetime64[D]"), return_inverse=True)
+        self.days = days
+        values = cube[METRICS].to_numpy(dtype="int64")
+        self.levels: Dict[str, Tuple[List[str], np.ndarray]] = {}
+        self.levels["overall"] = ([""], self._cumulative(day_codes, np.zeros(len(cube), dtype="int64"), 1, values))
+        for level in ("media", "creative"):
+            names = cube[level].astype(str)
+            codes, uniques = pd.factorize(names, sort=False)
+            self.levels[level] = (list(uniques), self._cumulative(day_codes, codes, len(uniques), values))
+
+    def _cumulative(self, day_codes: np.ndarray, group_codes: np.ndarray, groups: int, values: np.ndarray) -> np.ndarray:
+        daily = np.zeros((len(self.days) + 1, groups, len(METRICS)), dtype="int64")
+        # Row 0 stays zero so window = cs[end] - cs[start] needs no special case for the first day
+        np.add.at(daily, (day_codes + 1, group_codes), values)
+        return np.cumsum(daily, axis=0)
+
+    def window_sums(self, level: str, window: Window) -> Tuple[List[str], np.ndarray]:
+        names, cs = self.levels[level]
+        start = np.searchsorted(self.days, np.datetime64(window[0], "D"), side="left")
+        end = np.searchsorted(self.days, np.datetime64(window[1], "D"), side="right")
+        return names, cs[end] - cs[start]
+
+
+def _delta(current: int, previous: int) -> float:
+    return round((current - previous) / previous * 100, 1) if previous > 0 else 0
+
+
+def _metrics(current: np.ndarray, previous: np.ndarray) -> Dict[str, Dict[str, Any]]:
+    return {
+        metric: {"current": int(c), "previous": int(p), "delta": _delta(int(c), int(p))}
+        for metric, c, p in zip(METRICS, current, previous)
+    }
+
+
+def compare_windows(cube: pd.DataFrame, specs: List[Dict[str, Any]], latest: datetime.date) -> List[Dict[str, Any]]:
+    """Answer every requested window from one cumulative-sum build of the cube"""
+    daily = DailyCube(cube)
+    latest = pd.Timestamp(latest).date()
+    out = []
+    for spec in specs:
+        window = resolve_window(spec, latest)
+        entry = {
+            "name": window["name"],
+            "type": window["type"],
+            "current": {"start": window["current"][0].isoformat(), "end": window["current"][1].isoformat()},
+            "previous": {"start": window["previous"][0].isoformat(), "end": window["previous"][1].isoformat()},
+        }
+        _, cur = daily.window_sums("overall", window["current"])
+        _, prev = daily.window_sums("overall", window["previous"])
+        entry["overall"] = _metrics(cur[0], prev[0])
+        for level, key in (("media", "media"), ("creative", "creatives")):
+            names, cur = daily.window_sums(level, window["current"])
+            _, prev = daily.window_sums(level, window["previous"])
+            # Blank dimension values count in the overall figures only, as in the daily comparison
+            rows = [i for i, name in enumerate(names) if name.strip() and (cur[i].any() or prev[i].any())]
+            # Largest current window first, independent of row order in the upload or the store
+            rows.sort(key=lambda i: (-cur[i][0], names[i]))
+            entry[key] = [{"name": names[i], "metrics": _metrics(cur[i], prev[i])} for i in rows]
+        out.append(entry)
+    return out
@@ -0,0 +1,258 @@
+import csv
+import hashlib
+import logging
+import os
+import tempfile
+from contextlib import contextmanager
+from itertools import chain, islice
+from typing import Any, BinaryIO, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+from backend.services.ingest import UnsupportedFormatError
+
+logger = logging.getLogger(__name__)
+
+# Sheet and header rules mirror frontend/src/utils/excel.ts, so a workbook uploaded as-is is read
+# the way the browser would have read it before sending raw_rows/mix_rows
+HEADER_KEYWORDS = ['date', '일자', 'media', '매체', 'cost', '비용', 'imp', '노출', 'click', '광고주', 'campaign', '캠페인']
+# Raw-sheet columns the browser drops before analysis
+RAW_EXCLUDE_KEYWORDS = ['os', '요일', 'day', 'week', 'summary', 'sum']
+HEADER_SCAN_ROWS = 30
+ORIENTATION_SCAN_ROWS = 50
+
+XLSX_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+_EXTENSION_FORMATS = {".xlsx": "xlsx", ".xlsm": "xlsx", ".csv": "csv", ".txt": "csv"}
+_CONTENT_TYPE_FORMATS = {XLSX_TYPE: "xlsx", "text/csv": "csv"}
+
+COPY_BUFFER = 1024 * 1024
+
+
+def detect_workbook_format(filename: Optional[str] = None, content_type: Optional[str] = None) -> str:
+    """xlsx or csv from the file extension, falling back to the content type"""
+    name = (filename or "").lower()
+    for ext, fmt in _EXTENSION_FORMATS.items():
+        if name.endswith(ext):
+            return fmt
+    ctype = (content_type or "").split(";")[0].strip().lower()
+    if ctype in _CONTENT_TYPE_FORMATS:
+        return _CONTENT_TYPE_FORMATS[ctype]
+    raise UnsupportedFormatError(f"지원하지 않는 파일 형식입니다: {filename or ctype or 'unknown'} (.xlsx, .csv)")
+
+
+def save_upload(source: BinaryIO, fmt: str) -> Tuple[str, str, int]:
+    """Copy an uploaded file to a temp file in fixed-size blocks; returns (path, sha256, bytes).
+    The caller removes the file once the analysis is done."""
+    digest = hashlib.sha256()
+    size = 0
+    fd, path = tempfile.mkstemp(prefix="upload-", suffix=f".{fmt}")  # openpyxl goes by the extension
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                block = source.read(COPY_BUFFER)
+                if not block:
+                    break
+                digest.update(block)
+                size += len(block)
+                out.write(block)
+    except BaseException:
+        os.remove(path)
+        raise
+    return path, digest.hexdigest(), size
+
+
+def _import_openpyxl():
+    try:
+        import openpyxl
+    except ImportError as e:
+        raise UnsupportedFormatError("Excel 업로드에는 openpyxl이 필요합니다.") from e
+    return openpyxl
+
+
+@contextmanager
+def _opened(path: str, fmt: str, book: Any = None) -> Iterator[Any]:
+    """The openpyxl workbook to read from: book when the caller already has it open, else opened (and
+    closed) here. openpyxl loads the whole shared-strings table on every open, so one request opens once."""
+    if book is not None or fmt != "xlsx":
+        yield book
+        return
+    book = _import_openpyxl().load_workbook(path, read_only=True, data_only=True)
+    try:
+        yield book
+    finally:
+        book.close()
+
+
+def _squash(name: str) -> str:
+    return name.lower().replace(" ", "").replace("_", "")
+
+
+def find_raw_sheet(names: Sequence[Optional[str]]) -> Optional[str]:
+    """Sheet named like raw data, else the first one"""
+    for name in names:
+        if name and any(k in _squash(name) for k in ('raw', '로데이터', 'data')):
+            return name
+    return names[0] if names else None
+
+
+def find_mix_sheet(names: Sequence[Optional[str]]) -> Optional[str]:
+    """Media-mix / plan / summary sheet, in that order of preference; None when there is none"""
+    squashed = [(name, _squash(name)) for name in names if name]
+    for matches in (
+        lambda n: 'mediamix' in n,
+        lambda n: any(k in n for k in ('budget', 'plan', 'goal', '믹스')),
+        lambda n: 'raw' not in n and any(k in n for k in ('summary', 'total', '종합')),
+    ):
+        for name, lower in squashed:
+            if matches(lower):
+                return name
+    return None
+
+
+def _iter_cells(path: str, fmt: str, sheet: Optional[str], book: Any = None) -> Iterator[Sequence[Any]]:
+    """Row tuples of one sheet, read lazily; the file stays open only while the generator runs"""
+    if fmt == "xlsx":
+        with _opened(path, fmt, book) as book:
+            # read_only streams the sheet XML row by row instead of building every cell object up front
+            worksheet = book[sheet] if sheet else book.worksheets[0]
+            # Exports often carry a stale <dimension>; trusting it would cut rows/columns off
+            worksheet.reset_dimensions()
+            yield from worksheet.iter_rows(values_only=True)
+    elif fmt == "csv":
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            yield from csv.reader(f)
+    else:
+        raise UnsupportedFormatError(f"지원하지 않는 파일 형식입니다: {fmt}")
+
+
+def _text(value: Any) -> str:
+    return str(value or '')
+
+
+def _is_transposed(head: List[Sequence[Any]]) -> bool:
+    """Headers down column A instead of across a row"""
+    vertical = max((sum(k in ' '.join('' if v is None else str(v) for v in row).lower() for k in HEADER_KEYWORDS)
+                    for row in head[:20]), default=0)
+    horizontal = sum(bool(row) and any(k in _text(row[0]).lower() for k in HEADER_KEYWORDS) for row in head)
+    return horizontal > vertical and horizontal >= 2
+
+
+def _header_index(rows: List[Sequence[Any]]) -> int:
+    """Row with the most header keywords among the first HEADER_SCAN_ROWS (3 matches settle it)"""
+    best, best_count = 0, 0
+    for i, row in enumerate(rows[:HEADER_SCAN_ROWS]):
+        values = [_text(v).lower() for v in row]
+        count = sum(any(k in v for v in values) for k in HEADER_KEYWORDS)
+        if count > best_count:
+            best, best_count = i, count
+        if count >= 3:
+            break
+    return best
+
+
+def _locate_header(rows: Iterator[Sequence[Any]]) -> Tuple[List[str], Iterator[Sequence[Any]]]:
+    """(header cells, iterator over the data rows after them). Only the first ORIENTATION_SCAN_ROWS rows are
+    buffered; a transposed sheet is the exception, since flipping it needs every row (such sheets are short)."""
+    head = list(islice(rows, ORIENTATION_SCAN_ROWS))
+    if not head:
+        return [], iter(())
+    if _is_transposed(head):
+        head.extend(rows)
+        width = len(head[0])
+        head = [tuple(row[c] if c < len(row) else None for row in head) for c in range(width)]
+        rows = iter(())
+    index = _header_index(head)
+    headers = [_text(h).strip() for h in head[index]]
+    return headers, chain(head[index + 1:], rows)
+
+
+def _filled(values: pd.Series) -> np.ndarray:
+    """Cells that are neither missing nor blank text"""
+    mask = values.notna().to_numpy()
+    if values.dtype == object or pd.api.types.is_string_dtype(values):
+        mask = mask & (values.astype(str).str.strip() != '').to_numpy()
+    return mask
+
+
+class SheetUpload:
+    """One sheet of an uploaded .xlsx/.csv on disk, consumed in row chunks instead of loaded whole.
+    Only the location, header and file digest are kept, so it can be handed to a worker process.
+    (An .xlsx still costs its shared-strings table, which openpyxl reads whole on open.)"""
+
+    def __init__(self, path: str, fmt: str, sheet: Optional[str] = None, digest: str = "", size: int = 0,
+                 exclude_keywords: Sequence[str] = ()):
+        self.path = path
+        self.fmt = fmt
+        self.sheet = sheet
+        self.digest = digest
+        self.size = size
+        self.exclude_keywords = tuple(exclude_keywords)
+        self.headers: List[str] = []
+        self.columns: List[str] = []
+        self.empty = True
+
+    def inspect(self, book: Any = None) -> "SheetUpload":
+        """Find the header row and whether any data row follows; reads only as far as the first data row"""
+        rows = _iter_cells(self.path, self.fmt, self.sheet, book)
+        try:
+            self.headers, data = _locate_header(rows)
+            named = [i for i, h in enumerate(self.headers) if h]
+            self.empty = not any(
+                any(i < len(row) and _text(row[i]).strip() != '' for i in named) for row in data
+            )
+        finally:
+            rows.close()
+        keep = {h for h in self.headers if h and not any(k in h.lower() for k in self.exclude_keywords)}
+        # dict keys: one column per distinct header, in sheet order
+        self.columns = list(dict.fromkeys(h for h in self.headers if h in keep))
+        return self
+
+    def chunks(self, chunk_rows: int, columns: Optional[Sequence[str]] = None, book: Any = None) -> Iterator[pd.DataFrame]:
+        """Data rows as DataFrames of at most chunk_rows rows over columns (default: self.columns; call inspect
+        first). Each row is cut down to those cells as it is read. Rows without a value in any of them are
+        dropped, which for the full column set is the browser's empty-row rule; a repeated header takes its
+        last column."""
+        columns = list(self.columns if columns is None else columns)
+        rows = _iter_cells(self.path, self.fmt, self.sheet, book)
+        try:
+            headers, data = _locate_header(rows)
+            positions = {h: i for i, h in enumerate(headers) if h}
+            take = [positions[c] for c in columns]
+            while True:
+                block = [[row[i] if i < len(row) else None for i in take] for row in islice(data, chunk_rows)]
+                if not block:
+                    break
+                frame = pd.DataFrame(block, columns=columns)
+                del block
+                filled = np.zeros(len(frame), dtype=bool)
+                for col in columns:
+                    filled |= _filled(frame[col])
+                yield frame[filled].reset_index(drop=True)
+        finally:
+            rows.close()
+
+    def read_frame(self, chunk_rows: int, book: Any = None) -> pd.DataFrame:
+        """The whole sheet as one frame; for the small media-mix sheet"""
+        frames = list(self.chunks(chunk_rows, book=book))
+        if not frames:
+            return pd.DataFrame(columns=self.columns)
+        return pd.concat(frames, ignore_index=True)
+
+
+def open_workbook(path: str, fmt: str, digest: str = "", size: int = 0,
+                  chunk_rows: int = 20_000) -> Tuple[SheetUpload, pd.DataFrame]:
+    """(raw sheet, media-mix frame) of an uploaded workbook, with sheets picked as the browser picks them.
+    The raw sheet is only inspected; the media-mix sheet is a few dozen rows and is read whole."""
+    with _opened(path, fmt) as book:
+        names = list(book.sheetnames) if book is not None else [None]
+        raw = SheetUpload(path, fmt, find_raw_sheet(names), digest, size, RAW_EXCLUDE_KEYWORDS).inspect(book)
+        mix_name = find_mix_sheet(names)
+        mix_df = SheetUpload(path, fmt, mix_name).inspect(book).read_frame(chunk_rows, book) if mix_name else pd.DataFrame()
+    return raw, mix_df
+
+
+def read_mix_file(path: str, fmt: str, chunk_rows: int = 20_000) -> pd.DataFrame:
+    """A separately uploaded media-mix file: its media-mix sheet, else its first sheet"""
+    with _opened(path, fmt) as book:
+        names = list(book.sheetnames) if book is not None else [None]
+        mix = SheetUpload(path, fmt, find_mix_sheet(names) or names[0]).inspect(book)
+        return mix.read_frame(chunk_rows, book)
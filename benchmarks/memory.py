@@ -0,0 +1,163 @@
+"""Peak-memory regression check for the CPU-bound analysis stage on a wide export.
+
+    python -m benchmarks.memory
+    python -m benchmarks.memory --rows 200000 --extra-columns 60 --max-ratio 0.3
+    python -m benchmarks.memory --upload csv --rows 300000 --max-ratio 0.1
+
+Peak allocation while pruning + cleaning + aggregating (tracemalloc, which also sees numpy buffers, plus
+Arrow's allocator, which holds pandas' string columns) is reported relative to the size of the uploaded
+frame. The run fails (exit status 1) when that ratio exceeds --max-ratio, so a reintroduced full-frame
+copy or per-row object column shows up as a failure rather than as a slow RSS creep in production.
+tests/test_memory.py runs the same check under pytest.
+
+--upload csv|xlsx writes the same sheet to a file and measures the streamed /analyze/upload path instead
+(read + clean + aggregate --chunk-rows at a time); its peak should stay flat as --rows grows. For xlsx it
+also holds the workbook's shared-strings table, which openpyxl loads whole and which grows with distinct text cells.
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import tempfile
+import threading
+import tracemalloc
+from typing import Any, Callable, Dict
+
+import pandas as pd
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+from benchmarks.synthetic import MAPPINGS, generate_mix_rows, generate_raw_rows
+
+MB = 1024 * 1024
+
+
+def _arrow_peak_during(fn: Callable[[], Any], interval: float = 0.001) -> int:
+    """Peak of Arrow's allocator above its starting level while fn() runs, sampled every interval.
+    pandas keeps str columns in Arrow buffers, which tracemalloc does not see."""
+    try:
+        import pyarrow as pa
+    except ImportError:
+        fn()
+        return 0
+    base = pa.total_allocated_bytes()
+    peak = base
+    done = threading.Event()
+
+    def sample():
+        nonlocal peak
+        while not done.is_set():
+            peak = max(peak, pa.total_allocated_bytes())
+            done.wait(interval)
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    try:
+        fn()
+    finally:
+        done.set()
+        sampler.join()
+    return max(peak, pa.total_allocated_bytes()) - base
+
+
+def peak_during(fn: Callable[[], Any]) -> int:
+    """Bytes allocated at the peak of fn(), above what was live when it started: Python/numpy allocations
+    (tracemalloc) plus Arrow buffers. The two peaks are added, so this is an upper bound."""
+    gc.collect()
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    base, _ = tracemalloc.get_traced_memory()
+    try:
+        arrow_peak = _arrow_peak_during(fn)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak - base + arrow_peak
+
+
+def measure(args) -> Dict[str, Any]:
+    from backend.services.aggregation import compute_aggregates, prune_columns
+
+    raw_rows = generate_raw_rows(args.rows, extra_columns=args.extra_columns, seed=args.seed)
+    raw_df = pd.DataFrame(raw_rows)
+    del raw_rows
+    mix_df = pd.DataFrame(generate_mix_rows(seed=args.seed))
+    r_map = MAPPINGS["raw_mapping"]
+    columns = {key: r_map.get(key) for key in
+               ("date_col", "media_col", "creative_col", "imp_col", "cost_col", "click_col", "view_col", "advertiser_col")}
+    frame_bytes = int(raw_df.memory_usage(deep=True).sum())
+
+    if args.upload:
+        peak = measure_upload(args, raw_df, mix_df, columns)
+    else:
+        # Same sequence analyze_frames runs (the executor in inline mode)
+        peak = peak_during(lambda: compute_aggregates(prune_columns(raw_df, columns), mix_df, columns))
+    return {
+        "source": args.upload or "frame",
+        "rows": args.rows,
+        "columns": len(raw_df.columns),
+        "frame_mb": round(frame_bytes / MB, 2),
+        "peak_mb": round(peak / MB, 2),
+        "peak_ratio": round(peak / frame_bytes, 3),
+        "pandas": pd.__version__,
+    }
+
+
+def write_sheet(raw_df: pd.DataFrame, fmt: str, path: str):
+    if fmt == "csv":
+        raw_df.to_csv(path, index=False, encoding="utf-8-sig")
+        return
+    from openpyxl import Workbook
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Raw Data")
+    sheet.append(list(raw_df.columns))
+    for row in raw_df.itertuples(index=False):
+        sheet.append([None if pd.isna(v) else v for v in row])
+    workbook.save(path)
+
+
+def measure_upload(args, raw_df: pd.DataFrame, mix_df: pd.DataFrame, columns: Dict[str, Any]) -> int:
+    """Peak of the worker side of /analyze/upload: the sheet is never loaded whole"""
+    from backend.services.aggregation import compute_upload_aggregates
+    from backend.services.workbook import RAW_EXCLUDE_KEYWORDS, SheetUpload
+
+    fd, path = tempfile.mkstemp(suffix=f".{args.upload}")
+    os.close(fd)
+    try:
+        write_sheet(raw_df, args.upload, path)
+        upload = SheetUpload(path, args.upload, size=os.path.getsize(path),
+                             exclude_keywords=RAW_EXCLUDE_KEYWORDS).inspect()
+        return peak_during(lambda: compute_upload_aggregates(upload, mix_df, columns, args.chunk_rows))
+    finally:
+        os.remove(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--extra-columns", type=int, default=40, help="unmapped columns in the export")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-ratio", type=float, default=0.25,
+                        help="allowed peak allocation as a fraction of the uploaded frame's size")
+    parser.add_argument("--upload", choices=("csv", "xlsx"), help="measure the streamed workbook upload path")
+    parser.add_argument("--chunk-rows", type=int, default=20_000, help="rows per chunk for --upload")
+    parser.add_argument("--output", help="also write the result JSON here")
+    args = parser.parse_args()
+
+    result = measure(args)
+    result["max_ratio"] = args.max_ratio
+    result["ok"] = result["peak_ratio"] <= args.max_ratio
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+    if not result["ok"]:
+        print(f"Peak memory regression: {result['peak_mb']} MB is {result['peak_ratio']}x the frame "
+              f"(limit {args.max_ratio}x)", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
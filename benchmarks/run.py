@@ -0,0 +1,243 @@
+"""Benchmark the analysis pipeline stage by stage and end to end (gateway -> backend), AI calls stubbed.
+
+    python -m benchmarks.run --rows 1000 10000 100000
+    python -m benchmarks.run --rows 10000 --compare benchmarks/results/bench-<before>.json
+
+Results are written as JSON; --compare prints the median ratio per stage against an earlier run
+and exits with status 1 when any stage got slower than --threshold.
+"""
+import argparse
+import asyncio
+import datetime
+import importlib.util
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Callable, Dict, List
+
+import pandas as pd
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+from benchmarks.synthetic import MAPPINGS, generate_mix_rows, generate_raw_rows
+
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+
+def stub_ai_service(latency: float = 0.0):
+    """Replace the LLM/search calls with fixed answers so only our own code is timed"""
+    from backend.services.ai_service import ai_service
+
+    async def detect_columns(columns):
+        return {}
+
+    async def generate_insight(summary):
+        await asyncio.sleep(latency)
+        return "벤치마크 인사이트"
+
+    async def generate_summary(insight):
+        return "벤치마크 요약"
+
+    async def generate_report(summary):
+        await asyncio.sleep(latency)
+        return "벤치마크 인사이트", "벤치마크 요약"
+
+    async def recommend_brand_color(name):
+        return "#000000"
+
+    ai_service.detect_columns = detect_columns
+    ai_service.generate_insight = generate_insight
+    ai_service.generate_summary = generate_summary
+    ai_service.generate_report = generate_report
+    ai_service.recommend_brand_color = recommend_brand_color
+
+
+def _summarize(samples: List[float]) -> Dict[str, float]:
+    ms = [s * 1000 for s in samples]
+    return {
+        "min_ms": round(min(ms), 3),
+        "median_ms": round(statistics.median(ms), 3),
+        "mean_ms": round(statistics.fmean(ms), 3),
+        "runs": len(ms),
+    }
+
+
+def time_sync(fn: Callable[[], Any], repeat: int, setup: Callable[[], Any] = None) -> Dict[str, float]:
+    samples = []
+    for _ in range(repeat):
+        arg = setup() if setup else None
+        start = time.perf_counter()
+        fn(arg) if setup else fn()
+        samples.append(time.perf_counter() - start)
+    return _summarize(samples)
+
+
+async def time_async(fn: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await fn()
+        samples.append(time.perf_counter() - start)
+    return _summarize(samples)
+
+
+def _load_gateway_app():
+    gateway_dir = os.path.join(ROOT, "gateway")
+    if gateway_dir not in sys.path:
+        sys.path.insert(0, gateway_dir)
+    spec = importlib.util.spec_from_file_location("gateway_main", os.path.join(gateway_dir, "main.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.app
+
+
+async def bench_case(params: Dict[str, Any], repeat: int) -> Dict[str, Any]:
+    import httpx
+    from backend.main import app as backend_app
+    from backend.services.aggregation import clean_rows, compute_budget, find_advertiser, summarize_rows
+    from backend.services.analysis_service import analysis_service
+    from backend.services.column_mapper import column_mapper
+    from backend.models.analysis import AnalysisRequest
+
+    raw_rows = generate_raw_rows(params["rows"], media=params["media"], creatives=params["creatives"],
+                                 days=params["days"], messy=params["messy"], seed=params["seed"])
+    mix_rows = generate_mix_rows(media=params["media"], messy=params["messy"], seed=params["seed"])
+    r_map = MAPPINGS["raw_mapping"]
+    columns = {key: r_map.get(key) for key in
+               ("date_col", "media_col", "creative_col", "imp_col", "cost_col", "click_col", "view_col", "advertiser_col")}
+    body = json.dumps({"raw_rows": raw_rows, "mix_rows": mix_rows, "mappings": MAPPINGS, "refresh": True},
+                      ensure_ascii=False).encode("utf-8")
+
+    stages: Dict[str, Dict[str, float]] = {}
+    stages["build_frames"] = time_sync(lambda: (pd.DataFrame(raw_rows), pd.DataFrame(mix_rows)), repeat)
+    raw_df, mix_df = pd.DataFrame(raw_rows), pd.DataFrame(mix_rows)
+    stages["detect_columns"] = await time_async(lambda: column_mapper.detect(list(raw_df.columns)), repeat)
+    # clean_rows assigns into its input, so every run gets a fresh frame
+    stages["clean_rows"] = time_sync(lambda df: clean_rows(df, columns), repeat, setup=raw_df.copy)
+    valid_df = clean_rows(raw_df.copy(), columns)
+    stages["summarize_rows"] = time_sync(lambda: summarize_rows(valid_df, columns), repeat)
+    stages["find_advertiser"] = time_sync(lambda: find_advertiser(valid_df, columns["advertiser_col"]), repeat)
+    stages["compute_budget"] = time_sync(lambda: compute_budget(mix_df), repeat)
+
+    req = AnalysisRequest(raw_rows=raw_rows, mix_rows=mix_rows, mappings=MAPPINGS, refresh=True)
+    stages["request_validation"] = time_sync(lambda: AnalysisRequest.model_validate_json(body), repeat)
+    stages["analyze_data"] = await time_async(lambda: analysis_service.analyze_data(req), repeat)
+
+    # Gateway -> backend over in-process ASGI transports: JSON parsing, validation, proxying and
+    # response encoding are all included, only the TCP hops are not
+    gateway_app = _load_gateway_app()
+    from api.backend_client import BackendPool
+    gateway_app.state.backend = BackendPool(transport=httpx.ASGITransport(app=backend_app))
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=gateway_app), base_url="http://gateway",
+                                 timeout=None) as client:
+        async def end_to_end():
+            response = await client.post("/api/analysis/analyze", content=body,
+                                         headers={"content-type": "application/json"})
+            response.raise_for_status()
+            if "error" in response.json():
+                raise RuntimeError(response.json()["error"])
+        stages["end_to_end"] = await time_async(end_to_end, repeat)
+    await gateway_app.state.backend.aclose()
+
+    return {
+        "params": params,
+        "payload_bytes": len(body),
+        "valid_rows": len(valid_df),
+        "stages": stages,
+    }
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "-C", ROOT, "rev-parse", "--short", "HEAD"],
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> bool:
+    """Print median ratios per stage; True when every stage is within the threshold"""
+    ok = True
+    base_cases = {json.dumps(c["params"], sort_keys=True): c for c in baseline["cases"]}
+    for case in current["cases"]:
+        base = base_cases.get(json.dumps(case["params"], sort_keys=True))
+        if base is None:
+            print(f"{case['params']}: no baseline case")
+            continue
+        print(f"rows={case['params']['rows']}")
+        for stage, stats in case["stages"].items():
+            before = base["stages"].get(stage)
+            if not before:
+                continue
+            ratio = stats["median_ms"] / before["median_ms"] if before["median_ms"] else 1.0
+            flag = ""
+            if ratio > threshold:
+                ok = False
+                flag = "  <-- regression"
+            print(f"  {stage:20s} {before['median_ms']:10.2f} -> {stats['median_ms']:10.2f} ms  x{ratio:.2f}{flag}")
+    return ok
+
+
+async def run(args) -> Dict[str, Any]:
+    from backend.core.config import settings
+    from backend.core.executor import shutdown_executor
+
+    stub_ai_service()
+    cases = []
+    try:
+        for rows in args.rows:
+            params = {"rows": rows, "media": args.media, "creatives": args.creatives, "days": args.days,
+                      "messy": not args.clean, "seed": args.seed}
+            print(f"Benchmarking {params} ...", file=sys.stderr)
+            cases.append(await bench_case(params, args.repeat))
+    finally:
+        shutdown_executor()
+    return {
+        "created_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "analysis_executor": settings.ANALYSIS_EXECUTOR,
+        "repeat": args.repeat,
+        "cases": cases,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--media", type=int, default=6, help="distinct media")
+    parser.add_argument("--creatives", type=int, default=40, help="distinct creatives")
+    parser.add_argument("--days", type=int, default=30, help="date span")
+    parser.add_argument("--clean", action="store_true", help="well-formed numbers and ISO dates only")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="JSON result path (default: benchmarks/results/bench-<time>.json)")
+    parser.add_argument("--compare", help="earlier result JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=1.2, help="slowdown ratio that counts as a regression")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+
+    output = args.output or os.path.join(RESULTS_DIR, f"bench-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    print(f"Wrote {output}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if not compare(result, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
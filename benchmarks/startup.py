@@ -0,0 +1,141 @@
+"""Cold-start cost of both tiers, each probe in a fresh interpreter.
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup --repeat 10 --check
+
+backend_import is `import backend.main`; backend_startup runs the app's lifespan startup on top of it.
+ai_warm_up is what the LLM client (vendor SDK import + configure) costs when warm_up() builds it;
+that work used to happen while importing ai_service. gateway_import is `import main` in gateway/.
+--check exits with status 1 when the gateway loads any backend module or when importing either tier
+loads the vendor SDK.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+# Modules that only the AI path needs; none of them should load before warm_up()
+SDK_MODULES = ("google.generativeai", "duckduckgo_search")
+
+_PRELUDE = """
+import asyncio, json, sys, time, warnings
+warnings.filterwarnings("ignore")
+def loaded(prefixes):
+    return sorted(m for m in sys.modules if m.split(".")[0] in prefixes or m in prefixes)
+"""
+
+PROBES = {
+    "backend_import": """
+start = time.perf_counter()
+import backend.main
+ms = (time.perf_counter() - start) * 1000
+print(json.dumps({"ms": ms, "modules": len(sys.modules), "sdk": [m for m in SDK if m in sys.modules]}))
+""",
+    "backend_startup": """
+start = time.perf_counter()
+import backend.main
+async def main():
+    async with backend.main.app.router.lifespan_context(backend.main.app):
+        return (time.perf_counter() - start) * 1000, [m for m in SDK if m in sys.modules]
+ms, sdk = asyncio.run(main())
+print(json.dumps({"ms": ms, "modules": len(sys.modules), "sdk": sdk}))
+""",
+    "ai_warm_up": """
+from backend.services.ai_service import ai_service
+start = time.perf_counter()
+asyncio.run(ai_service.warm_up())
+ms = (time.perf_counter() - start) * 1000
+print(json.dumps({"ms": ms, "modules": len(sys.modules), "sdk": [m for m in SDK if m in sys.modules]}))
+""",
+    "gateway_import": """
+start = time.perf_counter()
+import main
+ms = (time.perf_counter() - start) * 1000
+print(json.dumps({"ms": ms, "modules": len(sys.modules), "sdk": [m for m in SDK if m in sys.modules],
+                  "backend": loaded(("backend", "pandas", "numpy", "pyarrow"))}))
+""",
+}
+
+
+def run_probe(name: str) -> Dict[str, Any]:
+    code = _PRELUDE + f"SDK = {SDK_MODULES!r}\n" + PROBES[name]
+    cwd = os.path.join(ROOT, "gateway") if name == "gateway_import" else ROOT
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(p for p in (cwd, ROOT) if p)}
+    start = time.perf_counter()
+    out = subprocess.run([sys.executable, "-c", code], cwd=cwd, env=env, capture_output=True, text=True)
+    wall = (time.perf_counter() - start) * 1000
+    if out.returncode != 0:
+        raise RuntimeError(f"{name} probe failed:\n{out.stderr}")
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+    # Interpreter start + imports + teardown, as a process manager sees a respawn
+    result["process_ms"] = wall
+    return result
+
+
+def measure(repeat: int) -> Dict[str, Any]:
+    probes: Dict[str, Any] = {}
+    for name in PROBES:
+        runs: List[Dict[str, Any]] = [run_probe(name) for _ in range(repeat)]
+        last = runs[-1]
+        probes[name] = {
+            "median_ms": round(statistics.median(r["ms"] for r in runs), 1),
+            "min_ms": round(min(r["ms"] for r in runs), 1),
+            "process_median_ms": round(statistics.median(r["process_ms"] for r in runs), 1),
+            "modules": last["modules"],
+            "sdk_loaded": last["sdk"],
+        }
+        if "backend" in last:
+            probes[name]["backend_loaded"] = last["backend"]
+        print(f"{name:16s} {probes[name]['median_ms']:8.1f} ms  (process {probes[name]['process_median_ms']:.0f} ms, "
+              f"{last['modules']} modules)", file=sys.stderr)
+    return probes
+
+
+def check(probes: Dict[str, Any]) -> List[str]:
+    problems = []
+    if probes["gateway_import"].get("backend_loaded"):
+        problems.append(f"gateway loads backend modules: {probes['gateway_import']['backend_loaded']}")
+    # backend_startup is left out: its lifespan starts the warm-up thread, which may already be importing
+    for name in ("gateway_import", "backend_import"):
+        if probes[name]["sdk_loaded"]:
+            problems.append(f"{name} loads {probes[name]['sdk_loaded']} before warm-up")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--check", action="store_true", help="fail when the import boundaries above are crossed")
+    parser.add_argument("--output", help="JSON result path (default: benchmarks/results/startup-<time>.json)")
+    args = parser.parse_args()
+
+    result = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "repeat": args.repeat,
+        "probes": measure(args.repeat),
+    }
+    problems = check(result["probes"])
+    result["problems"] = problems
+
+    output = args.output or os.path.join(RESULTS_DIR, f"startup-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    print(json.dumps(result["probes"], ensure_ascii=False, indent=2))
+    print(f"Wrote {output}", file=sys.stderr)
+    if args.check and problems:
+        for problem in problems:
+            print(problem, file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Synthetic raw/media-mix sheets shaped like the Excel exports the frontend uploads."""
+import datetime
+import random
+from typing import Any, Dict, List
+
+MEDIA_NAMES = ["네이버 GFA", "카카오모먼트", "메타", "구글 DV360", "크로스타겟", "틱톡", "유튜브", "모비온", "데이블", "타불라"]
+ADVERTISERS = ["삼성전자", "LG전자", "현대자동차"]
+
+# The same mapping the frontend sends for these headers
+MAPPINGS = {
+    "raw_mapping": {
+        "date_col": "날짜", "media_col": "매체", "creative_col": "소재", "imp_col": "노출",
+        "click_col": "클릭", "cost_col": "비용", "view_col": "조회", "advertiser_col": "광고주",
+    }
+}
+
+
+def media_names(count: int) -> List[str]:
+    return [MEDIA_NAMES[i] if i < len(MEDIA_NAMES) else f"매체{i + 1}" for i in range(count)]
+
+
+def _messy_number(rng: random.Random, value: int) -> Any:
+    roll = rng.random()
+    if roll < 0.35:
+        return f"{value:,}"
+    if roll < 0.5:
+        return f"₩{value:,}"
+    if roll < 0.75:
+        return value
+    if roll < 0.85:
+        return str(value)
+    if roll < 0.9:
+        return float(value)
+    return rng.choice(["-", "", None])
+
+
+def _messy_date(rng: random.Random, day: datetime.date) -> Any:
+    roll = rng.random()
+    if roll < 0.6:
+        return day.isoformat()
+    if roll < 0.75:
+        return day.strftime("%Y.%m.%d")
+    if roll < 0.85:
+        return day.strftime("%Y/%m/%d")
+    if roll < 0.95:
+        return day.strftime("%Y-%m-%d 00:00:00")
+    # Blank/summary cells that the cleaner has to drop
+    return rng.choice(["", "합계", None])
+
+
+def generate_raw_rows(rows: int, media: int = 6, creatives: int = 40, days: int = 30, messy: bool = True,
+                      seed: int = 0, start: datetime.date = datetime.date(2024, 1, 1),
+                      extra_columns: int = 0) -> List[Dict[str, Any]]:
+    """Daily performance rows (one per date/media/creative line item) with optional messy formatting.
+    extra_columns adds unmapped report columns (campaign ids, targeting notes, ...) like wide exports have."""
+    rng = random.Random(seed)
+    medias = media_names(media)
+    advertiser = rng.choice(ADVERTISERS)
+    out = []
+    for _ in range(rows):
+        day = start + datetime.timedelta(days=rng.randrange(days))
+        imp = rng.randint(0, 200_000)
+        clk = rng.randint(0, max(imp // 50, 1))
+        cost = rng.randint(0, 2_000_000)
+        views = rng.randint(0, imp // 3 + 1)
+        if messy:
+            row = {
+                "날짜": _messy_date(rng, day), "매체": rng.choice(medias + [""]),
+                "소재": f"소재_{rng.randrange(creatives):04d}", "노출": _messy_number(rng, imp),
+                "클릭": _messy_number(rng, clk), "비용": _messy_number(rng, cost),
+                "조회": _messy_number(rng, views), "광고주": advertiser,
+            }
+        else:
+            row = {
+                "날짜": day.isoformat(), "매체": rng.choice(medias), "소재": f"소재_{rng.randrange(creatives):04d}",
+                "노출": imp, "클릭": clk, "비용": cost, "조회": views, "광고주": advertiser,
+            }
+        for i in range(extra_columns):
+            row[f"항목{i + 1}"] = f"캠페인-{rng.randrange(100_000):05d}" if i % 2 else rng.randint(0, 10_000)
+        out.append(row)
+    return out
+
+
+def generate_mix_rows(media: int = 6, plan_columns: int = 4, messy: bool = True, seed: int = 0) -> List[Dict[str, Any]]:
+    """Media-mix plan: one line item per media plus a total row, with extra plan columns"""
+    rng = random.Random(seed)
+    out = []
+    total = 0
+    for name in media_names(media):
+        budget = rng.randrange(1_000_000, 50_000_000, 10_000)
+        total += budget
+        row = {"매체": name, "상품": rng.choice(["DA", "VA", "SA"]), "예산": f"{budget:,}" if messy else budget,
+               "비중": f"{rng.randint(1, 40)}%"}
+        for i in range(plan_columns):
+            row[f"{i + 1}주차"] = _messy_number(rng, rng.randint(0, budget)) if messy else rng.randint(0, budget)
+        out.append(row)
+    out.append({"매체": "합계", "상품": "", "예산": f"{total:,}" if messy else total, "비중": "100%"})
+    return out
@@ -1,32 +1,114 @@
 from fastapi import APIRouter, Request, HTTPException
 from fastapi.responses import StreamingResponse
-from backend.models.analysis import AnalysisRequest
+from starlette.background import BackgroundTask
+from api.backend_client import get_backend
 import httpx
 import json
 import asyncio
+import time
+from shared.config import settings
+from shared.metrics import observe_stage, timed
+from shared.sse import EventStreamResponse
 
 router = APIRouter()
-BACKEND_URL = "http://localhost:8001"
 
-@router.post("/analyze")
-async def analyze(req: AnalysisRequest):
-    async with httpx.AsyncClient(timeout=60.0) as client:
+# Headers relayed unchanged so compressed bodies pass through without being decoded here
+FORWARD_REQUEST_HEADERS = ("content-type", "content-encoding", "content-length")
+FORWARD_RESPONSE_HEADERS = ("content-type", "content-encoding", "content-length", "retry-after")
+
+async def proxy_to_backend(request: Request, path: str, method: str = "POST",
+                           timeout: httpx.Timeout = None) -> StreamingResponse:
+    """Stream the request body to the backend and its response back, without parsing either.
+    Timed as gateway_stage_*: "backend_response" until the backend's headers, "proxy" until the last byte.
+    timeout overrides the pool's timeouts for this call (long-running streamed responses)."""
+    headers = {k: v for k, v in request.headers.items() if k in FORWARD_REQUEST_HEADERS}
+    # Ask the backend only for encodings the caller accepts, since the bytes are relayed as-is
+    headers["accept-encoding"] = request.headers.get("accept-encoding", "identity")
+    client = get_backend(request).client
+    sent = 0
+
+    async def upload():
+        nonlocal sent
+        async for chunk in request.stream():
+            sent += len(chunk)
+            yield chunk
+
+    content = upload() if method in ("POST", "PUT", "PATCH") else None
+    backend_req = client.build_request(
+        method, path, params=request.query_params, content=content, headers=headers,
+        timeout=timeout or client.timeout,
+    )
+    # Route template, not the raw path, so /jobs/{job_id} stays one series
+    route = getattr(request.scope.get("route"), "path", path)
+    start = time.perf_counter()
+    try:
+        with timed("gateway", "backend_response", route=route) as record:
+            response = await client.send(backend_req, stream=True)
+            record["bytes"] = sent
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Backend Error: {str(e)}")
+
+    async def relay():
+        relayed = 0
         try:
-            response = await client.post(f"{BACKEND_URL}/analyze", json=req.model_dump())
-            response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Backend Error: {str(e)}")
+            async for chunk in response.aiter_raw():
+                relayed += len(chunk)
+                yield chunk
+        finally:
+            record = {"stage": "proxy", "ms": round((time.perf_counter() - start) * 1000, 3),
+                      "bytes": sent + relayed}
+            observe_stage("gateway", record, route=route)
+
+    return StreamingResponse(
+        relay(),
+        status_code=response.status_code,
+        headers={k: v for k, v in response.headers.items() if k in FORWARD_RESPONSE_HEADERS},
+        background=BackgroundTask(response.aclose),
+    )
+
+@router.post("/analyze")
+async def analyze(request: Request):
+    # AnalysisRequest is validated once, by the backend
+    return await proxy_to_backend(request, "/analyze")
+
+@router.post("/analyze/columnar")
+async def analyze_columnar(request: Request):
+    # Arrow/Parquet/CSV bodies are forwarded as-is; the backend parses them straight into a DataFrame
+    return await proxy_to_backend(request, "/analyze/columnar")
+
+@router.post("/analyze/upload")
+async def analyze_upload(request: Request):
+    # The workbook is streamed through as multipart; the backend parses it chunk by chunk
+    return await proxy_to_backend(request, "/analyze/upload")
+
+@router.post("/analyze/batch")
+async def analyze_batch(request: Request):
+    # NDJSON lines arrive as items finish; gaps between them can outlast the pooled read timeout
+    timeout = httpx.Timeout(None, connect=get_backend(request).client.timeout.connect)
+    return await proxy_to_backend(request, "/analyze/batch", timeout=timeout)
+
+@router.post("/jobs")
+async def submit_job(request: Request):
+    return await proxy_to_backend(request, "/jobs")
+
+@router.get("/jobs/{job_id}")
+async def get_job(request: Request, job_id: str):
+    return await proxy_to_backend(request, f"/jobs/{job_id}", method="GET")
 
 @router.get("/stream")
 async def stream_events(request: Request):
-    async def event_generator():
-        async with httpx.AsyncClient(timeout=None) as client:
-            async with client.stream("GET", f"{BACKEND_URL}/stream") as response:
-                async for line in response.aiter_lines():
-                    if await request.is_disconnected():
-                        break
-                    if line:
-                        yield f"{line}\n\n"
-
-    return StreamingResponse(event_generator(), media_type="text/event-stream")
+    client = get_backend(request).client
+    # SSE stays open indefinitely, but the backend sends a heartbeat at least every STREAM_HEARTBEAT
+    # seconds; a read gap well beyond that means the backend is gone
+    timeout = httpx.Timeout(settings.STREAM_HEARTBEAT * 3, connect=client.timeout.connect)
+    headers = {k: v for k, v in request.headers.items() if k == "last-event-id"}
+
+    async def relay():
+        # Frames are relayed as raw bytes: no line splitting or re-framing, and disconnects are
+        # noticed by the response itself rather than polled per line
+        async with client.stream("GET", "/stream", params=request.query_params, headers=headers,
+                                 timeout=timeout) as response:
+            async for chunk in response.aiter_raw():
+                yield chunk
+
+    return EventStreamResponse(relay(), send_timeout=settings.STREAM_SEND_TIMEOUT)
@@ -0,0 +1,64 @@
+import logging
+from typing import Optional
+import httpx
+from fastapi import Request
+from shared.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class BackendPool:
+    """Application-scoped pooled client for gateway -> backend calls"""
+
+    def __init__(self, transport: Optional[httpx.AsyncBaseTransport] = None):
+        http2 = settings.BACKEND_HTTP2
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning("BACKEND_HTTP2 requires the 'h2' package; falling back to HTTP/1.1")
+                http2 = False
+        self.http2 = http2
+        self.requests_total = 0
+        self.errors_total = 0
+        self.client = httpx.AsyncClient(
+            base_url=settings.BACKEND_URL,
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=settings.BACKEND_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.BACKEND_MAX_KEEPALIVE,
+                keepalive_expiry=settings.BACKEND_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(settings.BACKEND_READ_TIMEOUT, connect=settings.BACKEND_CONNECT_TIMEOUT),
+            event_hooks={"request": [self._on_request], "response": [self._on_response]},
+            transport=transport,  # e.g. httpx.ASGITransport for an in-process backend (benchmarks)
+        )
+
+    async def _on_request(self, request: httpx.Request):
+        self.requests_total += 1
+
+    async def _on_response(self, response: httpx.Response):
+        if response.status_code >= 500:
+            self.errors_total += 1
+
+    def stats(self) -> dict:
+        # httpx has no public pool API; read the httpcore pool behind the default transport
+        pool = getattr(self.client._transport, "_pool", None)
+        connections = list(getattr(pool, "connections", []))
+        return {
+            "backend_url": settings.BACKEND_URL,
+            "http2": self.http2,
+            "max_connections": settings.BACKEND_MAX_CONNECTIONS,
+            "max_keepalive": settings.BACKEND_MAX_KEEPALIVE,
+            "connections": len(connections),
+            "idle_connections": sum(1 for c in connections if c.is_idle()),
+            "requests_total": self.requests_total,
+            "errors_total": self.errors_total,
+        }
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+def get_backend(request: Request) -> BackendPool:
+    return request.app.state.backend
@@ -1,15 +1,29 @@
 import sys
 import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import Response
 from fastapi.middleware.cors import CORSMiddleware
 
-# Add parent directory to sys.path to allow importing from 'backend' sibling
+# Add parent directory to sys.path to allow importing the 'shared' sibling (settings, schemas, metrics);
+# nothing from 'backend' is loaded here
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from backend.core.config import settings
+from shared.config import settings
+from shared.metrics import CONTENT_TYPE, registry
 from api import analysis_router
+from api.backend_client import BackendPool
 
-app = FastAPI(title=settings.PROJECT_NAME)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One pooled backend client for the whole process, closed on shutdown
+    app.state.backend = BackendPool()
+    try:
+        yield
+    finally:
+        await app.state.backend.aclose()
+
+app = FastAPI(title=settings.PROJECT_NAME, lifespan=lifespan)
 
 # Relaxed CORS for local development
 app.add_middleware(
@@ -25,5 +39,14 @@ app.add_middleware(
 async def root():
     return {"message": "Welcome to Report Analysis API"}
 
+@app.get("/pool/stats")
+async def pool_stats():
+    return app.state.backend.stats()
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus histograms for the proxy hop (gateway_stage_*, labelled by route)"""
+    return Response(registry.render(), media_type=CONTENT_TYPE)
+
 # Include routers
 app.include_router(analysis_router.router, prefix="/api/analysis", tags=["analysis"])
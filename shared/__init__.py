@@ -0,0 +1,2 @@
+"""Code both tiers import: settings the gateway needs, request/response schemas and the metrics registry.
+Depends only on pydantic and the standard library, so the gateway never loads backend modules."""
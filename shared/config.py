@@ -0,0 +1,28 @@
+from pydantic_settings import BaseSettings
+from typing import List
+
+class SharedSettings(BaseSettings):
+    """Settings the gateway reads; the backend's Settings extends these"""
+
+    PROJECT_NAME: str = "Report Analysis API"
+    ALLOWED_ORIGINS: List[str] = ["*"]  # Relaxed CORS for local development
+
+    # Gateway -> backend connection pool
+    BACKEND_URL: str = "http://localhost:8001"
+    BACKEND_MAX_CONNECTIONS: int = 100
+    BACKEND_MAX_KEEPALIVE: int = 20
+    BACKEND_KEEPALIVE_EXPIRY: float = 30.0  # seconds an idle connection is kept
+    BACKEND_CONNECT_TIMEOUT: float = 5.0
+    BACKEND_READ_TIMEOUT: float = 60.0
+    BACKEND_HTTP2: bool = False  # needs the 'h2' package
+
+    # Event streams (/stream), both tiers
+    STREAM_HEARTBEAT: float = 15.0  # seconds of silence before a keep-alive comment is sent
+    STREAM_SEND_TIMEOUT: float = 10.0  # a client that can't take a frame for this long is disconnected
+
+    model_config = {
+        "env_file": ".env",
+        "extra": "ignore"
+    }
+
+settings = SharedSettings()
@@ -0,0 +1,138 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Prometheus text exposition format, served as-is by /metrics
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+TIME_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+ROW_BUCKETS = (10, 100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+BYTE_BUCKETS = (1_024, 10_240, 102_400, 1_048_576, 10_485_760, 104_857_600, 1_073_741_824)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(pairs: Iterable[Tuple[str, str]]) -> str:
+    body = ",".join(f'{k}="{_escape(v)}"' for k, v in pairs)
+    return "{" + body + "}" if body else ""
+
+
+class Histogram:
+    """Cumulative-bucket histogram with labels, thread-safe (the analysis executor may run in threads)"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = TIME_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[tuple, list] = {}  # label values -> [count per bucket..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: Any):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[bisect_left(self.buckets, value)] += 1
+            series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = {key: list(series) for key, series in self._series.items()}
+        for key, series in sorted(snapshot.items()):
+            pairs = list(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(pairs + [('le', repr(float(bound)))])} {cumulative}")
+            cumulative += series[len(self.buckets)]
+            lines.append(f"{self.name}_bucket{_format_labels(pairs + [('le', '+Inf')])} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(pairs)} {series[-1]}")
+            lines.append(f"{self.name}_count{_format_labels(pairs)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = TIME_BUCKETS) -> Histogram:
+        """Get or create; the first registration fixes labels and buckets"""
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = Histogram(name, documentation, labelnames, buckets)
+            return metric
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(line for metric in metrics for line in metric.render()) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+def observe_stage(prefix: str, record: Dict[str, Any], **labels: Any):
+    """Feed one stage record into <prefix>_stage_seconds / _rows / _bytes"""
+    labelnames = ("stage",) + tuple(sorted(labels))
+    labels = {"stage": record["stage"], **labels}
+    registry.histogram(f"{prefix}_stage_seconds", f"Duration of {prefix} stages", labelnames).observe(
+        record["ms"] / 1000, **labels)
+    if record.get("rows") is not None:
+        registry.histogram(f"{prefix}_stage_rows", f"Rows handled by {prefix} stages", labelnames,
+                           ROW_BUCKETS).observe(record["rows"], **labels)
+    if record.get("bytes") is not None:
+        registry.histogram(f"{prefix}_stage_bytes", f"Payload bytes handled by {prefix} stages", labelnames,
+                           BYTE_BUCKETS).observe(record["bytes"], **labels)
+
+
+@contextmanager
+def timed(prefix: str, stage: str, rows: Optional[int] = None, bytes: Optional[int] = None, observe: bool = True,
+          **labels: Any):
+    """Time a block as one stage; yields its record so rows/bytes can be filled in once known"""
+    record = {"stage": stage, "ms": 0.0, "rows": rows, "bytes": bytes}
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record["ms"] = round((time.perf_counter() - start) * 1000, 3)
+        if observe:
+            observe_stage(prefix, record, **labels)
+
+
+class StageTimer:
+    """Stage records of one analysis, kept for the status_update breakdown and fed to the histograms.
+    observe=False only collects (worker processes, whose records the parent adds with add())."""
+
+    def __init__(self, prefix: str = "analysis", observe: bool = True):
+        self.prefix = prefix
+        self.observe = observe
+        self.records: List[Dict[str, Any]] = []
+
+    @contextmanager
+    def stage(self, name: str, rows: Optional[int] = None, bytes: Optional[int] = None):
+        # Appended once finished, so a breakdown taken mid-analysis only lists completed stages
+        try:
+            with timed(self.prefix, name, rows=rows, bytes=bytes, observe=self.observe) as record:
+                yield record
+        finally:
+            self.records.append(record)
+
+    def add(self, records: Iterable[Dict[str, Any]]):
+        for record in records:
+            self.records.append(record)
+            if self.observe:
+                observe_stage(self.prefix, record)
+
+    def breakdown(self) -> List[Dict[str, Any]]:
+        return [{k: v for k, v in record.items() if v is not None} for record in self.records]
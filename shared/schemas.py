@@ -0,0 +1,94 @@
+import datetime
+from pydantic import BaseModel, model_validator
+from typing import List, Dict, Any, Literal, Optional
+
+class ComparisonWindow(BaseModel):
+    """A date window compared against an earlier one, next to the default latest-day/previous-day view.
+    wow and mtd are relative to the latest date in the data; custom uses start/end and, optionally,
+    compare_start/compare_end (default: the equally long span right before start)."""
+    type: Literal["wow", "mtd", "custom"] = "custom"
+    name: Optional[str] = None
+    start: Optional[datetime.date] = None
+    end: Optional[datetime.date] = None
+    compare_start: Optional[datetime.date] = None
+    compare_end: Optional[datetime.date] = None
+
+    @model_validator(mode="after")
+    def check_dates(self):
+        if self.type == "custom" and (self.start is None or self.end is None):
+            raise ValueError("custom comparison needs start and end")
+        for lo, hi in ((self.start, self.end), (self.compare_start, self.compare_end)):
+            if lo and hi and lo > hi:
+                raise ValueError("comparison window start is after its end")
+        return self
+
+class AnalysisRequest(BaseModel):
+    raw_rows: List[Dict[str, Any]]
+    mix_rows: List[Dict[str, Any]]
+    mappings: Dict[str, Any]
+    # Optional client-chosen event channel; generated by the backend when omitted
+    channel_id: Optional[str] = None
+    # Skip the result cache and recompute (the fresh result replaces the cached one)
+    refresh: bool = False
+    # Incremental mode: aggregates are kept per campaign; with append=True raw_rows hold only
+    # new or changed days (each day sent replaces the stored one) and the rest comes from the store
+    campaign_id: Optional[str] = None
+    append: bool = False
+    # Extra windows (week over week, month to date, custom ranges) answered from the daily cube
+    comparisons: Optional[List[ComparisonWindow]] = None
+
+class BatchAnalysisRequest(BaseModel):
+    # Each item is analyzed like a POST /analyze body; results stream back as NDJSON lines.
+    # Items stay plain dicts here and are validated one by one, so a malformed item is reported on
+    # its own line instead of failing the whole batch with a 422
+    items: List[Dict[str, Any]]
+
+class MetricSet(BaseModel):
+    today: float
+    prev: float
+    delta: Optional[float] = None
+    total: Optional[float] = 0
+
+class MediaMetricDetail(BaseModel):
+    impressions: MetricSet
+    clicks: MetricSet
+    spend: MetricSet
+
+class MediaComparison(BaseModel):
+    name: str
+    metrics: MediaMetricDetail
+
+class OverallStats(BaseModel):
+    impressions: MetricSet
+    clicks: MetricSet
+    spend: MetricSet
+
+class AnalysisResponse(BaseModel):
+    date: str
+    prevDate: str
+    mediaComparison: List[MediaComparison]
+    overall: OverallStats
+    budgetTotal: Optional[float] = 0
+    budgetAchievement: Optional[float] = 0
+    mediaBudgetMap: Optional[Dict[str, float]] = {}
+    insight: Optional[str] = None
+    insight_summary: Optional[str] = None
+    error: Optional[str] = None
+    advertiser: Optional[str] = None
+    id: Optional[str] = None
+    channelId: Optional[str] = None
+    campaignId: Optional[str] = None
+    comparisons: Optional[List[Dict[str, Any]]] = None
+    # Raw data for download/re-analysis, usually loaded separately or attached
+    raw_data: Optional[Dict[str, Any]] = None
+
+class JobStatus(BaseModel):
+    id: str
+    status: str = "queued"  # queued | running | completed | failed
+    progress: Optional[str] = None
+    stages: Optional[List[Dict[str, Any]]] = None  # per-stage timings from the latest status_update
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
@@ -0,0 +1,44 @@
+import asyncio
+import logging
+from typing import AsyncIterable, Mapping, Optional
+from starlette.responses import StreamingResponse
+from starlette.types import Message, Send
+
+logger = logging.getLogger(__name__)
+
+# SSE comment line: ignored by EventSource, but keeps proxies from closing an idle connection
+HEARTBEAT = ": ping\n\n"
+
+
+class SlowClientError(Exception):
+    pass
+
+
+class EventStreamResponse(StreamingResponse):
+    """text/event-stream whose writes have a deadline. A client that can't take a frame within
+    send_timeout (its socket buffer is full) is disconnected instead of pinning a generator, an
+    upstream connection and a queue; EventSource reconnects with Last-Event-ID."""
+
+    media_type = "text/event-stream"
+
+    def __init__(self, content: AsyncIterable, send_timeout: float, headers: Optional[Mapping[str, str]] = None):
+        # no-cache / no buffering: intermediaries must pass frames through as they are written
+        super().__init__(content, headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", **(headers or {})})
+        self.send_timeout = send_timeout
+
+    async def stream_response(self, send: Send) -> None:
+        async def send_with_deadline(message: Message):
+            try:
+                await asyncio.wait_for(send(message), self.send_timeout)
+            except asyncio.TimeoutError:
+                raise SlowClientError() from None
+
+        try:
+            await super().stream_response(send_with_deadline)
+        except SlowClientError:
+            # Returning mid-response makes the server drop the connection; close the generator now so
+            # its subscription / upstream stream is released without waiting for garbage collection
+            logger.warning(f"SSE client did not read for {self.send_timeout}s; disconnecting")
+            aclose = getattr(self.body_iterator, "aclose", None)
+            if aclose is not None:
+                await aclose()
@@ -0,0 +1,12 @@
+import pytest
+
+from backend.core.config import settings
+from backend.services.ai_service import ai_service
+from backend.services.llm_providers import StubProvider
+
+
+@pytest.fixture
+def stub_analysis(monkeypatch):
+    """Full analyses without a model vendor or worker processes: instant stub LLM, inline CPU stage"""
+    monkeypatch.setattr(settings, "ANALYSIS_EXECUTOR", "inline")
+    monkeypatch.setattr(ai_service, "_provider", StubProvider(latency=0, jitter=0, error_rate=0, seed=0))
@@ -0,0 +1,52 @@
+import asyncio
+import time
+
+from backend.core.config import settings
+from backend.services.ai_service import DEFAULT_BRAND_COLOR, AIService
+from backend.services.llm_providers import LLMProvider
+
+
+class ScriptedProvider(LLMProvider):
+    """Answers generate() calls from a list, in order"""
+
+    name = "scripted"
+
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.prompts = []
+
+    async def generate(self, prompt, call="generate", json_output=False):
+        self.prompts.append(prompt)
+        return self.replies.pop(0)
+
+    async def search(self, query, max_results=3):
+        return []
+
+
+def test_unusable_brand_color_is_retried_after_negative_ttl(monkeypatch):
+    monkeypatch.setattr(settings, "BRAND_COLOR_NEGATIVE_TTL", 0.05)
+    provider = ScriptedProvider(["잘 모르겠습니다", "#112233"])
+    service = AIService(provider=provider)
+
+    assert asyncio.run(service.recommend_brand_color("삼성")) == DEFAULT_BRAND_COLOR
+    # Within the negative TTL: answered from the brand cache
+    assert asyncio.run(service.recommend_brand_color("삼성")) == DEFAULT_BRAND_COLOR
+    assert len(provider.prompts) == 1
+
+    time.sleep(0.1)
+    assert asyncio.run(service.recommend_brand_color("삼성")) == "#112233"
+    assert len(provider.prompts) == 2
+
+
+def test_brand_color_answer_is_cached():
+    provider = ScriptedProvider(["브랜드 색상은 #AA0011 입니다"])
+    service = AIService(provider=provider)
+    assert asyncio.run(service.recommend_brand_color(" Samsung ")) == "#AA0011"
+    assert asyncio.run(service.recommend_brand_color("samsung")) == "#AA0011"
+    assert len(provider.prompts) == 1
+
+
+def test_brand_color_hex_forms():
+    for reply, expected in [("#abc", "#abc"), ("색상: #004dae.", "#004dae"), ("#11223344", "#11223344"), ("#12345", DEFAULT_BRAND_COLOR)]:
+        service = AIService(provider=ScriptedProvider([reply]))
+        assert asyncio.run(service.recommend_brand_color("brand")) == expected
@@ -0,0 +1,48 @@
+import json
+
+from fastapi.testclient import TestClient
+
+from backend.main import app
+from benchmarks.synthetic import MAPPINGS, generate_mix_rows, generate_raw_rows
+
+
+def _item(seed, **extra):
+    return {"raw_rows": generate_raw_rows(200, seed=seed), "mix_rows": generate_mix_rows(seed=seed),
+            "mappings": MAPPINGS, "refresh": True, **extra}
+
+
+def _post(body):
+    response = TestClient(app).post("/analyze/batch", json=body)
+    lines = [json.loads(line) for line in response.text.splitlines() if line]
+    return response, lines
+
+
+def test_batch_reports_invalid_items_without_failing_the_rest(stub_analysis):
+    response, lines = _post({"items": [_item(1, channel_id="first"), {"raw_rows": "bad"}, _item(2)]})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    results = {line["index"]: line for line in lines[:-1]}
+    assert sorted(results) == [0, 1, 2]
+    assert "error" not in results[0] and results[0]["channelId"] == "first" and results[0]["date"]
+    assert "error" not in results[2] and results[2]["channelId"]
+    assert results[1]["error"].startswith("요청 형식 오류") and "raw_rows" in results[1]["error"]
+    assert "channelId" not in results[1]
+    assert lines[-1]["batch"]["items"] == 3
+    assert lines[-1]["batch"]["completed"] == 2 and lines[-1]["batch"]["failed"] == 1
+
+
+def test_batch_analysis_errors_stay_per_item(stub_analysis):
+    # Valid request, but no row has any performance
+    idle = {"날짜": "2024-01-01", "매체": "네이버", "소재": "A", "노출": 0, "클릭": 0, "비용": 0, "조회": 0, "광고주": "삼성"}
+    broken = _item(3, raw_rows=[idle])
+    response, lines = _post({"items": [broken, _item(4)]})
+    results = {line["index"]: line for line in lines[:-1]}
+    assert "error" in results[0] and "error" not in results[1]
+    assert lines[-1]["batch"]["failed"] == 1
+
+
+def test_batch_limits(stub_analysis, monkeypatch):
+    from backend.core.config import settings
+    assert TestClient(app).post("/analyze/batch", json={"items": []}).status_code == 422
+    monkeypatch.setattr(settings, "BATCH_MAX_ITEMS", 1)
+    assert TestClient(app).post("/analyze/batch", json={"items": [{}, {}]}).status_code == 413
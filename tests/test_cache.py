@@ -0,0 +1,50 @@
+import time
+
+from backend.core.cache import LRUCache, SQLiteStore, TieredCache
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert len(cache) == 2
+
+
+def test_lru_ttl_and_per_entry_override():
+    cache = LRUCache(maxsize=4, ttl=0.05)
+    cache.set("short", 1)
+    cache.set("forever", 2, ttl=None)
+    time.sleep(0.1)
+    assert cache.get("short", "gone") == "gone"
+    assert cache.get("forever") == 2
+
+
+def test_tiered_cache_disk_tier_survives_restart(tmp_path):
+    path = str(tmp_path / "cache.db")
+    TieredCache("results", maxsize=2, ttl=60, db_path=path).set("k", {"v": [1, 2]})
+    reopened = TieredCache("results", maxsize=2, ttl=60, db_path=path)
+    assert reopened.get("k") == {"v": [1, 2]}
+    assert reopened.get("k") == {"v": [1, 2]}
+    assert reopened.stats()["disk_hits"] == 1 and reopened.stats()["hits"] == 2
+    assert reopened.get("missing") is None and reopened.stats()["misses"] == 1
+    reopened.delete("k")
+    assert TieredCache("results", db_path=path).get("k") is None
+
+
+def test_tiered_cache_disk_entries_expire(tmp_path):
+    path = str(tmp_path / "cache.db")
+    TieredCache("brands", ttl=0.05, db_path=path).set("k", "#fff")
+    time.sleep(0.1)
+    assert TieredCache("brands", ttl=0.05, db_path=path).get("k") is None
+
+
+def test_sqlite_store_keeps_newest_rows(tmp_path):
+    store = SQLiteStore(str(tmp_path / "cache.db"), "results", max_rows=2)
+    for i in range(4):
+        store.set(f"k{i}", i)
+    assert store.get("k0") is None and store.get("k1") is None
+    assert store.get("k3") == (3, None)
@@ -0,0 +1,76 @@
+import datetime
+import sqlite3
+
+import pandas as pd
+
+from backend.services.aggregation import compute_aggregates, compute_campaign_aggregates
+from backend.services.campaign_store import CampaignStore
+from benchmarks.synthetic import MAPPINGS, generate_raw_rows
+
+COLUMNS = MAPPINGS["raw_mapping"]
+
+
+def test_meta_table_from_before_media_budget_is_migrated(tmp_path):
+    path = str(tmp_path / "campaigns.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE campaign_meta (campaign_id TEXT PRIMARY KEY, advertiser TEXT, budget_total REAL, updated_at REAL)")
+    conn.execute("INSERT INTO campaign_meta VALUES ('c1', '삼성', 100.0, 1.0)")
+    conn.commit()
+    conn.close()
+
+    store = CampaignStore(path)
+    assert store.get_meta("c1") == {"advertiser": "삼성", "budget_total": 100.0, "media_budget": {}}
+    store.set_meta("c1", "LG", 200, {"네이버": 50.0})
+    assert CampaignStore(path).get_meta("c1") == {"advertiser": "LG", "budget_total": 200.0, "media_budget": {"네이버": 50.0}}
+
+
+def _frame(rows):
+    return pd.DataFrame(rows)
+
+
+def _comparable(agg):
+    agg = {k: v for k, v in agg.items() if k not in ("stages", "comparisons")}
+    agg["raw_total_spend"] = int(agg.get("raw_total_spend", 0))
+    return agg
+
+
+def _campaign(rows, append, db_path, comparisons=None):
+    return compute_campaign_aggregates(_frame(rows), pd.DataFrame(), COLUMNS, "camp", append, db_path, comparisons)
+
+
+def _one_shot(rows, comparisons=None):
+    return compute_aggregates(_frame(rows), pd.DataFrame(), COLUMNS, comparisons)
+
+
+ROWS = generate_raw_rows(1500, media=6, creatives=12, days=10, messy=False, seed=5)
+SPLIT = datetime.date(2024, 1, 8).isoformat()
+EARLY = [r for r in ROWS if r["날짜"] < SPLIT]
+LATE = [r for r in ROWS if r["날짜"] >= SPLIT]
+
+
+def test_campaign_append_matches_one_shot_analysis(tmp_path):
+    db_path = str(tmp_path / "campaigns.db")
+    comparisons = [{"type": "wow", "name": "wow"}]
+    _campaign(EARLY, append=False, db_path=db_path)
+    appended = _campaign(LATE, append=True, db_path=db_path, comparisons=comparisons)
+    expected = _one_shot(EARLY + LATE, comparisons)
+    # Upload order, not the store's key order
+    assert [m["name"] for m in appended["media_results"]] == [m["name"] for m in expected["media_results"]]
+    assert _comparable(appended) == _comparable(expected)
+    assert appended["comparisons"] == expected["comparisons"]
+
+
+def test_campaign_append_replaces_resent_days(tmp_path):
+    db_path = str(tmp_path / "campaigns.db")
+    _campaign(EARLY + LATE, append=False, db_path=db_path)
+    resent = [{**r, "비용": r["비용"] * 2} for r in ROWS if r["날짜"] == SPLIT]
+    merged = _campaign(resent, append=True, db_path=db_path)
+    # The re-sent day replaces the stored one and, like a re-upload, comes after the other days
+    expected = _one_shot([r for r in EARLY + LATE if r["날짜"] != SPLIT] + resent)
+    assert _comparable(merged) == _comparable(expected)
+
+
+def test_full_upload_replaces_the_campaign(tmp_path):
+    db_path = str(tmp_path / "campaigns.db")
+    _campaign(EARLY, append=False, db_path=db_path)
+    assert _comparable(_campaign(LATE, append=False, db_path=db_path)) == _comparable(_one_shot(LATE))
@@ -0,0 +1,71 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.services.cleaning import clean_numeric_column, parse_date_column, parse_date_safe, robust_to_numeric
+
+NUMERIC_CELLS = [
+    '-', ' - ', '', '   ', None, np.nan,
+    '₩1,000', '$2,500', '₩ 12,345,678', '1,000원', '3,000,000',
+    '-500', '₩-1,200', '-0', '12.5', '13.5', '0.4999', '-2.5', '1.2.3', '5-',
+    0, 7, -3, 2.5, 3.5, 1e6, 1e20, '1e20', True,
+]
+
+DATE_CELLS = [
+    '2024-01-05', ' 2024-01-05 ', '2024.01.05', '2024/1/5', '01/05/2024', '20240105',
+    '2024-01-05 13:45:00', '2024-01-05T09:00:00+09:00', 'Jan 5, 2024',
+    '', '   ', '-', None, np.nan, 'not a date',
+    datetime.date(2024, 1, 6), datetime.datetime(2024, 1, 7, 23, 59), pd.Timestamp('2024-01-08 10:00'),
+]
+
+
+def _reference(series: pd.Series, func) -> list:
+    return [func(v) for v in series]
+
+
+@pytest.mark.parametrize("cells", [
+    NUMERIC_CELLS,
+    NUMERIC_CELLS[:-3],  # no values beyond int64, so the vectorized path is taken
+    [c for c in NUMERIC_CELLS if isinstance(c, str)],
+    [1.5, 2.5, -0.5, None],
+    [1, 2, 3],
+])
+def test_clean_numeric_column_matches_per_cell(cells):
+    series = pd.Series(cells, dtype=object)
+    assert clean_numeric_column(series).tolist() == _reference(series, robust_to_numeric)
+
+
+def test_clean_numeric_column_typed_columns():
+    for series in (pd.Series([1.5, 2.5, np.nan]), pd.Series([1, -2, 3]), pd.Series(['₩1,000', '-', None], dtype='str')):
+        assert clean_numeric_column(series).tolist() == _reference(series, robust_to_numeric)
+
+
+def test_clean_numeric_column_integers_stay_exact():
+    big = 2 ** 53 + 1
+    for series in (pd.Series([big, -big, 3], dtype='int64'), pd.Series([big, 7], dtype=object),
+                   pd.Series([2 ** 63 + 1], dtype='uint64')):
+        assert clean_numeric_column(series).tolist() == _reference(series, robust_to_numeric)
+    # Nullable Int64 (Arrow uploads): missing cells become 0 like blanks
+    assert clean_numeric_column(pd.Series([big, None], dtype='Int64')).tolist() == [big, 0]
+
+
+def test_clean_numeric_column_beyond_int64_keeps_exact_ints():
+    result = clean_numeric_column(pd.Series([1e20, '₩1,000'], dtype=object))
+    assert result.tolist() == [10 ** 20, 1000]
+
+
+@pytest.mark.parametrize("cells", [
+    DATE_CELLS,
+    [c for c in DATE_CELLS if isinstance(c, str)],
+    ['2024-01-05', '2024.01.06', '2024-01-05', '01/07/2024', '2024.01.06'],
+])
+def test_parse_date_column_matches_per_cell(cells):
+    series = pd.Series(cells, dtype=object)
+    assert parse_date_column(series).tolist() == _reference(series, parse_date_safe)
+
+
+def test_parse_date_column_datetime_dtype():
+    series = pd.Series(pd.to_datetime(['2024-01-05 10:00', None, '2024-01-06 00:00']))
+    assert parse_date_column(series).tolist() == _reference(series, parse_date_safe)
@@ -0,0 +1,61 @@
+import asyncio
+
+from backend.services import ai_service as ai_module
+from backend.services.column_mapper import ColumnMapper, header_signature, is_sufficient, match_columns
+
+
+def test_match_columns_korean_report():
+    columns = ['날짜', '매체', '광고소재', '노출수', '클릭수', '클릭률', 'CTR', 'CPC', '광고비', '영상조회수', '광고주']
+    assert match_columns(columns) == {
+        "date_col": '날짜',
+        "imp_col": '노출수',
+        "click_col": '클릭수',
+        "view_col": '영상조회수',
+        "cost_col": '광고비',
+        "media_col": '매체',
+        "creative_col": '광고소재',
+        "advertiser_col": '광고주',
+    }
+
+
+def test_match_columns_english_headers_and_missing_roles():
+    mapping = match_columns(['Date', 'Channel', 'Ad Name', 'Impressions', 'Clicks', 'Spend', 'CPM'])
+    assert mapping["date_col"] == 'Date'
+    assert mapping["media_col"] == 'Channel'
+    assert mapping["creative_col"] == 'Ad Name'
+    assert mapping["cost_col"] == 'Spend'
+    assert mapping["view_col"] is None and mapping["advertiser_col"] is None
+    assert is_sufficient(mapping)
+    assert not is_sufficient(match_columns(['매체', '소재']))
+
+
+def test_header_signature_ignores_order_case_and_spacing():
+    assert header_signature(['날짜', 'Media Name', '노출']) == header_signature(['노출', 'media_name', ' 날짜'])
+    assert header_signature(['날짜', '노출']) != header_signature(['날짜', '클릭'])
+
+
+def test_detect_caches_keyword_mapping_and_resolves_exact_headers():
+    mapper = ColumnMapper()
+    first = asyncio.run(mapper.detect(['날짜', '매체', '노출수', '광고비']))
+    again = asyncio.run(mapper.detect(['광고비', ' 날짜 ', '노출수', '매체']))
+    assert first["date_col"] == '날짜'
+    assert again["date_col"] == ' 날짜 '
+    assert mapper.keyword_hits == 1 and mapper.stats()["hits"] == 1
+
+
+def test_detect_falls_back_to_llm_and_retries_after_failures(monkeypatch):
+    replies = [{}, {"date_col": "Tag", "imp_col": "Seen", "media_col": "Nonexistent"}]
+
+    async def detect_columns(columns):
+        return replies.pop(0)
+
+    monkeypatch.setattr(ai_module.ai_service, "detect_columns", detect_columns)
+    mapper = ColumnMapper()
+    columns = ['Tag', 'Seen', 'Where']
+    # LLM failure: keyword result returned and not cached
+    assert asyncio.run(mapper.detect(columns))["date_col"] is None
+    mapping = asyncio.run(mapper.detect(columns))
+    assert mapping["date_col"] == 'Tag' and mapping["imp_col"] == 'Seen'
+    assert mapping["media_col"] is None  # names not in the sheet are dropped
+    assert asyncio.run(mapper.detect(columns)) == mapping
+    assert mapper.llm_calls == 2
@@ -0,0 +1,90 @@
+import asyncio
+
+from backend.events import broker as broker_module
+from backend.events.broker import EventBroker
+from backend.events.bus import Event, EventBus, coalesce
+
+
+def _status(event_id, channel, message="..."):
+    return Event(event_id, "status_update", channel, {"message": message})
+
+
+def test_coalesce_keeps_last_status_of_a_run():
+    events = [_status(1, "A", "a1"), _status(2, "A", "a2"), Event(3, "analysis_completed", "A", {}), _status(4, "A", "a3")]
+    assert [e.id for e in coalesce(events)] == [2, 3, 4]
+
+
+def test_coalesce_keeps_each_channels_status():
+    events = [_status(1, "A"), _status(2, "B")]
+    assert [e.id for e in coalesce(events)] == [1, 2]
+    events = [_status(1, "A"), _status(2, "A"), _status(3, "B"), _status(4, "B")]
+    assert [e.id for e in coalesce(events)] == [2, 4]
+
+
+def test_global_subscriber_sees_every_analysis_status():
+    bus = EventBus()
+
+    async def run():
+        with bus.subscription(["status_update"]) as sub:
+            await bus.emit("status_update", {"message": "A"}, channel="A")
+            await bus.emit("status_update", {"message": "B"}, channel="B")
+            return await sub.next_batch(timeout=1)
+
+    batch = asyncio.run(run())
+    assert [(e.channel, e.data["message"]) for e in batch] == [("A", "A"), ("B", "B")]
+
+
+async def _until(condition, timeout=5.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline
+        await asyncio.sleep(0.01)
+
+
+async def _collect(sub, count, timeout=5.0):
+    events = []
+    deadline = asyncio.get_running_loop().time() + timeout
+    while len(events) < count and asyncio.get_running_loop().time() < deadline:
+        events += await sub.next_batch(timeout=0.2)
+    return events
+
+
+def test_broker_events_after_an_outage_reach_subscribers(tmp_path, monkeypatch):
+    monkeypatch.setattr(broker_module, "RECONNECT_DELAY", 0.05)
+    url = f"unix://{tmp_path}/events.sock"
+
+    async def start_broker():
+        broker = EventBroker(url)
+        broker._last_id = 0  # started long before this worker, so its sequence is far below the worker's
+        await broker.start()
+        return broker
+
+    async def run():
+        broker = await start_broker()
+        bus = EventBus()
+        await bus.connect(url)
+        try:
+            with bus.subscription(["analysis_completed"], channel="A") as sub:
+                await bus.emit("analysis_completed", {"n": 1}, channel="A")
+                before = await _collect(sub, 1)
+
+                await broker.close()
+                await _until(lambda: not bus._broker.connected)
+                await bus.emit("analysis_completed", {"n": 2}, channel="A")
+                during = await _collect(sub, 1)
+
+                broker = await start_broker()
+                await _until(lambda: bus._broker.connected)
+                await bus.emit("analysis_completed", {"n": 3}, channel="A")
+                await bus.emit("analysis_completed", {"n": 4}, channel="A")
+                after = await _collect(sub, 2)
+        finally:
+            await bus.close()
+            await broker.close()
+        return before, during, after
+
+    before, during, after = asyncio.run(run())
+    events = before + during + after
+    assert [e.data["n"] for e in events] == [1, 2, 3, 4]
+    ids = [e.id for e in events]
+    assert ids == sorted(set(ids))
@@ -0,0 +1,55 @@
+import asyncio
+import threading
+from concurrent.futures import Executor
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from backend.core import executor
+from backend.core.config import settings
+
+
+def _locked_len(lock, values):
+    with lock:
+        return len(values)
+
+
+def _fails(values):
+    raise TypeError("bad values")
+
+
+@pytest.fixture
+def process_executor(monkeypatch):
+    monkeypatch.setattr(settings, "ANALYSIS_EXECUTOR", "process")
+    monkeypatch.setattr(settings, "ANALYSIS_WORKERS", 1)
+    executor.shutdown_executor()
+    yield
+    executor.shutdown_executor()
+
+
+def test_unpicklable_arguments_run_in_a_thread(process_executor):
+    assert asyncio.run(executor.run_cpu_bound(_locked_len, threading.Lock(), [1, 2, 3])) == 3
+
+
+def test_errors_raised_by_the_function_are_not_retried(process_executor):
+    with pytest.raises(TypeError, match="bad values"):
+        asyncio.run(executor.run_cpu_bound(_fails, [1]))
+
+
+class _BrokenPool(Executor):
+    def __init__(self):
+        self.shut_down = False
+
+    def submit(self, fn, *args, **kwargs):
+        raise BrokenProcessPool("worker died")
+
+    def shutdown(self, wait=True, *, cancel_futures=False):
+        self.shut_down = True
+
+
+def test_broken_pool_is_shut_down_and_replaced(process_executor, monkeypatch):
+    broken = _BrokenPool()
+    monkeypatch.setattr(executor, "_executor", broken)
+    assert asyncio.run(executor.run_cpu_bound(len, [1, 2])) == 2
+    assert broken.shut_down
+    assert executor._executor is executor._threads()
@@ -0,0 +1,127 @@
+import asyncio
+import gzip
+
+import httpx
+
+from backend.main import app as backend_app
+from benchmarks.run import _load_gateway_app
+
+gateway_app = _load_gateway_app()
+from api.backend_client import BackendPool  # noqa: E402  (gateway/ is on sys.path once the app is loaded)
+
+
+def _response(status_code: int, body: bytes = b"", headers=None) -> httpx.Response:
+    """A mocked backend response whose body is still unread, as over a real connection
+    (httpx reads bytes content eagerly, after which aiter_raw refuses it)"""
+    async def chunks():
+        yield body
+
+    return httpx.Response(status_code, headers=headers, content=chunks())
+
+
+def _call(handler, method, url, **kwargs):
+    """One request through the gateway, with the backend replaced by handler (an httpx MockTransport handler
+    or an ASGI app); returns the gateway's response with its body read as raw bytes"""
+    transport = httpx.ASGITransport(app=handler) if handler is backend_app else httpx.MockTransport(handler)
+
+    async def run():
+        gateway_app.state.backend = BackendPool(transport=transport)
+        try:
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=gateway_app),
+                                         base_url="http://gateway") as client:
+                # Only what the test sends, so the gateway's own Accept-Encoding default is visible
+                del client.headers["accept-encoding"]
+                async with client.stream(method, url, **kwargs) as response:
+                    response.raw_body = b"".join([chunk async for chunk in response.aiter_raw()])
+                    return response
+        finally:
+            await gateway_app.state.backend.aclose()
+
+    return asyncio.run(run())
+
+
+def test_request_body_and_headers_pass_through():
+    seen = {}
+
+    async def backend(request: httpx.Request):
+        seen.update(path=request.url.path, params=dict(request.url.params), body=await request.aread(),
+                    headers=dict(request.headers))
+        return _response(200, b'{"ok": true}', {"content-type": "application/json"})
+
+    body = gzip.compress(b'{"raw_rows": []}')
+    response = _call(backend, "POST", "/api/analysis/analyze?channel_id=c1&refresh=true", content=body,
+                     headers={"content-type": "application/json", "content-encoding": "gzip",
+                              "cookie": "session=1", "x-custom": "1"})
+    assert response.status_code == 200
+    assert seen["path"] == "/analyze"
+    assert seen["params"] == {"channel_id": "c1", "refresh": "true"}
+    # Compressed bytes are relayed, not decoded and re-encoded
+    assert seen["body"] == body
+    assert seen["headers"]["content-encoding"] == "gzip"
+    assert seen["headers"]["accept-encoding"] == "identity"
+    assert "cookie" not in seen["headers"] and "x-custom" not in seen["headers"]
+
+
+def test_response_bytes_status_and_headers_pass_through():
+    payload = gzip.compress(b'{"detail": "busy"}')
+
+    async def backend(request: httpx.Request):
+        assert request.headers["accept-encoding"] == "gzip"
+        return _response(429, payload, {
+            "content-type": "application/json", "content-encoding": "gzip", "retry-after": "5", "x-internal": "1"})
+
+    response = _call(backend, "POST", "/api/analysis/jobs", content=b"{}", headers={"accept-encoding": "gzip"})
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "5"
+    assert response.headers["content-encoding"] == "gzip"
+    assert "x-internal" not in response.headers
+    assert response.raw_body == payload
+
+
+def test_get_sends_no_body_and_backend_errors_become_500():
+    async def backend(request: httpx.Request):
+        assert request.method == "GET" and await request.aread() == b""
+        return _response(404, b'{"detail": "missing"}', {"content-type": "application/json"})
+
+    assert _call(backend, "GET", "/api/analysis/jobs/abc").status_code == 404
+
+    def unreachable(request: httpx.Request):
+        raise httpx.ConnectError("refused", request=request)
+
+    response = _call(unreachable, "POST", "/api/analysis/analyze", content=b"{}")
+    assert response.status_code == 500
+    assert "Backend Error" in response.raw_body.decode()
+
+
+def test_batch_has_no_read_timeout():
+    seen = {}
+
+    async def backend(request: httpx.Request):
+        seen.update(request.extensions["timeout"])
+        return _response(200, b'{"index": 0}\n', {"content-type": "application/x-ndjson"})
+
+    response = _call(backend, "POST", "/api/analysis/analyze/batch", content=b'{"items": []}')
+    assert response.raw_body == b'{"index": 0}\n'
+    assert seen["read"] is None and seen["connect"] is not None
+
+
+def test_stream_relays_frames_and_last_event_id():
+    frames = b"id: 1\nevent: status_update\ndata: {}\n\n: ping\n\n"
+    seen = {}
+
+    async def backend(request: httpx.Request):
+        seen.update(params=dict(request.url.params), last_event_id=request.headers.get("last-event-id"))
+        return _response(200, frames, {"content-type": "text/event-stream"})
+
+    response = _call(backend, "GET", "/api/analysis/stream?channel=c1", headers={"last-event-id": "7"})
+    assert response.raw_body == frames
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert seen == {"params": {"channel": "c1"}, "last_event_id": "7"}
+
+
+def test_relay_to_the_backend_app():
+    response = _call(backend_app, "GET", "/api/analysis/jobs/unknown")
+    assert response.status_code == 404
+    response = _call(backend_app, "POST", "/api/analysis/analyze/batch", content=b'{"items": []}',
+                     headers={"content-type": "application/json"})
+    assert response.status_code == 422
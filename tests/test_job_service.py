@@ -0,0 +1,119 @@
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.core.config import settings
+from backend.events.bus import event_bus
+from backend.main import app
+from backend.models.analysis import AnalysisRequest
+from backend.services import analysis_service as analysis_module
+from backend.services.job_service import JobQueueFullError, JobService
+from benchmarks.synthetic import MAPPINGS, generate_mix_rows, generate_raw_rows
+
+
+def _request(channel_id=None):
+    return AnalysisRequest(raw_rows=[], mix_rows=[], mappings={}, channel_id=channel_id)
+
+
+@pytest.fixture
+def gated_analysis(monkeypatch):
+    """analyze_data that reports progress and then waits until the test releases it"""
+    gate = asyncio.Event()
+    outcomes = {}
+
+    async def analyze_data(req, channel_id=None):
+        await event_bus.emit("status_update", {"message": "집계 중", "stages": [{"stage": "clean_rows"}]},
+                             channel=channel_id)
+        await gate.wait()
+        outcome = outcomes.get(channel_id, {"date": "2024-01-01"})
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    monkeypatch.setattr(analysis_module.analysis_service, "analyze_data", analyze_data)
+    return gate, outcomes
+
+
+def test_job_states_and_bounded_queue(gated_analysis, monkeypatch):
+    gate, outcomes = gated_analysis
+    monkeypatch.setattr(settings, "JOB_WORKERS", 1)
+    monkeypatch.setattr(settings, "JOB_QUEUE_SIZE", 1)
+    outcomes["bad"] = RuntimeError("boom")
+    outcomes["empty"] = {"error": "유효한 데이터가 없습니다."}
+    service = JobService()
+
+    async def run():
+        running = service.submit(_request("ok"))
+        assert running.status == "queued"
+        await asyncio.sleep(0.01)
+        assert running.status == "running" and running.started_at
+        assert running.progress == "집계 중" and running.stages == [{"stage": "clean_rows"}]
+
+        queued = service.submit(_request("bad"))
+        with pytest.raises(JobQueueFullError):
+            service.submit(_request("empty"))
+        with pytest.raises(ValueError):
+            service.submit(_request("ok"))
+        assert service.get("empty") is None
+
+        gate.set()
+        await asyncio.sleep(0.01)
+        assert running.status == "completed" and running.result == {"date": "2024-01-01", "channelId": "ok"}
+        assert queued.status == "failed" and queued.error == "boom"
+
+        empty = service.submit(_request("empty"))
+        await asyncio.sleep(0.01)
+        assert empty.status == "failed" and empty.error == "유효한 데이터가 없습니다."
+        assert running.finished_at >= running.started_at >= running.created_at
+        # Progress listeners are removed once a job ends
+        assert event_bus.listener_count() == 0
+        await service.stop()
+
+    asyncio.run(run())
+
+
+def test_finished_jobs_expire(gated_analysis, monkeypatch):
+    gate, _ = gated_analysis
+    gate.set()
+    service = JobService()
+
+    async def run():
+        job = service.submit(_request())
+        await asyncio.sleep(0.01)
+        assert service.get(job.id).status == "completed"
+        job.finished_at = time.time() - settings.JOB_RESULT_TTL - 1
+        assert service.get(job.id) is None
+        await service.stop()
+
+    asyncio.run(run())
+
+
+def test_jobs_api(stub_analysis):
+    body = {"raw_rows": generate_raw_rows(200, seed=1), "mix_rows": generate_mix_rows(seed=1),
+            "mappings": MAPPINGS, "refresh": True, "channel_id": "job-api"}
+    with TestClient(app) as client:
+        submitted = client.post("/jobs", json=body)
+        assert submitted.status_code == 202
+        assert submitted.json()["jobId"] == submitted.json()["channelId"] == "job-api"
+        assert client.post("/jobs", json=body).status_code == 409
+        deadline = time.time() + 30
+        while (job := client.get("/jobs/job-api").json())["status"] in ("queued", "running"):
+            assert time.time() < deadline
+            time.sleep(0.05)
+        assert job["status"] == "completed" and job["result"]["date"] and job["result"]["channelId"] == "job-api"
+        assert client.get("/jobs/unknown").status_code == 404
+
+
+def test_jobs_api_answers_429_when_the_queue_is_full(stub_analysis, gated_analysis, monkeypatch):
+    monkeypatch.setattr(settings, "JOB_WORKERS", 1)
+    monkeypatch.setattr(settings, "JOB_QUEUE_SIZE", 1)
+    body = {"raw_rows": [], "mix_rows": [], "mappings": {}}
+    with TestClient(app) as client:
+        # One running (held at the gate) plus one waiting fill the pool
+        statuses = [client.post("/jobs", json=body)]
+        time.sleep(0.05)  # let the worker take the first job off the queue
+        statuses += [client.post("/jobs", json=body) for _ in range(2)]
+        assert [r.status_code for r in statuses[:2]] == [202, 202]
+        assert statuses[2].status_code == 429 and statuses[2].headers["retry-after"] == "5"
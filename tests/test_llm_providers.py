@@ -0,0 +1,46 @@
+import asyncio
+
+import pytest
+
+from backend.services import llm_providers
+from backend.services.llm_providers import LLMProvider, StubProvider
+
+
+def test_incomplete_provider_fails_on_construction():
+    class GenerateOnly(LLMProvider):
+        async def generate(self, prompt, call="generate", json_output=False):
+            return ""
+
+    with pytest.raises(TypeError):
+        GenerateOnly()
+
+
+def test_stub_attempt_counts_are_bounded(monkeypatch):
+    monkeypatch.setattr(llm_providers, "STUB_ATTEMPT_KEYS", 8)
+    stub = StubProvider(latency=0, jitter=0, error_rate=0, seed=1)
+
+    async def run():
+        for i in range(50):
+            await stub.generate(f"prompt {i} " * 100)
+
+    asyncio.run(run())
+    assert stub.calls == 50
+    assert len(stub._attempts) == 8
+    assert all(len(key) == 64 for key in stub._attempts)
+
+
+def test_stub_retries_are_reproducible():
+    async def outcomes(stub):
+        results = []
+        for _ in range(6):
+            try:
+                await stub.generate("same prompt")
+                results.append(True)
+            except RuntimeError:
+                results.append(False)
+        return results
+
+    first = asyncio.run(outcomes(StubProvider(latency=0, jitter=0, error_rate=0.5, seed=7)))
+    second = asyncio.run(outcomes(StubProvider(latency=0, jitter=0, error_rate=0.5, seed=7)))
+    assert first == second
+    assert len(set(first)) == 2
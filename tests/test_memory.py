@@ -0,0 +1,12 @@
+import argparse
+
+from benchmarks.memory import measure
+
+# Same limit as python -m benchmarks.memory; at this size the pipeline peaks at about 0.2x the frame
+MAX_PEAK_RATIO = 0.25
+
+
+def test_analysis_peak_memory_stays_below_the_frame():
+    """A reintroduced full-frame copy or per-row object column pushes the peak past the limit"""
+    result = measure(argparse.Namespace(rows=20_000, extra_columns=40, seed=0, upload=None, chunk_rows=20_000))
+    assert result["peak_ratio"] <= MAX_PEAK_RATIO, result
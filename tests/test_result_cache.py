@@ -0,0 +1,82 @@
+import asyncio
+
+import pandas as pd
+import pytest
+
+from backend.core.cache import TieredCache
+from backend.events.bus import event_bus
+from backend.models.analysis import AnalysisRequest
+from backend.services import ai_service as ai_module
+from backend.services.analysis_service import analysis_service, result_cache_key
+from backend.services.workbook import SheetUpload
+from benchmarks.synthetic import MAPPINGS, generate_mix_rows, generate_raw_rows
+
+RAW = generate_raw_rows(150, seed=11)
+MIX = generate_mix_rows(seed=11)
+
+
+def _key(raw=RAW, mix=MIX, mappings=MAPPINGS, comparisons=None):
+    return result_cache_key(pd.DataFrame(raw), pd.DataFrame(mix), mappings, comparisons)
+
+
+def test_key_follows_content():
+    assert _key() == _key()
+    assert _key(raw=[{**RAW[0], "비용": "₩1"}] + RAW[1:]) != _key()
+    assert _key(mix=MIX[:-1]) != _key()
+    assert _key(mappings={"raw_mapping": {**MAPPINGS["raw_mapping"], "view_col": None}}) != _key()
+    assert _key(comparisons=[]) == _key()
+    assert _key(comparisons=[{"type": "wow"}]) != _key()
+
+
+def test_key_for_unhashable_cells_and_uploads():
+    assert _key(raw=[{**RAW[0], "메모": {"nested": [1]}}] + RAW[1:]) is None
+    sheet = SheetUpload("/tmp/a.xlsx", "xlsx", "Raw", digest="abc")
+    same_file = SheetUpload("/tmp/other-name.xlsx", "xlsx", "Raw", digest="abc")
+    assert result_cache_key(sheet, pd.DataFrame(), MAPPINGS) == result_cache_key(same_file, pd.DataFrame(), MAPPINGS)
+    assert result_cache_key(sheet, pd.DataFrame(), MAPPINGS) != result_cache_key(
+        SheetUpload("/tmp/a.xlsx", "xlsx", "Raw", digest="def"), pd.DataFrame(), MAPPINGS)
+
+
+@pytest.fixture
+def fresh_result_cache(monkeypatch):
+    cache = TieredCache("analysis_results", maxsize=16)
+    monkeypatch.setattr(analysis_service, "result_cache", cache)
+    return cache
+
+
+def _analyze(channel, refresh=False):
+    messages = []
+
+    async def on_status(data):
+        messages.append(data["message"])
+
+    async def run():
+        unsubscribe = event_bus.subscribe("status_update", on_status, channel=channel)
+        try:
+            req = AnalysisRequest(raw_rows=RAW, mix_rows=MIX, mappings=MAPPINGS, refresh=refresh)
+            return await analysis_service.analyze_data(req, channel_id=channel)
+        finally:
+            unsubscribe()
+
+    return asyncio.run(run()), messages
+
+
+def test_repeated_analysis_is_served_from_cache(stub_analysis, fresh_result_cache):
+    first, first_messages = _analyze("c1")
+    assert "캐시된 분석 결과를 반환합니다." not in first_messages
+    second, second_messages = _analyze("c2")
+    assert second_messages == ["캐시된 분석 결과를 반환합니다."]
+    assert second == first
+    _, refreshed = _analyze("c3", refresh=True)
+    assert "캐시된 분석 결과를 반환합니다." not in refreshed
+    assert fresh_result_cache.stats()["hits"] == 1
+
+
+def test_llm_failures_are_not_cached(stub_analysis, fresh_result_cache, monkeypatch):
+    async def failing_report(data):
+        return ai_module.INSIGHT_ERROR_MESSAGE, ai_module.SUMMARY_ERROR_MESSAGE
+
+    monkeypatch.setattr(ai_module.ai_service, "generate_report", failing_report)
+    result, _ = _analyze("c4")
+    assert result["insight"] == ai_module.INSIGHT_ERROR_MESSAGE
+    assert len(fresh_result_cache.memory) == 0
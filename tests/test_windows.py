@@ -0,0 +1,105 @@
+import datetime
+import random
+
+import pandas as pd
+import pytest
+from pydantic import ValidationError
+
+from backend.services.campaign_store import CUBE_METRICS
+from backend.services.windows import compare_windows, resolve_window
+from shared.schemas import ComparisonWindow
+
+D = datetime.date
+
+
+def _cube(start=D(2024, 1, 1), days=70, seed=0):
+    rng = random.Random(seed)
+    rows = []
+    for offset in range(days):
+        day = start + datetime.timedelta(days=offset)
+        for media in ("네이버", "카카오", ""):
+            for creative in ("A", "B"):
+                if rng.random() < 0.8:
+                    rows.append({"date": day, "media": media, "creative": creative,
+                                 **{m: rng.randint(0, 1000) for m in CUBE_METRICS}})
+    return pd.DataFrame(rows)
+
+
+def _sums(cube, window, level=None, name=None):
+    mask = (cube["date"] >= window[0]) & (cube["date"] <= window[1])
+    if level:
+        mask &= cube[level] == name
+    return {m: int(cube.loc[mask, m].sum()) for m in CUBE_METRICS}
+
+
+def _window(entry, key):
+    return D.fromisoformat(entry[key]["start"]), D.fromisoformat(entry[key]["end"])
+
+
+def test_resolve_wow_and_custom():
+    latest = D(2024, 3, 10)
+    wow = resolve_window({"type": "wow"}, latest)
+    assert wow["current"] == (D(2024, 3, 4), D(2024, 3, 10))
+    assert wow["previous"] == (D(2024, 2, 26), D(2024, 3, 3))
+    custom = resolve_window({"start": D(2024, 3, 5), "end": D(2024, 3, 7), "name": "promo"}, latest)
+    assert custom["name"] == "promo" and custom["type"] == "custom"
+    assert custom["previous"] == (D(2024, 3, 2), D(2024, 3, 4))
+    explicit = resolve_window({"start": D(2024, 3, 5), "end": D(2024, 3, 7),
+                               "compare_start": D(2024, 1, 1), "compare_end": D(2024, 1, 31)}, latest)
+    assert explicit["previous"] == (D(2024, 1, 1), D(2024, 1, 31))
+
+
+@pytest.mark.parametrize("latest, current, previous", [
+    (D(2024, 3, 31), (D(2024, 3, 1), D(2024, 3, 31)), (D(2024, 2, 1), D(2024, 2, 29))),  # leap February
+    (D(2023, 3, 30), (D(2023, 3, 1), D(2023, 3, 30)), (D(2023, 2, 1), D(2023, 2, 28))),
+    (D(2024, 3, 1), (D(2024, 3, 1), D(2024, 3, 1)), (D(2024, 2, 1), D(2024, 2, 1))),
+    (D(2024, 1, 15), (D(2024, 1, 1), D(2024, 1, 15)), (D(2023, 12, 1), D(2023, 12, 15))),
+])
+def test_resolve_mtd(latest, current, previous):
+    window = resolve_window({"type": "mtd"}, latest)
+    assert (window["current"], window["previous"]) == (current, previous)
+
+
+def test_compare_windows_matches_filtering_the_cube():
+    cube = _cube()
+    latest = cube["date"].max()
+    specs = [{"type": "wow"}, {"type": "mtd"}, {"type": "custom", "start": D(2024, 1, 10), "end": D(2024, 2, 3)},
+             {"type": "custom", "start": D(2024, 2, 1), "end": D(2024, 2, 1), "compare_start": D(2024, 1, 1),
+              "compare_end": D(2024, 1, 31)}]
+    for entry in compare_windows(cube, specs, latest):
+        current, previous = _window(entry, "current"), _window(entry, "previous")
+        for metric, value in _sums(cube, current).items():
+            assert entry["overall"][metric]["current"] == value
+        for metric, value in _sums(cube, previous).items():
+            assert entry["overall"][metric]["previous"] == value
+        for level, key in (("media", "media"), ("creative", "creatives")):
+            for row in entry[key]:
+                assert row["metrics"]["spend"]["current"] == _sums(cube, current, level, row["name"])["spend"]
+                assert row["metrics"]["clicks"]["previous"] == _sums(cube, previous, level, row["name"])["clicks"]
+
+
+def test_compare_windows_rows_and_deltas():
+    cube = _cube(days=10)
+    latest = cube["date"].max()
+    [wow] = compare_windows(cube, [{"type": "wow", "name": "주간"}], latest)
+    assert wow["name"] == "주간"
+    # Blank media counts in the overall figures but is not listed
+    assert [row["name"] for row in wow["media"]] and all(row["name"].strip() for row in wow["media"])
+    impressions = [row["metrics"]["impressions"]["current"] for row in wow["media"]]
+    assert impressions == sorted(impressions, reverse=True)
+    # Previous week is only partly covered by the data; a zero previous gives delta 0
+    [outside] = compare_windows(cube, [{"start": D(2023, 6, 1), "end": D(2023, 6, 7)}], latest)
+    assert outside["media"] == [] and outside["creatives"] == []
+    assert outside["overall"]["spend"] == {"current": 0, "previous": 0, "delta": 0}
+    current, previous = wow["overall"]["spend"]["current"], wow["overall"]["spend"]["previous"]
+    assert wow["overall"]["spend"]["delta"] == (round((current - previous) / previous * 100, 1) if previous else 0)
+
+
+def test_comparison_window_validation():
+    with pytest.raises(ValidationError):
+        ComparisonWindow(type="custom", start=D(2024, 1, 5))
+    with pytest.raises(ValidationError):
+        ComparisonWindow(type="custom", start=D(2024, 1, 5), end=D(2024, 1, 1))
+    with pytest.raises(ValidationError):
+        ComparisonWindow(type="wow", compare_start=D(2024, 1, 5), compare_end=D(2024, 1, 1))
+    assert ComparisonWindow(type="mtd").start is None
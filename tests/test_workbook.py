@@ -0,0 +1,151 @@
+import hashlib
+import io
+import json
+import os
+
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.main import app
+from backend.services.aggregation import compute_aggregates, compute_upload_aggregates, prune_columns
+from backend.services.ingest import UnsupportedFormatError
+from backend.services.workbook import (
+    RAW_EXCLUDE_KEYWORDS, SheetUpload, detect_workbook_format, find_mix_sheet, find_raw_sheet, open_workbook,
+    save_upload,
+)
+from benchmarks.memory import write_sheet
+from benchmarks.synthetic import MAPPINGS, generate_mix_rows, generate_raw_rows
+
+COLUMNS = {key: MAPPINGS["raw_mapping"].get(key) for key in
+           ("date_col", "media_col", "creative_col", "imp_col", "cost_col", "click_col", "view_col", "advertiser_col")}
+
+
+def _write_rows(path, rows, sheet="Sheet"):
+    from openpyxl import Workbook
+    workbook = Workbook()
+    workbook.active.title = sheet
+    for row in rows:
+        workbook.active.append(row)
+    workbook.save(path)
+    return str(path)
+
+
+def test_detect_workbook_format():
+    assert detect_workbook_format("Report.XLSX") == "xlsx"
+    assert detect_workbook_format("report.csv", "application/octet-stream") == "csv"
+    assert detect_workbook_format("blob", "text/csv; charset=utf-8") == "csv"
+    with pytest.raises(UnsupportedFormatError):
+        detect_workbook_format("report.xls")
+
+
+def test_save_upload_copies_with_digest(monkeypatch):
+    monkeypatch.setattr("backend.services.workbook.COPY_BUFFER", 7)
+    data = b"date,media\n" * 50
+    path, digest, size = save_upload(io.BytesIO(data), "csv")
+    try:
+        with open(path, "rb") as f:
+            assert f.read() == data
+        assert path.endswith(".csv")
+        assert (digest, size) == (hashlib.sha256(data).hexdigest(), len(data))
+    finally:
+        os.remove(path)
+
+
+def test_sheet_picking():
+    assert find_raw_sheet(["Summary", "Raw_Data", "Plan"]) == "Raw_Data"
+    assert find_raw_sheet(["Sheet1", "Sheet2"]) == "Sheet1"
+    assert find_mix_sheet(["Raw", "Total", "Media Mix"]) == "Media Mix"
+    assert find_mix_sheet(["Raw", "Budget Plan"]) == "Budget Plan"
+    assert find_mix_sheet(["Raw Summary", "Sheet"]) is None
+
+
+def test_header_below_title_rows_and_chunks(tmp_path):
+    path = _write_rows(tmp_path / "raw.xlsx", [
+        ["3월 캠페인 리포트"],
+        [],
+        ["일자", "매체", "비용", "요일", "노출"],
+        ["2024-03-01", "네이버", 100, "금", 10],
+        [None, None, None, None, None],
+        ["2024-03-02", "카카오", 200, "토", 20],
+        ["2024-03-03", "네이버", 300, "일", 30],
+    ])
+    upload = SheetUpload(path, "xlsx", exclude_keywords=RAW_EXCLUDE_KEYWORDS).inspect()
+    assert upload.headers == ["일자", "매체", "비용", "요일", "노출"]
+    assert upload.columns == ["일자", "매체", "비용", "노출"]
+    assert not upload.empty
+    chunks = list(upload.chunks(2))
+    # The blank row is dropped from its chunk, not carried as NaNs
+    assert [len(c) for c in chunks] == [1, 2]
+    assert pd.concat(chunks)["비용"].tolist() == [100, 200, 300]
+    assert list(upload.chunks(10, ["노출"]))[0]["노출"].tolist() == [10, 20, 30]
+
+
+def test_transposed_sheet_is_flipped(tmp_path):
+    path = _write_rows(tmp_path / "t.xlsx", [
+        ["date", "2024-03-01", "2024-03-02"],
+        ["media", "네이버", "카카오"],
+        ["cost", 100, 200],
+    ])
+    upload = SheetUpload(path, "xlsx").inspect()
+    assert upload.columns == ["date", "media", "cost"]
+    assert upload.read_frame(10).to_dict("records") == [
+        {"date": "2024-03-01", "media": "네이버", "cost": 100},
+        {"date": "2024-03-02", "media": "카카오", "cost": 200},
+    ]
+
+
+def test_header_only_sheet_is_empty(tmp_path):
+    path = tmp_path / "empty.csv"
+    path.write_text("date,media,cost\n,,\n", encoding="utf-8")
+    upload = SheetUpload(str(path), "csv").inspect()
+    assert upload.empty
+    assert all(chunk.empty for chunk in upload.chunks(10))
+
+
+@pytest.mark.parametrize("fmt", ["csv", "xlsx"])
+def test_upload_aggregates_match_the_frame(tmp_path, fmt):
+    raw_df = pd.DataFrame(generate_raw_rows(700, extra_columns=5, seed=3))
+    mix_df = pd.DataFrame(generate_mix_rows(seed=3))
+    path = str(tmp_path / f"raw.{fmt}")
+    write_sheet(raw_df, fmt, path)
+    upload = SheetUpload(path, fmt, exclude_keywords=RAW_EXCLUDE_KEYWORDS).inspect()
+
+    expected = compute_aggregates(prune_columns(raw_df, COLUMNS), mix_df, COLUMNS)
+    streamed = compute_upload_aggregates(upload, mix_df, COLUMNS, chunk_rows=64)
+    expected.pop("stages")
+    streamed.pop("stages")
+    assert streamed == expected
+
+
+def test_open_workbook_reads_raw_and_mix_sheets(tmp_path):
+    from openpyxl import Workbook
+    workbook = Workbook()
+    workbook.active.title = "Media Mix"
+    workbook.active.append(["매체", "예산"])
+    workbook.active.append(["네이버", 1000])
+    raw = workbook.create_sheet("Raw Data")
+    raw.append(["일자", "매체", "비용"])
+    raw.append(["2024-03-01", "네이버", 100])
+    path = str(tmp_path / "book.xlsx")
+    workbook.save(path)
+
+    upload, mix_df = open_workbook(path, "xlsx", digest="d", size=1)
+    assert (upload.sheet, upload.digest, upload.columns) == ("Raw Data", "d", ["일자", "매체", "비용"])
+    assert mix_df.to_dict("records") == [{"매체": "네이버", "예산": 1000}]
+
+
+def test_analyze_upload_endpoint(tmp_path, stub_analysis):
+    raw_df = pd.DataFrame(generate_raw_rows(200, seed=4))
+    path = str(tmp_path / "raw.csv")
+    write_sheet(raw_df, "csv", path)
+    client = TestClient(app)
+    with open(path, "rb") as f:
+        response = client.post("/analyze/upload", files={"file": ("raw.csv", f, "text/csv")},
+                               data={"mappings": json.dumps(MAPPINGS)})
+    assert response.status_code == 200, response.text
+    assert response.json()["channelId"]
+
+    rejected = client.post("/analyze/upload", files={"file": ("raw.xls", b"x", "application/vnd.ms-excel")})
+    assert rejected.status_code == 415
+    assert client.post("/analyze/upload", json={}).status_code == 415